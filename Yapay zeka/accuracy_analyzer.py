@@ -10,6 +10,10 @@ import json
 from datetime import datetime
 import os
 
+# Analiz görevleri ve rol bazlı yönlendirmede görevin uygulanmadığı hücrelerin değeri
+TASKS = ['sentiment', 'topic', 'bot_response']
+NOT_APPLICABLE = "N/A"
+
 class AccuracyAnalyzer:
     def __init__(self):
         """Doğruluk analizi sistemi"""
@@ -17,7 +21,8 @@ class AccuracyAnalyzer:
         
     def load_data(self, filepath: str) -> pd.DataFrame:
         """Manuel etiketli veriyi yükle"""
-        df = pd.read_csv(filepath)
+        # "N/A" (uygulanmayan görev) pandas'ın varsayılan NaN listesinde olduğu için ayrıca okunur
+        df = pd.read_csv(filepath, keep_default_na=False, na_values=['', 'nan', 'NaN', 'None'])
         
         # Gerekli sütunları kontrol et
         required_columns = [
@@ -33,8 +38,8 @@ class AccuracyAnalyzer:
         # NaN değerleri olan satırları filtrele
         print(f"📊 Toplam satır sayısı: {len(df)}")
         
-        # Manuel etiketleme yapılmış satırları filtrele
-        df_clean = df.dropna(subset=['manual_sentiment', 'manual_topic', 'manual_bot_response'])
+        # Manuel etiketleme yapılmış satırları filtrele (uygulanmayan görevler boş veya N/A olabilir)
+        df_clean = df.dropna(subset=['manual_sentiment', 'manual_topic', 'manual_bot_response'], how='all')
         
         print(f"📊 Manuel etiketlenmiş satır sayısı: {len(df_clean)}")
         print(f"📊 Etiketlenmemiş satır sayısı: {len(df) - len(df_clean)}")
@@ -44,57 +49,37 @@ class AccuracyAnalyzer:
         
         return df_clean
     
+    def applicable_rows(self, df: pd.DataFrame, task: str) -> pd.DataFrame:
+        """Görevin uygulandığı satırlar (manuel ve LLM etiketi dolu, ikisi de N/A değil)"""
+        manual, llm = df[f'manual_{task}'], df[f'llm_{task}']
+        mask = manual.notna() & llm.notna() & (manual != NOT_APPLICABLE) & (llm != NOT_APPLICABLE)
+        return df[mask]
+    
+    def labeled_rows(self, df: pd.DataFrame) -> pd.DataFrame:
+        """En az bir görevi uygulanabilir olan satırlar"""
+        indices = [self.applicable_rows(df, task).index for task in TASKS]
+        return df[df.index.isin(indices[0].union(indices[1]).union(indices[2]))]
+    
     def calculate_accuracy_metrics(self, df: pd.DataFrame) -> dict:
-        """Her kategori için doğruluk metriklerini hesapla"""
+        """Her kategori için doğruluk metriklerini hesapla (uygulanmayan hücreler atlanır)"""
         metrics = {}
         
-        # Veri temizliği - NaN değerleri kontrol et
-        df_clean = df.dropna(subset=['manual_sentiment', 'manual_topic', 'manual_bot_response', 
-                                   'llm_sentiment', 'llm_topic', 'llm_bot_response'])
-        
-        if len(df_clean) == 0:
-            raise ValueError("Analiz için yeterli temiz veri yok!")
-        
-        print(f"📊 Analiz edilen temiz veri sayısı: {len(df_clean)}")
-        
-        # Sentiment analizi metrikleri
-        sentiment_accuracy = accuracy_score(df_clean['manual_sentiment'], df_clean['llm_sentiment'])
-        sentiment_precision = precision_score(df_clean['manual_sentiment'], df_clean['llm_sentiment'], average='weighted', zero_division=0)
-        sentiment_recall = recall_score(df_clean['manual_sentiment'], df_clean['llm_sentiment'], average='weighted', zero_division=0)
-        sentiment_f1 = f1_score(df_clean['manual_sentiment'], df_clean['llm_sentiment'], average='weighted', zero_division=0)
-        
-        metrics['sentiment'] = {
-            'accuracy': sentiment_accuracy,
-            'precision': sentiment_precision,
-            'recall': sentiment_recall,
-            'f1_score': sentiment_f1
-        }
-        
-        # Konu analizi metrikleri
-        topic_accuracy = accuracy_score(df_clean['manual_topic'], df_clean['llm_topic'])
-        topic_precision = precision_score(df_clean['manual_topic'], df_clean['llm_topic'], average='weighted', zero_division=0)
-        topic_recall = recall_score(df_clean['manual_topic'], df_clean['llm_topic'], average='weighted', zero_division=0)
-        topic_f1 = f1_score(df_clean['manual_topic'], df_clean['llm_topic'], average='weighted', zero_division=0)
-        
-        metrics['topic'] = {
-            'accuracy': topic_accuracy,
-            'precision': topic_precision,
-            'recall': topic_recall,
-            'f1_score': topic_f1
-        }
-        
-        # Bot yanıt analizi metrikleri
-        bot_accuracy = accuracy_score(df_clean['manual_bot_response'], df_clean['llm_bot_response'])
-        bot_precision = precision_score(df_clean['manual_bot_response'], df_clean['llm_bot_response'], average='weighted', zero_division=0)
-        bot_recall = recall_score(df_clean['manual_bot_response'], df_clean['llm_bot_response'], average='weighted', zero_division=0)
-        bot_f1 = f1_score(df_clean['manual_bot_response'], df_clean['llm_bot_response'], average='weighted', zero_division=0)
-        
-        metrics['bot_response'] = {
-            'accuracy': bot_accuracy,
-            'precision': bot_precision,
-            'recall': bot_recall,
-            'f1_score': bot_f1
-        }
+        for task in TASKS:
+            # Veri temizliği - NaN ve N/A değerleri görev bazında ayıkla
+            df_task = self.applicable_rows(df, task)
+            if len(df_task) == 0:
+                raise ValueError(f"Analiz için yeterli temiz veri yok! ({task})")
+            
+            print(f"📊 Analiz edilen temiz veri sayısı ({task}): {len(df_task)}")
+            
+            manual, llm = df_task[f'manual_{task}'], df_task[f'llm_{task}']
+            metrics[task] = {
+                'accuracy': accuracy_score(manual, llm),
+                'precision': precision_score(manual, llm, average='weighted', zero_division=0),
+                'recall': recall_score(manual, llm, average='weighted', zero_division=0),
+                'f1_score': f1_score(manual, llm, average='weighted', zero_division=0),
+                'support': len(df_task)
+            }
         
         self.metrics = metrics
         return metrics
@@ -103,41 +88,20 @@ class AccuracyAnalyzer:
         """Karışıklık matrislerini oluştur"""
         confusion_matrices = {}
         
-        # Veri temizliği
-        df_clean = df.dropna(subset=['manual_sentiment', 'manual_topic', 'manual_bot_response', 
-                                   'llm_sentiment', 'llm_topic', 'llm_bot_response'])
-        
-        # Sentiment confusion matrix
-        sentiment_cm = confusion_matrix(df_clean['manual_sentiment'], df_clean['llm_sentiment'])
-        sentiment_labels = sorted(df_clean['manual_sentiment'].unique())
-        confusion_matrices['sentiment'] = {
-            'matrix': sentiment_cm,
-            'labels': sentiment_labels
-        }
-        
-        # Topic confusion matrix
-        topic_cm = confusion_matrix(df_clean['manual_topic'], df_clean['llm_topic'])
-        topic_labels = sorted(df_clean['manual_topic'].unique())
-        confusion_matrices['topic'] = {
-            'matrix': topic_cm,
-            'labels': topic_labels
-        }
-        
-        # Bot response confusion matrix
-        bot_cm = confusion_matrix(df_clean['manual_bot_response'], df_clean['llm_bot_response'])
-        bot_labels = sorted(df_clean['manual_bot_response'].unique())
-        confusion_matrices['bot_response'] = {
-            'matrix': bot_cm,
-            'labels': bot_labels
-        }
+        for task in TASKS:
+            df_task = self.applicable_rows(df, task)
+            labels = sorted(set(df_task[f'manual_{task}']) | set(df_task[f'llm_{task}']))
+            confusion_matrices[task] = {
+                'matrix': confusion_matrix(df_task[f'manual_{task}'], df_task[f'llm_{task}'], labels=labels),
+                'labels': labels
+            }
         
         return confusion_matrices
     
     def create_accuracy_report(self, df: pd.DataFrame) -> str:
         """Detaylı doğruluk raporu oluştur"""
         # Veri temizliği
-        df_clean = df.dropna(subset=['manual_sentiment', 'manual_topic', 'manual_bot_response', 
-                                   'llm_sentiment', 'llm_topic', 'llm_bot_response'])
+        df_clean = self.labeled_rows(df)
         
         metrics = self.calculate_accuracy_metrics(df)
         
@@ -150,19 +114,19 @@ class AccuracyAnalyzer:
 
 ## 🎯 Genel Doğruluk Oranları
 
-### 1. Sentiment Analizi
+### 1. Sentiment Analizi ({metrics['sentiment']['support']} mesaj)
 - **Doğruluk Oranı:** %{metrics['sentiment']['accuracy']*100:.2f}
 - **Precision:** %{metrics['sentiment']['precision']*100:.2f}
 - **Recall:** %{metrics['sentiment']['recall']*100:.2f}
 - **F1-Score:** %{metrics['sentiment']['f1_score']*100:.2f}
 
-### 2. Konu Analizi
+### 2. Konu Analizi ({metrics['topic']['support']} mesaj)
 - **Doğruluk Oranı:** %{metrics['topic']['accuracy']*100:.2f}
 - **Precision:** %{metrics['topic']['precision']*100:.2f}
 - **Recall:** %{metrics['topic']['recall']*100:.2f}
 - **F1-Score:** %{metrics['topic']['f1_score']*100:.2f}
 
-### 3. Bot Yanıt Analizi
+### 3. Bot Yanıt Analizi ({metrics['bot_response']['support']} mesaj)
 - **Doğruluk Oranı:** %{metrics['bot_response']['accuracy']*100:.2f}
 - **Precision:** %{metrics['bot_response']['precision']*100:.2f}
 - **Recall:** %{metrics['bot_response']['recall']*100:.2f}
@@ -211,10 +175,6 @@ class AccuracyAnalyzer:
     
     def create_visualizations(self, df: pd.DataFrame, save_path: str = None):
         """Görselleştirmeler oluştur"""
-        # Veri temizliği
-        df_clean = df.dropna(subset=['manual_sentiment', 'manual_topic', 'manual_bot_response', 
-                                   'llm_sentiment', 'llm_topic', 'llm_bot_response'])
-        
         metrics = self.calculate_accuracy_metrics(df)
         confusion_matrices = self.generate_confusion_matrices(df)
         
@@ -341,21 +301,21 @@ class AccuracyAnalyzer:
         return output_dir
     
     def create_detailed_analysis(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Her mesaj için detaylı analiz"""
+        """Her mesaj için detaylı analiz (uygulanmayan görevlerin doğruluk hücreleri boş kalır)"""
         # Veri temizliği
-        analysis_df = df.dropna(subset=['manual_sentiment', 'manual_topic', 'manual_bot_response', 
-                                      'llm_sentiment', 'llm_topic', 'llm_bot_response']).copy()
+        analysis_df = self.labeled_rows(df).copy()
+        applicable = {task: self.applicable_rows(analysis_df, task).index for task in TASKS}
         
         # Doğruluk sütunları ekle
-        analysis_df['sentiment_correct'] = analysis_df['manual_sentiment'] == analysis_df['llm_sentiment']
-        analysis_df['topic_correct'] = analysis_df['manual_topic'] == analysis_df['llm_topic']
-        analysis_df['bot_response_correct'] = analysis_df['manual_bot_response'] == analysis_df['llm_bot_response']
+        for task in TASKS:
+            correct = analysis_df[f'manual_{task}'] == analysis_df[f'llm_{task}']
+            analysis_df[f'{task}_correct'] = correct.where(analysis_df.index.isin(applicable[task])).astype('boolean')
         
-        # Genel doğruluk skoru
+        # Genel doğruluk skoru (yalnızca uygulanan görevler)
         analysis_df['overall_correct'] = (
-            analysis_df['sentiment_correct'] & 
-            analysis_df['topic_correct'] & 
-            analysis_df['bot_response_correct']
+            analysis_df['sentiment_correct'].fillna(True) & 
+            analysis_df['topic_correct'].fillna(True) & 
+            analysis_df['bot_response_correct'].fillna(True)
         )
         
         return analysis_df
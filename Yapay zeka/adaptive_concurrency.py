@@ -0,0 +1,231 @@
+import time
+import asyncio
+import threading
+import logging
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+from llm_executor import resolve_worker_limit
+from rate_limiter import is_rate_limit_error
+
+logger = logging.getLogger(__name__)
+
+# Aşırı yük sinyali sayılan durum kodları (429 dışında: servis meşgul / Anthropic "overloaded")
+OVERLOAD_STATUS_CODES = {503, 529}
+
+# Gecikme ortalamaları: kısa vadeli (son çağrılar) ve uzun vadeli (taban) EWMA katsayıları
+SHORT_LATENCY_ALPHA = 0.2
+LONG_LATENCY_ALPHA = 0.02
+
+# Metadata'da tutulan en fazla limit değişikliği kaydı
+HISTORY_SIZE = 50
+
+
+def overload_reason(error: Exception) -> Optional[str]:
+    """Hata eşzamanlılığın düşürülmesini gerektiriyor mu: "rate_limit", "timeout", "overloaded" veya None"""
+    if is_rate_limit_error(error):
+        return "rate_limit"
+    if 'timeout' in type(error).__name__.lower():
+        return "timeout"
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    if status in OVERLOAD_STATUS_CODES:
+        return "overloaded"
+    return None
+
+
+class AIMDConcurrencyController:
+    def __init__(self, initial_limit: int = 8, min_limit: int = 1, max_limit: int = 64,
+                 increase: float = 1.0, decrease: float = 0.5, latency_tolerance: float = 2.0):
+        """
+        429 ve gecikme geri bildirimiyle uçuştaki istek sayısını ayarlayan AIMD denetleyici
+
+        Sağlıklı her yanıtta limit toplamsal artar (limit kadar başarılı yanıtta +increase),
+        429, zaman aşımı veya 503'te çarpımsal olarak düşer (limit * decrease). Bir düşüşten
+        önce başlamış isteklerin hataları tekrar düşüş yaptırmaz (aynı aşırı yük anı bir kez
+        sayılır). Kısa vadeli gecikme uzun vadeli tabanın latency_tolerance katını aşarsa
+        limit artırılmaz. Limit yalnızca yanıt geldiğinde uçuşta limitin en az yarısı
+        kadar istek varsa artar; az kullanılan limit şişmez.
+
+        Senkron (thread) ve asenkron çağıranlar aynı denetleyiciyi paylaşabilir.
+
+        Args:
+            initial_limit (int): Başlangıç eşzamanlılık limiti
+            min_limit (int): En düşük limit
+            max_limit (int): En yüksek limit
+            increase (float): Limit kadar başarılı yanıt başına eklenen miktar
+            decrease (float): Aşırı yük sinyalinde limitin çarpılacağı oran (0-1)
+            latency_tolerance (float): Artışı durduran kısa/uzun vadeli gecikme oranı
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease 0 ile 1 arasında olmalı")
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError("Geçersiz limit aralığı (1 <= min_limit <= max_limit)")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._short_latency: Optional[float] = None
+        self._long_latency: Optional[float] = None
+        self._started = time.monotonic()
+        self._history = deque(maxlen=HISTORY_SIZE)
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._async_waiters = deque()
+
+        self.stats = {'requests': 0, 'successes': 0, 'increases': 0, 'decreases': 0, 'slow_responses': 0,
+                      'peak_in_flight': 0, 'overloads': {}}
+
+    @property
+    def limit(self) -> int:
+        """Güncel eşzamanlılık limiti"""
+        with self._lock:
+            return int(self._limit)
+
+    def _take_slot(self) -> Optional[float]:
+        """Boş yer varsa slotu al ve bileti (başlangıç zamanı) döndür; kilit altında çağrılır"""
+        if self._in_flight >= int(self._limit):
+            return None
+        self._in_flight += 1
+        self.stats['requests'] += 1
+        self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self._in_flight)
+        return time.monotonic()
+
+    def _wake_waiters(self):
+        """Boşalan slot sayısı kadar bekleyeni uyandır; kilit altında çağrılır"""
+        free = int(self._limit) - self._in_flight
+        if free <= 0:
+            return
+        self._condition.notify(free)
+        while free > 0 and self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            if waiter.done():
+                # İptal edilmiş bekleyen
+                continue
+            loop.call_soon_threadsafe(_resolve_waiter, waiter)
+            free -= 1
+
+    def acquire(self) -> float:
+        """Slot boşalana kadar bekle (thread); release'e verilecek bileti döndür"""
+        with self._condition:
+            while True:
+                ticket = self._take_slot()
+                if ticket is not None:
+                    return ticket
+                self._condition.wait()
+
+    async def acquire_async(self) -> float:
+        """acquire'ın asenkron karşılığı"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                ticket = self._take_slot()
+                if ticket is not None:
+                    return ticket
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                # Bu bekleyene verilmiş uyandırma başka bekleyene aktarılır
+                with self._lock:
+                    self._wake_waiters()
+                raise
+
+    def release(self, ticket: float, latency: Optional[float] = None, error: Optional[Exception] = None):
+        """
+        Slotu bırak ve sonucu limite yansıt
+
+        Args:
+            ticket (float): acquire'dan dönen bilet
+            latency (float): Başarılı çağrının gecikmesi (saniye)
+            error (Exception): Başarısız çağrının hatası (None ve latency None = iptal, nötr)
+        """
+        with self._condition:
+            in_flight = self._in_flight
+            self._in_flight -= 1
+            if error is not None:
+                reason = overload_reason(error)
+                if reason is not None:
+                    self._on_overload(ticket, reason)
+            elif latency is not None:
+                self._on_success(latency, in_flight)
+            self._wake_waiters()
+
+    def _on_success(self, latency: float, in_flight: int):
+        """Sağlıklı yanıtta limiti toplamsal artır; kilit altında çağrılır"""
+        self.stats['successes'] += 1
+        if self._short_latency is None:
+            self._short_latency = self._long_latency = latency
+        else:
+            self._short_latency += SHORT_LATENCY_ALPHA * (latency - self._short_latency)
+            self._long_latency += LONG_LATENCY_ALPHA * (latency - self._long_latency)
+
+        if self._short_latency > self.latency_tolerance * self._long_latency:
+            self.stats['slow_responses'] += 1
+            return
+        # Limitin yarısı bile kullanılmıyorsa darboğaz eşzamanlılık değildir
+        if in_flight * 2 < self._limit or self._limit >= self.max_limit:
+            return
+
+        previous = int(self._limit)
+        self._limit = min(float(self.max_limit), self._limit + self.increase / self._limit)
+        if int(self._limit) > previous:
+            self.stats['increases'] += 1
+            self._record_change("increase")
+
+    def _on_overload(self, ticket: float, reason: str):
+        """Aşırı yük sinyalinde limiti çarpımsal düşür; kilit altında çağrılır"""
+        self.stats['overloads'][reason] = self.stats['overloads'].get(reason, 0) + 1
+        if ticket < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        self._limit = max(float(self.min_limit), self._limit * self.decrease)
+        self.stats['decreases'] += 1
+        self._record_change(reason)
+        logger.warning(f"📉 Eşzamanlılık limiti düşürüldü ({reason}): {int(self._limit)}")
+
+    def _record_change(self, reason: str):
+        self._history.append({'t': round(time.monotonic() - self._started, 3), 'limit': int(self._limit),
+                              'reason': reason})
+
+    def get_stats(self) -> Dict:
+        """Limit, uçuştaki istekler, gecikme ortalamaları ve son limit değişiklikleri"""
+        with self._lock:
+            return {
+                **self.stats,
+                'overloads': dict(self.stats['overloads']),
+                'limit': int(self._limit),
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'in_flight': self._in_flight,
+                'latency_short': round(self._short_latency, 4) if self._short_latency is not None else None,
+                'latency_long': round(self._long_latency, 4) if self._long_latency is not None else None,
+                'history': list(self._history),
+            }
+
+
+def _resolve_waiter(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_controllers: Dict[Tuple[str, str], AIMDConcurrencyController] = {}
+_controllers_lock = threading.Lock()
+
+
+def get_concurrency_controller(provider: str, model: str) -> AIMDConcurrencyController:
+    """Süreç genelinde provider/model başına paylaşılan denetleyiciyi döndür (başlangıç: provider worker limiti)"""
+    with _controllers_lock:
+        key = (provider, model)
+        if key not in _controllers:
+            _controllers[key] = AIMDConcurrencyController(initial_limit=resolve_worker_limit(provider))
+            logger.info(f"🎚️ Uyarlanabilir eşzamanlılık: {provider}/{model} "
+                        f"(başlangıç: {_controllers[key].limit})")
+        return _controllers[key]
@@ -0,0 +1,155 @@
+import threading
+import logging
+from typing import Dict, List, Optional
+
+from circuit_breaker import classify_error
+from client_registry import get_client
+from rate_limiter import TokenBucketRateLimiter, resolve_rate_limits, retry_after_from_error
+
+logger = logging.getLogger(__name__)
+
+# Retry-After dönmeyen 429'larda anahtarın beklemeye alınacağı süre (saniye)
+KEY_COOLDOWN_SECONDS = 2.0
+
+# .env örneklerinde kalan yer tutucu anahtarlar
+PLACEHOLDER_KEYS = {"your_openai_api_key_here", "your_groq_api_key_here", "your_key_here"}
+
+
+def parse_api_keys(value: Optional[str]) -> List[str]:
+    """Virgülle ayrılmış anahtarları ayır (boşlar, yer tutucular ve tekrarlar atılır)"""
+    keys = []
+    for key in (value or "").split(","):
+        key = key.strip()
+        if key and key not in PLACEHOLDER_KEYS and key not in keys:
+            keys.append(key)
+    return keys
+
+
+def mask_api_key(api_key: str) -> str:
+    """Loglar ve metadata için anahtarın yalnızca başı ve sonu"""
+    return f"{api_key[:3]}...{api_key[-4:]}" if len(api_key) > 10 else "***"
+
+
+class NoUsableAPIKeyError(RuntimeError):
+    """Havuzdaki tüm anahtarlar devre dışı (geçersiz veya kotası bitmiş)"""
+
+    # Devre kesici bu hatayı kimlik doğrulama hatası gibi sınıflandırır (tekrar denenmez)
+    status_code = 401
+
+
+class PooledAPIKey:
+    def __init__(self, api_key: str, client, rate_limiter: TokenBucketRateLimiter):
+        """Havuzdaki tek anahtar: istemcisi, kendi RPM/TPM limiter'ı ve kullanım sayaçları"""
+        self.api_key = api_key
+        self.label = mask_api_key(api_key)
+        self.client = client
+        self.async_client = None
+        self.rate_limiter = rate_limiter
+        self.disabled_reason: Optional[str] = None
+
+        self.stats = {'requests': 0, 'successes': 0, 'tokens': 0, 'rate_limited': 0, 'errors': {}}
+
+
+class APIKeyPool:
+    def __init__(self, provider: str, model: str, api_keys: List[str], base_url: Optional[str] = None):
+        """
+        Birden çok API anahtarına istek dağıtan havuz
+
+        Her anahtarın kendi RPM/TPM limiter'ı vardır; istek o an en kısa beklemeyle
+        çağrı yapabilecek (eşitlikte en az kullanılan) anahtara gider. 429 alan anahtar
+        Retry-After süresince beklemeye alınır, geçersiz (401/403) veya kotası bitmiş
+        (insufficient_quota) anahtarlar havuzdan çıkarılır.
+
+        Anahtarlar aynı organizasyona aitse provider limitleri organizasyon düzeyinde
+        uygulandığı için toplam verim artmaz.
+
+        Args:
+            provider (str): "openai" veya "groq"
+            model (str): Anahtar başına limitlerin belirleneceği model
+            api_keys (list): API anahtarları (en az bir)
+            base_url (str): Uyumlu sunucu adresi
+        """
+        if not api_keys:
+            raise ValueError("API anahtar havuzu boş!")
+
+        self.provider = provider
+        self.model = model
+        self.base_url = base_url
+        self.keys = [PooledAPIKey(api_key, get_client(provider, api_key, base_url), self._new_rate_limiter())
+                     for api_key in api_keys]
+        self._lock = threading.Lock()
+        logger.info(f"🔑 API anahtar havuzu: {provider} ({len(self.keys)} anahtar)")
+
+    def _new_rate_limiter(self, share: int = 1) -> TokenBucketRateLimiter:
+        rpm, tpm = resolve_rate_limits(self.provider, self.model)
+        return TokenBucketRateLimiter(rpm / share if rpm else None, tpm / share if tpm else None)
+
+    def share_rate_limits(self, share: int):
+        """Anahtar başına bütçeyi share kadar süreç arasında böl (ör. corpus_runner worker'ları)"""
+        for key in self.keys:
+            key.rate_limiter = self._new_rate_limiter(max(1, share))
+
+    def setup_async(self, max_connections: Optional[int] = None):
+        """Her anahtar için çalışan olay döngüsüne bağlı async istemciyi hazırla"""
+        for key in self.keys:
+            key.async_client = get_client(self.provider, key.api_key, self.base_url, is_async=True,
+                                          max_connections=max_connections)
+
+    @property
+    def active_keys(self) -> List[PooledAPIKey]:
+        return [key for key in self.keys if key.disabled_reason is None]
+
+    def select(self, tokens: int = 0) -> PooledAPIKey:
+        """İsteği en kısa sürede karşılayabilecek anahtarı seç (rezervasyonu limiter.acquire yapar)"""
+        with self._lock:
+            active = self.active_keys
+            if not active:
+                raise NoUsableAPIKeyError(f"{self.provider}: havuzda kullanılabilir API anahtarı kalmadı")
+            key = min(active, key=lambda k: (k.rate_limiter.estimate_wait(tokens), k.stats['requests']))
+            key.stats['requests'] += 1
+            return key
+
+    def record_success(self, key: PooledAPIKey, tokens: int = 0):
+        """Başarılı çağrıyı anahtarın kullanımına ekle"""
+        with self._lock:
+            key.stats['successes'] += 1
+            key.stats['tokens'] += tokens
+
+    def record_failure(self, key: PooledAPIKey, error: Exception):
+        """Hatayı anahtara işle: 429'da anahtarı beklet, geçersiz/kotası bitmiş anahtarı çıkar"""
+        error_kind = classify_error(error)
+        with self._lock:
+            key.stats['errors'][error_kind] = key.stats['errors'].get(error_kind, 0) + 1
+            if error_kind == "auth":
+                self._disable(key, "auth")
+            elif error_kind == "rate_limit" and getattr(error, 'code', None) == "insufficient_quota":
+                self._disable(key, "quota")
+            elif error_kind == "rate_limit":
+                key.stats['rate_limited'] += 1
+        if error_kind == "rate_limit" and key.disabled_reason is None:
+            key.rate_limiter.penalize(retry_after_from_error(error) or KEY_COOLDOWN_SECONDS)
+
+    def _disable(self, key: PooledAPIKey, reason: str):
+        """Anahtarı havuzdan çıkar; kilit altında çağrılır"""
+        if key.disabled_reason is None:
+            key.disabled_reason = reason
+            logger.warning(f"🔑 API anahtarı devre dışı ({key.label}): {reason} "
+                           f"({len(self.active_keys)}/{len(self.keys)} anahtar aktif)")
+
+    def get_stats(self) -> Dict:
+        """Anahtar bazında kullanım (anahtarlar maskelenir)"""
+        with self._lock:
+            return {
+                'keys': len(self.keys),
+                'active_keys': len(self.active_keys),
+                'usage': [
+                    {
+                        'key': key.label,
+                        'status': key.disabled_reason or "active",
+                        **key.stats,
+                        'errors': dict(key.stats['errors']),
+                        'rate_limiter': key.rate_limiter.get_stats(),
+                    }
+                    for key in self.keys
+                ],
+            }
@@ -0,0 +1,246 @@
+import os
+import json
+import time
+import uuid
+import logging
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+TERMINAL_BATCH_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def batch_request(custom_id: str, messages: List[Dict], params: Dict) -> Dict:
+    """Batch dosyasının tek satırını (chat completion isteği) hazırla"""
+    return {
+        'custom_id': custom_id,
+        'method': 'POST',
+        'url': BATCH_ENDPOINT,
+        'body': {'messages': messages, **params}
+    }
+
+
+def write_batch_file(requests: List[Dict], path: str) -> str:
+    """İstekleri JSONL batch dosyasına yaz"""
+    with open(path, 'w', encoding='utf-8') as f:
+        for request in requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+    logger.info(f"📦 Batch dosyası yazıldı: {path} ({len(requests)} istek)")
+    return path
+
+
+def parse_batch_output(text: str) -> Dict[str, Dict]:
+    """
+    Batch çıktı dosyasını custom_id -> {content, tokens, prompt_tokens, completion_tokens, error} olarak ayrıştır
+
+    Başarısız satırlarda content None, error hata mesajıdır.
+    """
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get('response') or {}
+        body = response.get('body') or {}
+
+        if entry.get('error') or response.get('status_code', 200) >= 400 or not body.get('choices'):
+            error = entry.get('error') or body.get('error') or f"HTTP {response.get('status_code')}"
+            results[entry['custom_id']] = {'content': None, 'tokens': 0, 'prompt_tokens': 0,
+                                           'completion_tokens': 0, 'error': str(error)}
+            continue
+
+        usage = body.get('usage') or {}
+        results[entry['custom_id']] = {
+            'content': body['choices'][0]['message']['content'].strip(),
+            'tokens': usage.get('total_tokens', 0),
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'completion_tokens': usage.get('completion_tokens', 0),
+            'error': None
+        }
+    return results
+
+
+class BatchJobRunner:
+    def __init__(self, client, poll_interval: float = 30.0, completion_window: str = "24h",
+                 timeout: Optional[float] = None):
+        """
+        OpenAI uyumlu Batch API akışını yürüt: dosya yükle, batch oluştur, bekle, sonuçları indir
+
+        Args:
+            client: files/batches arayüzü olan istemci (openai.OpenAI, groq.Groq veya LocalBatchEmulator)
+            poll_interval (float): Durum sorguları arasındaki bekleme (saniye)
+            completion_window (str): Batch tamamlanma penceresi
+            timeout (float): Bu süre içinde tamamlanmazsa TimeoutError (None = sınırsız)
+        """
+        self.client = client
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self.timeout = timeout
+
+    def submit(self, batch_file: str, metadata: Optional[Dict] = None) -> str:
+        """Batch dosyasını yükle, batch işini oluştur ve kimliğini döndür"""
+        with open(batch_file, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+
+        options = {'metadata': metadata} if metadata else {}
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+            **options
+        )
+        logger.info(f"🚀 Batch gönderildi: {batch.id}")
+        return batch.id
+
+    def wait(self, batch_id: str):
+        """Batch terminal duruma gelene kadar durumunu sorgula"""
+        start = time.monotonic()
+        while True:
+            batch = self.client.batches.retrieve(batch_id)
+            counts = getattr(batch, 'request_counts', None)
+            if counts is not None:
+                logger.info(f"⏳ Batch {batch_id}: {batch.status} ({counts.completed}/{counts.total})")
+            else:
+                logger.info(f"⏳ Batch {batch_id}: {batch.status}")
+
+            if batch.status in TERMINAL_BATCH_STATUSES:
+                return batch
+            if self.timeout is not None and time.monotonic() - start > self.timeout:
+                raise TimeoutError(f"Batch {batch_id} {self.timeout} sn içinde tamamlanmadı")
+            time.sleep(self.poll_interval)
+
+    def download(self, batch) -> Dict[str, Dict]:
+        """Tamamlanan batch'in çıktı (ve hata) dosyalarını ayrıştır"""
+        results = {}
+        for file_id in (getattr(batch, 'error_file_id', None), getattr(batch, 'output_file_id', None)):
+            if file_id:
+                results.update(parse_batch_output(self.client.files.content(file_id).text))
+        return results
+
+    def run(self, batch_file: str, metadata: Optional[Dict] = None) -> Dict[str, Dict]:
+        """Gönder, bekle ve sonuçları custom_id -> sonuç olarak döndür"""
+        batch_id = self.submit(batch_file, metadata)
+        batch = self.wait(batch_id)
+        if batch.status != "completed":
+            logger.error(f"❌ Batch {batch_id} tamamlanamadı: {batch.status}")
+        return self.download(batch)
+
+
+class LocalBatchEmulator:
+    def __init__(self, work_dir: str = "batch_emulator", polls_until_complete: int = 1):
+        """
+        Batch API'nin dosya tabanlı çevrimdışı taklidi (llm_simulator ile yanıt üretir)
+
+        client.files.create/content ve client.batches.create/retrieve arayüzlerini
+        sağlar; BatchJobRunner ile API anahtarı olmadan uçtan uca test için kullanılır.
+
+        Args:
+            work_dir (str): Yüklenen ve üretilen dosyaların tutulduğu klasör
+            polls_until_complete (int): Batch'in kaç durum sorgusundan sonra tamamlanacağı
+        """
+        self.work_dir = work_dir
+        self.polls_until_complete = polls_until_complete
+        os.makedirs(work_dir, exist_ok=True)
+
+        # client.files.* ve client.batches.* erişimi için
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def _path(self, object_id: str) -> str:
+        return os.path.join(self.work_dir, f"{object_id}.jsonl" if object_id.startswith("file-") else f"{object_id}.json")
+
+    def _create_file(self, file, purpose: str = "batch"):
+        """Dosyayı çalışma klasörüne kopyala"""
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        with open(self._path(file_id), 'wb') as f:
+            f.write(file.read())
+        return SimpleNamespace(id=file_id, purpose=purpose)
+
+    def _file_content(self, file_id: str):
+        """Dosya içeriğini döndür"""
+        with open(self._path(file_id), 'r', encoding='utf-8') as f:
+            return SimpleNamespace(text=f.read())
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str, metadata: Optional[Dict] = None):
+        """Batch kaydını oluştur (istekler ilk tamamlanan sorguda işlenir)"""
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        with open(self._path(input_file_id), 'r', encoding='utf-8') as f:
+            total = sum(1 for line in f if line.strip())
+
+        state = {
+            'id': batch_id, 'status': 'validating', 'input_file_id': input_file_id,
+            'output_file_id': None, 'error_file_id': None, 'endpoint': endpoint,
+            'completion_window': completion_window, 'metadata': metadata or {},
+            'polls': 0, 'request_counts': {'total': total, 'completed': 0, 'failed': 0}
+        }
+        self._save_batch(state)
+        return self._batch_object(state)
+
+    def _retrieve_batch(self, batch_id: str):
+        """Batch durumunu döndür; yeterli sorgudan sonra istekleri işleyip tamamla"""
+        with open(self._path(batch_id), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+        if state['status'] not in TERMINAL_BATCH_STATUSES:
+            state['polls'] += 1
+            if state['polls'] >= self.polls_until_complete:
+                self._process(state)
+            else:
+                state['status'] = 'in_progress'
+            self._save_batch(state)
+
+        return self._batch_object(state)
+
+    def _process(self, state: Dict):
+        """Girdi dosyasındaki her isteğe simüle edilmiş yanıt üret"""
+        # llm_simulator enhanced_llm_analyzer'ı içe aktardığı için döngüsel importu önlemek adına burada
+        from llm_simulator import simulate_completion, estimate_tokens
+
+        output_id = f"file-{uuid.uuid4().hex[:12]}"
+        completed = failed = 0
+
+        with open(self._path(state['input_file_id']), 'r', encoding='utf-8') as source, \
+                open(self._path(output_id), 'w', encoding='utf-8') as output:
+            for line in source:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                body = request.get('body', {})
+                messages = body.get('messages') or []
+                if not messages:
+                    failed += 1
+                    entry = {'custom_id': request.get('custom_id'), 'response': None,
+                             'error': {'message': 'messages alanı boş'}}
+                else:
+                    content = simulate_completion(messages[-1].get('content', ''))
+                    prompt_tokens = estimate_tokens("\n".join(m.get('content', '') for m in messages))
+                    completion_tokens = min(estimate_tokens(content), body.get('max_tokens', 50))
+                    completed += 1
+                    entry = {
+                        'custom_id': request.get('custom_id'),
+                        'response': {'status_code': 200, 'body': {
+                            'model': body.get('model'),
+                            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}}],
+                            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                                      'total_tokens': prompt_tokens + completion_tokens}
+                        }},
+                        'error': None
+                    }
+                output.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        state['status'] = 'completed'
+        state['output_file_id'] = output_id
+        state['request_counts'] = {'total': completed + failed, 'completed': completed, 'failed': failed}
+
+    def _save_batch(self, state: Dict):
+        with open(self._path(state['id']), 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+
+    def _batch_object(self, state: Dict):
+        """Batch kaydını OpenAI Batch nesnesi biçiminde döndür"""
+        return SimpleNamespace(**{
+            **{key: value for key, value in state.items() if key != 'polls'},
+            'request_counts': SimpleNamespace(**state['request_counts'])
+        })
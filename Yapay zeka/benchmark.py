@@ -0,0 +1,317 @@
+import io
+import sys
+import json
+import time
+import asyncio
+import argparse
+import contextlib
+import itertools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from benchmark_batch import load_corpus
+from telemetry import percentile
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ANALYZERS = ("enhanced", "chat")
+TRANSPORTS = ("sim", "http")
+
+# Karşılaştırmada izlenen metrikler -> True: yüksek değer iyi, False: düşük değer iyi
+COMPARED_METRICS = {
+    'messages_per_sec': True,
+    'latency_p95': False,
+    'calls_per_message': False,
+    'peak_rss_mb': False,
+}
+
+# Bir sonucu baseline'daki karşılığıyla eşleştiren alanlar
+CASE_KEYS = ('analyzer', 'transport', 'mode', 'messages', 'concurrency', 'batch_size', 'latency')
+
+
+class _TimedCompletions:
+    """chat.completions.create çağrılarının süresini ölçen sarmalayıcı"""
+
+    def __init__(self, completions, samples: List[float]):
+        self._completions = completions
+        self._samples = samples
+
+    def create(self, **kwargs):
+        started = time.perf_counter()
+        response = self._completions.create(**kwargs)
+        self._samples.append(time.perf_counter() - started)
+        return response
+
+
+class _AsyncTimedCompletions(_TimedCompletions):
+    async def create(self, **kwargs):
+        started = time.perf_counter()
+        response = await self._completions.create(**kwargs)
+        self._samples.append(time.perf_counter() - started)
+        return response
+
+
+class _TimedClient:
+    """İstemcinin chat.completions erişimini süre ölçen sarmalayıcıyla değiştirir, kalanını aktarır"""
+
+    def __init__(self, client, samples: List[float], is_async: bool = False):
+        self._client = client
+        wrapper = _AsyncTimedCompletions if is_async else _TimedCompletions
+        self.chat = SimpleNamespace(completions=wrapper(client.chat.completions, samples))
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Sürecin en yüksek bellek kullanımı (MB; Linux'ta KB, macOS'ta bayt döner)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _build_clients(case: Dict):
+    """Simüle edilen (süreç içi) istemcileri oluştur; http modunda None döner"""
+    if case['transport'] != "sim":
+        return None, None
+    from llm_simulator import SimulatedLLMClient, AsyncSimulatedLLMClient
+    options = dict(latency=case['latency'], per_token_latency=case['per_token_latency'],
+                   jitter=case['jitter'], seed=case['seed'])
+    return SimulatedLLMClient(**options), AsyncSimulatedLLMClient(**options)
+
+
+def run_case(case: Dict) -> Dict:
+    """
+    Tek bir yapılandırmayı ölç
+
+    Her yapılandırma ayrı bir süreçte çalıştırılır; böylece peak RSS yalnızca
+    bu çalışmayı yansıtır ve önceki çalışmaların önbellekleri sonucu etkilemez.
+    """
+    logging.disable(logging.WARNING)
+    from rate_limiter import TokenBucketRateLimiter
+
+    corpus = load_corpus(case['input'], case['messages'])
+    if case['unique_texts']:
+        # Tekilleştirme ve önbellek kazancını ölçümden çıkarmak için metinleri farklılaştır
+        for message in corpus:
+            message['message'] = f"{message['message']} (#{message['message_id']})"
+
+    client, async_client = _build_clients(case)
+    samples: List[float] = []
+
+    if case['analyzer'] == "enhanced":
+        from enhanced_llm_analyzer import EnhancedLLMAnalyzer
+        # Sınırsız limiter: ölçülen süre yalnızca sağlayıcı gecikmesini yansıtır
+        analyzer = EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", batch_size=case['batch_size'],
+                                       client=client, async_client=async_client,
+                                       rate_limiter=TokenBucketRateLimiter(), base_url=case['base_url'])
+        analyzer.setup_async_client()
+        analyzer.client = _TimedClient(analyzer.client, samples)
+        if analyzer.async_client is not None:
+            analyzer.async_client = _TimedClient(analyzer.async_client, samples, is_async=True)
+
+        start = time.perf_counter()
+        if case['mode'] == "async":
+            asyncio.run(analyzer.analyze_conversation_async(corpus, max_concurrency=case['concurrency']))
+        elif case['concurrency'] > 1:
+            analyzer.analyze_conversation_threaded(corpus, max_workers=case['concurrency'])
+        else:
+            analyzer.analyze_conversation(corpus)
+        elapsed = time.perf_counter() - start
+        api_calls = analyzer.api_calls
+    else:
+        from llm_analyzer import LLMChatAnalyzer
+        analyzer = LLMChatAnalyzer(provider="openai", base_url=case['base_url'], client=client)
+        analyzer.client = _TimedClient(analyzer.client, samples)
+        analyzer.rate_limiter = TokenBucketRateLimiter()
+
+        start = time.perf_counter()
+        # Mesaj başına ilerleme çıktısı tabloyu bozmasın
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer.analyze_conversation_llm(corpus, max_workers=case['concurrency'])
+        elapsed = time.perf_counter() - start
+        api_calls = len(samples)
+
+    samples.sort()
+    return {
+        **{key: case[key] for key in CASE_KEYS},
+        'seconds': round(elapsed, 3),
+        'messages_per_sec': round(len(corpus) / elapsed, 2) if elapsed else 0,
+        'api_calls': api_calls,
+        'calls_per_message': round(api_calls / len(corpus), 3) if corpus else 0,
+        'latency_p50': round(percentile(samples, 50), 4) if samples else None,
+        'latency_p95': round(percentile(samples, 95), 4) if samples else None,
+        'peak_rss_mb': _peak_rss_mb()
+    }
+
+
+def _run_isolated(case: Dict) -> Dict:
+    """Yapılandırmayı yeni (spawn) bir süreçte çalıştır"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_case, case).result()
+
+
+def build_cases(args) -> List[Dict]:
+    """Tarama parametrelerinin kartezyen çarpımından yapılandırmaları üret"""
+    cases = []
+    for analyzer, messages, concurrency, batch_size, latency in itertools.product(
+            args.analyzers, args.messages, args.concurrency, args.batch_sizes, args.latencies):
+        if analyzer == "chat" and batch_size > 1:
+            # LLMChatAnalyzer toplu prompt desteklemez
+            continue
+        mode = "async" if args.use_async and analyzer == "enhanced" else ("threaded" if concurrency > 1 else "sequential")
+        cases.append({
+            'analyzer': analyzer, 'transport': args.transport, 'mode': mode, 'messages': messages,
+            'concurrency': concurrency, 'batch_size': batch_size, 'latency': latency,
+            'per_token_latency': args.per_token_latency, 'jitter': args.jitter, 'seed': args.seed,
+            'input': args.input, 'unique_texts': args.unique_texts, 'base_url': None
+        })
+    return cases
+
+
+def run_sweep(cases: List[Dict], transport: str, latency_dist: str, latency_spread: float,
+              per_token_latency: float, seed: int) -> List[Dict]:
+    """Yapılandırmaları sırayla ölç (http modunda her gecikme değeri için bir mock sunucu açılır)"""
+    results = []
+    for latency, group in itertools.groupby(sorted(cases, key=lambda case: case['latency']),
+                                            key=lambda case: case['latency']):
+        group = list(group)
+        if transport == "http":
+            from mock_llm_server import MockLLMServer, LatencyModel
+            server = MockLLMServer(latency=LatencyModel(latency_dist, latency, latency_spread,
+                                                        per_token_latency, seed)).start()
+        else:
+            server = None
+        try:
+            for case in group:
+                case['base_url'] = server.base_url if server else None
+                result = _run_isolated(case)
+                results.append(result)
+                print(f"{result['analyzer']:>8} | {result['mode']:>10} | {result['messages']:>6} | "
+                      f"{result['concurrency']:>4} | {result['batch_size']:>5} | {result['latency']:>7} | "
+                      f"{result['messages_per_sec']:>9} | {result['latency_p50']!s:>7} | "
+                      f"{result['latency_p95']!s:>7} | {result['calls_per_message']:>8} | {result['peak_rss_mb']!s:>7}")
+        finally:
+            if server is not None:
+                server.stop()
+    return results
+
+
+def compare_with_baseline(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[Dict]:
+    """
+    Sonuçları baseline ile karşılaştır
+
+    Her metrik için göreli değişim raporlanır; iyi yönün tersine tolerance'tan
+    fazla kayan metrikler regresyon olarak işaretlenir.
+    """
+    baseline_by_key = {tuple(entry.get(key) for key in CASE_KEYS): entry for entry in baseline}
+    comparison = []
+    for result in results:
+        reference = baseline_by_key.get(tuple(result[key] for key in CASE_KEYS))
+        if reference is None:
+            continue
+
+        deltas, regressions = {}, []
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = reference.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            deltas[metric] = round(change, 4)
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(metric)
+
+        comparison.append({**{key: result[key] for key in CASE_KEYS}, 'deltas': deltas, 'regressions': regressions})
+    return comparison
+
+
+def _parse_list(value: str, cast=int) -> List:
+    return [cast(item) for item in value.split(',') if item.strip()]
+
+
+def main():
+    """Uçtan uca analiz hattı throughput benchmark'ı"""
+    parser = argparse.ArgumentParser(description="LLM analiz hattı uçtan uca benchmark'ı (API anahtarı gerekmez)")
+    parser.add_argument('--input', default='sample_chat_data.json', help='Örnek sohbet JSON dosyası')
+    parser.add_argument('--analyzers', default='enhanced', type=lambda v: _parse_list(v, str),
+                        help=f"Virgülle ayrılmış analizörler ({', '.join(ANALYZERS)})")
+    parser.add_argument('--transport', default='http', choices=TRANSPORTS,
+                        help='sim: süreç içi simülatör, http: mock_llm_server üzerinden')
+    parser.add_argument('--messages', default='100', type=_parse_list, help='Virgülle ayrılmış korpus boyutları')
+    parser.add_argument('--concurrency', default='1,8', type=_parse_list, help='Virgülle ayrılmış eşzamanlılık değerleri')
+    parser.add_argument('--batch-sizes', default='1', type=_parse_list, help='Virgülle ayrılmış batch boyutları')
+    parser.add_argument('--latencies', default='0.1', type=lambda v: _parse_list(v, float),
+                        help='Virgülle ayrılmış ortalama çağrı gecikmeleri (sn)')
+    parser.add_argument('--latency-dist', default='lognormal', help='http modunda gecikme dağılımı')
+    parser.add_argument('--latency-spread', type=float, default=0.5, help='http modunda gecikme dağılım genişliği')
+    parser.add_argument('--per-token-latency', type=float, default=0.002, help='Token başına ek gecikme (sn)')
+    parser.add_argument('--jitter', type=float, default=0.2, help='sim modunda gecikme jitter oranı')
+    parser.add_argument('--seed', type=int, default=42, help='Rastgelelik tohumu')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='EnhancedLLMAnalyzer için analyze_conversation_async kullan')
+    parser.add_argument('--unique-texts', action='store_true',
+                        help='Metinleri farklılaştırarak tekilleştirme kazancını devre dışı bırak')
+    parser.add_argument('--output', default=None, help='Sonuç JSON dosyası')
+    parser.add_argument('--baseline', default=None, help='Karşılaştırılacak baseline JSON dosyası')
+    parser.add_argument('--save-baseline', default=None, help='Sonuçları baseline olarak bu dosyaya yaz')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='Regresyon eşiği (0.10 = %%10)')
+    args = parser.parse_args()
+
+    unknown = set(args.analyzers) - set(ANALYZERS)
+    if unknown:
+        parser.error(f"Bilinmeyen analizör(ler): {sorted(unknown)}")
+
+    # Mock sunucu ve analizör logları tabloyu bozmasın
+    logging.getLogger('mock_llm_server').setLevel(logging.WARNING)
+
+    cases = build_cases(args)
+    print(f"🏁 {len(cases)} yapılandırma ölçülecek ({args.transport})")
+    print(f"{'Analizör':>8} | {'Mod':>10} | {'Mesaj':>6} | {'Eşz.':>4} | {'Batch':>5} | {'Gecikme':>7} | "
+          f"{'Mesaj/sn':>9} | {'p50':>7} | {'p95':>7} | {'Çağrı/m':>8} | {'RSS MB':>7}")
+    print("-" * 105)
+    results = run_sweep(cases, args.transport, args.latency_dist, args.latency_spread,
+                        args.per_token_latency, args.seed)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'settings': {key: value for key, value in vars(args).items()
+                     if key not in ('output', 'baseline', 'save_baseline')},
+        'results': results
+    }
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['baseline'] = args.baseline
+        report['comparison'] = compare_with_baseline(results, baseline.get('results', []), args.tolerance)
+
+        print(f"\n📏 Baseline karşılaştırması ({args.baseline}, tolerans %{args.tolerance * 100:.0f}):")
+        for entry in report['comparison']:
+            changes = ", ".join(f"{metric} {delta:+.1%}" for metric, delta in entry['deltas'].items())
+            status = f"❌ regresyon: {', '.join(entry['regressions'])}" if entry['regressions'] else "✅"
+            print(f"  {entry['analyzer']}/{entry['mode']} m={entry['messages']} c={entry['concurrency']} "
+                  f"b={entry['batch_size']} l={entry['latency']}: {changes} {status}")
+        if any(entry['regressions'] for entry in report['comparison']):
+            exit_code = 1
+
+    output = args.output or f"benchmark_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    for path in filter(None, (output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"💾 Sonuçlar kaydedildi: {path}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
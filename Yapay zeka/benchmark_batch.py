@@ -0,0 +1,72 @@
+import argparse
+import json
+import time
+import logging
+from typing import Dict, List
+
+from enhanced_llm_analyzer import EnhancedLLMAnalyzer
+from llm_simulator import SimulatedLLMClient
+from rate_limiter import TokenBucketRateLimiter
+
+
+def load_corpus(path: str, size: int) -> List[Dict]:
+    """Örnek sohbet verisini istenen mesaj sayısına kadar tekrarlayarak yükle"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    messages = data['messages'] if isinstance(data, dict) else data
+    corpus = []
+    for i in range(size):
+        message = dict(messages[i % len(messages)])
+        message['message_id'] = i + 1
+        corpus.append(message)
+    return corpus
+
+
+def run_benchmark(corpus: List[Dict], batch_size: int, latency: float, per_token_latency: float) -> Dict:
+    """Tek bir batch boyutu için analiz süresini ölç"""
+    client = SimulatedLLMClient(latency=latency, per_token_latency=per_token_latency, seed=42)
+    # Sınırsız limiter: ölçülen süre yalnızca simüle edilen gecikmeyi yansıtır
+    analyzer = EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", batch_size=batch_size, client=client,
+                                   rate_limiter=TokenBucketRateLimiter())
+
+    start = time.perf_counter()
+    analyzer.analyze_conversation(corpus)
+    elapsed = time.perf_counter() - start
+
+    return {
+        'batch_size': batch_size,
+        'messages': len(corpus),
+        'seconds': round(elapsed, 3),
+        'messages_per_sec': round(len(corpus) / elapsed, 2) if elapsed else 0,
+        'api_calls': analyzer.api_calls,
+        'retried_messages': analyzer.batch_stats['retried_messages']
+    }
+
+
+def main():
+    """Batch boyutuna göre mesaj/saniye karşılaştırması"""
+    parser = argparse.ArgumentParser(description="Toplu (batch) analiz benchmark'ı")
+    parser.add_argument('--input', default='sample_chat_data.json', help='Örnek sohbet JSON dosyası')
+    parser.add_argument('--messages', type=int, default=100, help='Analiz edilecek mesaj sayısı')
+    parser.add_argument('--batch-sizes', default='1,5,10,20', help='Virgülle ayrılmış batch boyutları')
+    parser.add_argument('--latency', type=float, default=0.3, help='Simüle edilen çağrı gecikmesi (sn)')
+    parser.add_argument('--per-token-latency', type=float, default=0.005, help='Token başına ek gecikme (sn)')
+    args = parser.parse_args()
+
+    # Mesaj başına log satırları ölçümü bozmasın
+    logging.getLogger('enhanced_llm_analyzer').setLevel(logging.WARNING)
+
+    corpus = load_corpus(args.input, args.messages)
+    batch_sizes = [int(size) for size in args.batch_sizes.split(',') if size.strip()]
+
+    print(f"{'Batch':>6} | {'Mesaj/sn':>9} | {'Süre (sn)':>9} | {'API çağrısı':>11} | {'Tekrar':>6}")
+    print("-" * 55)
+    for batch_size in batch_sizes:
+        result = run_benchmark(corpus, batch_size, args.latency, args.per_token_latency)
+        print(f"{result['batch_size']:>6} | {result['messages_per_sec']:>9} | {result['seconds']:>9} | "
+              f"{result['api_calls']:>11} | {result['retried_messages']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -176,10 +176,8 @@ class DugumBuketiChatAnalyzer:
         
         return 'Hayır'
     
-    def analyze_conversation(self, json_data):
-        """JSON formatındaki konuşmayı analiz et"""
-        results = []
-        
+    def _load_messages(self, json_data):
+        """JSON verisinden mesaj listesini çıkar"""
         if isinstance(json_data, str):
             conversation = json.loads(json_data)
         else:
@@ -193,6 +191,12 @@ class DugumBuketiChatAnalyzer:
         else:
             messages = [conversation]
         
+        return messages
+    
+    def iter_analyze_conversation(self, json_data):
+        """JSON formatındaki konuşmayı analiz et, sonuçları tek tek üret (generator)"""
+        messages = self._load_messages(json_data)
+        
         for i, message in enumerate(messages):
             message_text = message.get('message', '')
             
@@ -210,9 +214,11 @@ class DugumBuketiChatAnalyzer:
                 'intent': self.classify_intent(message_text)
             }
             
-            results.append(analysis)
-        
-        return results
+            yield analysis
+    
+    def analyze_conversation(self, json_data):
+        """JSON formatındaki konuşmayı analiz et"""
+        return list(self.iter_analyze_conversation(json_data))
     
     def save_to_csv(self, results, filename='dugum_buketi_analiz.csv'):
         """Sonuçları CSV dosyasına kaydet"""
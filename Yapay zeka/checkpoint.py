@@ -0,0 +1,88 @@
+import os
+import json
+import threading
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointJournal:
+    def __init__(self, path: str, fsync: bool = True):
+        """
+        Analiz sonuçları için yalnızca eklemeli (append-only) JSONL günlüğü
+
+        Her satır bir sonuç kaydıdır ve (conversation_id, message_id) ile
+        anahtarlanır. Her yazımdan sonra dosya diske aktarılır; böylece yarıda
+        kalan bir analiz yalnızca o an uçuşta olan istekleri kaybeder.
+
+        Args:
+            path (str): Günlük dosyasının yolu
+            fsync (bool): Her yazımdan sonra os.fsync çağrılsın mı
+        """
+        self.path = path
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self.written = 0
+
+        # Çökme anında yarım kalan satır varsa yeni kayıtlar alt satırdan başlar
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+
+        self._file = open(path, 'a', encoding='utf-8')
+        if needs_newline:
+            self._file.write("\n")
+
+    def load(self, conversation_id: str) -> Dict[str, Dict]:
+        """Konuşma için kaydedilmiş sonuçları message_id -> satır olarak döndür (son kayıt geçerlidir)"""
+        rows = {}
+        if not os.path.exists(self.path):
+            return rows
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Çökme anında yarım kalan son satır atlanır
+                    logger.warning(f"⚠️ Checkpoint satırı okunamadı ({self.path}:{line_number})")
+                    continue
+                if entry.get('conversation_id') == conversation_id:
+                    rows[str(entry['message_id'])] = entry['row']
+
+        return rows
+
+    def append(self, conversation_id: str, rows: List[Dict]):
+        """Sonuç satırlarını günlüğe ekle ve diske aktar"""
+        if not rows:
+            return
+
+        lines = "".join(
+            json.dumps({'conversation_id': conversation_id, 'message_id': row['message_id'], 'row': row},
+                       ensure_ascii=False, default=str) + "\n"
+            for row in rows
+        )
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.written += len(rows)
+
+    def close(self):
+        """Günlük dosyasını kapat"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,144 @@
+import time
+import threading
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Tekrar denenmesi anlamsız hata türleri
+NON_RETRIABLE_ERRORS = {"auth", "client"}
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """Hatadan HTTP durum kodunu çıkar (OpenAI/Groq/Hugging Face)"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def classify_error(error: Exception) -> str:
+    """
+    API hatasını sınıflandır
+
+    Returns:
+        "auth": 401/403 - anahtar geçersiz, tekrar denenmez
+        "client": Diğer 4xx - istek hatalı, tekrar denenmez
+        "rate_limit": 429 - geçici
+        "transient": 5xx, zaman aşımı, bağlantı hatası - geçici
+    """
+    status = _status_code(error)
+    name = type(error).__name__
+
+    if status in (401, 403) or name in ("AuthenticationError", "PermissionDeniedError"):
+        return "auth"
+    if status == 429 or name == "RateLimitError":
+        return "rate_limit"
+    if status is not None and 400 <= status < 500:
+        return "client"
+    return "transient"
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 60.0):
+        """
+        Provider kesintilerinde çağrıları durduran devre kesici
+
+        Ardışık geçici hata (5xx, zaman aşımı, bağlantı) sayısı eşiği aşınca (veya
+        kimlik doğrulama hatasında hemen) devre açılır ve çağrılar API'ye gitmeden
+        reddedilir. rate_limit (429) ve client (diğer 4xx) hataları devreyi açan
+        sayıma katılmaz. recovery_timeout sonrasında tek bir deneme (probe) çağrısına
+        izin verilir; başarılı olursa devre kapanır.
+
+        Args:
+            failure_threshold (int): Devreyi açan ardışık hata sayısı
+            recovery_timeout (float): Açık devrenin probe öncesi bekleme süresi (saniye)
+        """
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+        self.stats = {'trips': 0, 'rejected': 0, 'probes': 0, 'failures': {}}
+
+    @property
+    def state(self) -> str:
+        """Devrenin durumu (açık devrede süre dolduysa half_open)"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Çağrı yapılabilir mi (half_open durumunda yalnızca tek probe'a izin verilir)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                self._state = HALF_OPEN
+
+            if self._state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self.stats['probes'] += 1
+                logger.info("🔌 Devre yarı açık: provider deneme çağrısı yapılıyor")
+                return True
+
+            self.stats['rejected'] += 1
+            return False
+
+    def record_success(self):
+        """Başarılı çağrıyı kaydet ve devreyi kapat"""
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("✅ Provider yanıt veriyor, devre kapatıldı")
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, kind: str):
+        """Başarısız çağrıyı kaydet, gerekirse devreyi aç"""
+        with self._lock:
+            self.stats['failures'][kind] = self.stats['failures'].get(kind, 0) + 1
+
+            # İstek kaynaklı hatalar provider sağlığını göstermez; 429'da provider ayaktadır,
+            # geri basıncı rate limiter (penalize) ve AIMD denetleyici karşılar
+            if kind in ("client", "rate_limit"):
+                self._probe_in_flight = False
+                return
+
+            self._consecutive_failures += 1
+            if (kind == "auth" or self._state == HALF_OPEN
+                    or self._consecutive_failures >= self.failure_threshold):
+                self._trip(kind)
+
+    def _trip(self, kind: str):
+        """Devreyi aç"""
+        if self._state != OPEN:
+            self.stats['trips'] += 1
+            logger.error(f"🚨 Devre açıldı ({kind}): {self.recovery_timeout:.0f} sn boyunca kural tabanlı analiz kullanılacak")
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def get_stats(self) -> Dict:
+        """Devre durumu ve sayaçlar"""
+        state = self.state
+        with self._lock:
+            return {
+                'state': state,
+                'failure_threshold': self.failure_threshold,
+                'recovery_timeout': self.recovery_timeout,
+                'trips': self.stats['trips'],
+                'rejected': self.stats['rejected'],
+                'probes': self.stats['probes'],
+                'failures': dict(self.stats['failures'])
+            }
@@ -0,0 +1,193 @@
+import asyncio
+import hashlib
+import importlib.util
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from llm_executor import resolve_worker_limit
+
+logger = logging.getLogger(__name__)
+
+# Boşta kalan bağlantıların açık tutulacağı süre (SDK varsayılanı 5 sn; aralıklı
+# burst'lerde her seferinde yeniden TLS el sıkışması yapılmasın)
+KEEPALIVE_EXPIRY = 30.0
+
+# Havuzlu istemcisi oluşturulabilen provider'lar (httpx tabanlı SDK'lar)
+POOLED_PROVIDERS = ("openai", "groq", "anthropic")
+
+# HTTP/2 için h2 paketi gerekir (pip install httpx[http2]); yoksa HTTP/1.1 keep-alive kullanılır
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _key_fingerprint(api_key: Optional[str]) -> str:
+    """API anahtarının kısa özeti (anahtar istatistiklerde açık yazılmaz)"""
+    return hashlib.sha256((api_key or "").encode('utf-8')).hexdigest()[:12]
+
+
+def _sdk_module(provider: str):
+    """Provider'ın SDK modülünü yükle"""
+    try:
+        if provider == "openai":
+            import openai as sdk
+        elif provider == "groq":
+            import groq as sdk
+        elif provider == "anthropic":
+            import anthropic as sdk
+        else:
+            raise ValueError(f"Havuzlu istemci desteklenmiyor: {provider} ({', '.join(POOLED_PROVIDERS)})")
+    except ImportError:
+        raise ValueError(f"{provider} kütüphanesi yüklü değil! pip install {provider}")
+    return sdk
+
+
+class _PooledClient:
+    """Registry kaydı: SDK istemcisi, altındaki httpx istemcisi ve kullanım sayaçları"""
+
+    def __init__(self, provider: str, api_key: Optional[str], base_url: Optional[str], is_async: bool,
+                 max_connections: int):
+        import httpx
+
+        self.provider = provider
+        self.base_url = base_url
+        self.is_async = is_async
+        self.max_connections = max_connections
+        self.http2 = HTTP2_AVAILABLE
+        self.requests = 0
+        self.acquired = 0
+        # Async havuzdaki bağlantılar oluşturuldukları olay döngüsüne bağlıdır
+        self.loop = _running_loop() if is_async else None
+        self._lock = threading.Lock()
+
+        sdk = _sdk_module(provider)
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections,
+                              keepalive_expiry=KEEPALIVE_EXPIRY)
+        if is_async:
+            async def count_request(request):
+                self._count_request()
+
+            # Eski SDK sürümlerinde Default*HttpxClient yoksa düz httpx istemcisi kullanılır
+            http_client_class = getattr(sdk, 'DefaultAsyncHttpxClient', httpx.AsyncClient)
+            client_class = {'openai': 'AsyncOpenAI', 'groq': 'AsyncGroq', 'anthropic': 'AsyncAnthropic'}[provider]
+        else:
+            def count_request(request):
+                self._count_request()
+
+            http_client_class = getattr(sdk, 'DefaultHttpxClient', httpx.Client)
+            client_class = {'openai': 'OpenAI', 'groq': 'Groq', 'anthropic': 'Anthropic'}[provider]
+
+        self.http_client = http_client_class(limits=limits, http2=self.http2,
+                                             event_hooks={'request': [count_request]})
+        options = {'api_key': api_key, 'http_client': self.http_client}
+        if base_url:
+            options['base_url'] = base_url
+        self.client = getattr(sdk, client_class)(**options)
+
+    def _count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def _pool_connections(self) -> Optional[List]:
+        """httpcore havuzundaki bağlantılar (iç API; erişilemezse None)"""
+        try:
+            return list(self.http_client._transport._pool.connections)
+        except AttributeError:
+            return None
+
+    def stats(self) -> Dict:
+        connections = self._pool_connections()
+        return {
+            'provider': self.provider,
+            'base_url': self.base_url,
+            'async': self.is_async,
+            'http2': self.http2,
+            'max_connections': self.max_connections,
+            'keepalive_expiry': KEEPALIVE_EXPIRY,
+            'acquired': self.acquired,
+            'requests': self.requests,
+            'connections_open': len(connections) if connections is not None else None,
+            'connections_idle': sum(1 for c in connections if c.is_idle()) if connections is not None else None,
+        }
+
+
+_clients: Dict[Tuple, _PooledClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _registry_key(provider: str, api_key: Optional[str], base_url: Optional[str], is_async: bool) -> Tuple:
+    # Async istemciler olay döngüsü başına ayrı tutulur (ör. her asyncio.run yeni bir döngüdür)
+    loop = _running_loop() if is_async else None
+    return provider, _key_fingerprint(api_key), base_url or "", is_async, id(loop) if loop else None
+
+
+def _prune_closed_loops():
+    """Olay döngüsü kapanmış async kayıtlarını sil (kilit altında çağrılır)"""
+    for key in [key for key, entry in _clients.items() if entry.loop is not None and entry.loop.is_closed()]:
+        del _clients[key]
+
+
+def get_client(provider: str, api_key: Optional[str], base_url: Optional[str] = None, is_async: bool = False,
+               max_connections: Optional[int] = None):
+    """
+    Süreç genelinde provider/anahtar/base_url başına paylaşılan SDK istemcisini döndür
+
+    Aynı kimlik bilgileriyle kurulan tüm analizörler tek bir bağlantı havuzunu
+    (keep-alive, h2 yüklüyse HTTP/2) kullanır. Havuz boyutu verilmezse provider'ın
+    varsayılan worker sayısıdır; daha büyük bir havuz istenirse istemci yeniden
+    oluşturulur (eski istemciyi tutanlar onu kullanmaya devam eder). Async istemciler
+    çağrıldıkları olay döngüsüne göre ayrılır.
+
+    Args:
+        provider (str): "openai", "groq" veya "anthropic"
+        api_key (str): API anahtarı
+        base_url (str): Uyumlu sunucu adresi (None = SDK varsayılanı)
+        is_async (bool): Asenkron istemci mi
+        max_connections (int): En az bu kadar eşzamanlı bağlantı (ör. analizin eşzamanlılığı)
+    """
+    max_connections = max(max_connections or 0, resolve_worker_limit(provider))
+    key = _registry_key(provider, api_key, base_url, is_async)
+    with _clients_lock:
+        entry = _clients.get(key)
+        if entry is None or entry.max_connections < max_connections or (is_async and entry.loop is not _running_loop()):
+            if is_async:
+                _prune_closed_loops()
+            entry = _PooledClient(provider, api_key, base_url, is_async, max_connections)
+            _clients[key] = entry
+            logger.info(f"🔌 Havuzlu {'async ' if is_async else ''}istemci: {provider} "
+                        f"(bağlantı: {max_connections}, HTTP/2: {'açık' if entry.http2 else 'kapalı'})")
+        entry.acquired += 1
+        return entry.client
+
+
+def client_pool_stats(provider: Optional[str] = None, api_key: Optional[str] = None,
+                      base_url: Optional[str] = None) -> List[Dict]:
+    """Havuz istatistikleri (filtre verilirse yalnızca eşleşen provider/anahtar/base_url)"""
+    with _clients_lock:
+        entries = list(_clients.items())
+    stats = []
+    for (entry_provider, fingerprint, entry_base_url, _, _), entry in entries:
+        if provider is not None and entry_provider != provider:
+            continue
+        if api_key is not None and fingerprint != _key_fingerprint(api_key):
+            continue
+        if base_url is not None and entry_base_url != base_url:
+            continue
+        stats.append({**entry.stats(), 'key': fingerprint})
+    return stats
+
+
+def close_clients():
+    """Tüm havuzlu istemcileri kapat (senkron istemciler; async istemciler kendi döngülerinde kapanır)"""
+    with _clients_lock:
+        entries = list(_clients.values())
+        _clients.clear()
+    for entry in entries:
+        if not entry.is_async:
+            entry.http_client.close()
@@ -0,0 +1,341 @@
+import os
+import glob
+import json
+import time
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from result_sinks import CSVSink, JSONLSink
+
+logger = logging.getLogger(__name__)
+
+# Birleştirilmiş sonuçlarda bölüm (partition) başına en fazla satır
+DEFAULT_PARTITION_ROWS = 100000
+
+# Konuşma durumları
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
+# Worker süreç başına analizör ve olay döngüsü (initializer ile bir kez kurulur)
+_worker_state: Dict = {}
+
+
+def load_chat_messages(path: str) -> List[Dict]:
+    """Chat JSON dosyasından mesaj listesini yükle ('messages' sözlüğü veya liste formatı)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        chat_data_raw = json.load(f)
+
+    if isinstance(chat_data_raw, dict) and 'messages' in chat_data_raw:
+        chat_data = chat_data_raw['messages']
+    elif isinstance(chat_data_raw, list):
+        chat_data = chat_data_raw
+    else:
+        raise ValueError("Geçersiz JSON formatı! 'messages' anahtarı veya liste formatı bekleniyor.")
+
+    # Mesaj formatını düzelt (id -> message_id)
+    for message in chat_data:
+        if 'id' in message and 'message_id' not in message:
+            message['message_id'] = message['id']
+    return chat_data
+
+
+def is_corpus_source(source: str) -> bool:
+    """Kaynak bir klasör veya glob kalıbı mı (tek dosya değil)"""
+    return os.path.isdir(source) or glob.has_magic(source)
+
+
+def discover_conversations(source: str) -> Dict[str, str]:
+    """
+    Klasör (alt klasörler dahil *.json) veya glob kalıbındaki konuşma dosyalarını bul
+
+    Returns:
+        conversation_id -> dosya yolu; conversation_id ortak köke göre uzantısız göreli yoldur
+    """
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "**", "*.json"), recursive=True)
+    else:
+        paths = glob.glob(source, recursive=True)
+    paths = sorted(os.path.abspath(path) for path in paths if os.path.isfile(path))
+    if not paths:
+        return {}
+
+    root = os.path.abspath(source) if os.path.isdir(source) else os.path.commonpath([os.path.dirname(p) for p in paths])
+    return {os.path.splitext(os.path.relpath(path, root))[0].replace(os.sep, "/"): path for path in paths}
+
+
+def build_worker_analyzer(analyzer_options: Dict, cache_path: Optional[str] = None, share: int = 1):
+    """
+    Worker için kendi istemcisiyle analizör kur
+
+    Provider RPM/TPM bütçesi (farklı provider'a giden hedge'lerinki dahil) share kadar
+    worker arasında paylaştırılır.
+    """
+    from enhanced_llm_analyzer import EnhancedLLMAnalyzer
+    from llm_cache import LLMResponseCache
+    from rate_limiter import TokenBucketRateLimiter, resolve_rate_limits
+
+    analyzer = EnhancedLLMAnalyzer(**analyzer_options,
+                                   cache=LLMResponseCache(cache_path) if cache_path else None)
+
+    share = max(1, share)
+
+    def shared_limiter(provider: str, model: str) -> TokenBucketRateLimiter:
+        rpm, tpm = resolve_rate_limits(provider, model)
+        return TokenBucketRateLimiter(rpm / share if rpm else None, tpm / share if tpm else None)
+
+    analyzer.rate_limiter = shared_limiter(analyzer.provider, analyzer.model)
+    if analyzer._hedge_rate_limiter is not None:
+        analyzer._hedge_rate_limiter = shared_limiter(analyzer.hedge_provider, analyzer.hedge_model)
+    if analyzer.key_pool is not None:
+        analyzer.key_pool.share_rate_limits(share)
+    return analyzer
+
+
+def _init_worker(analyzer_options: Dict, cache_path: Optional[str], workers: int):
+    """Worker sürecinde kendi istemcisiyle analizörü kur (süreç başına bir kez)"""
+    _worker_state['analyzer'] = build_worker_analyzer(analyzer_options, cache_path, workers)
+    # Asenkron istemci tek bir olay döngüsüne bağlı kalmalı; konuşmalar aynı döngüde çalışır
+    _worker_state['loop'] = asyncio.new_event_loop()
+
+
+def _analyze_conversation_file(conversation_id: str, path: str, part_path: str, concurrency: int) -> Dict:
+    """Worker sürecindeki analizörle konuşmayı analiz et"""
+    return analyze_conversation_to_part(_worker_state['analyzer'], _worker_state['loop'],
+                                        conversation_id, path, part_path, concurrency)
+
+
+def analyze_conversation_to_part(analyzer, loop: asyncio.AbstractEventLoop, conversation_id: str, path: str,
+                                 part_path: str, concurrency: int = 1) -> Dict:
+    """Tek konuşma dosyasını analiz et, satırları bölüm dosyasına yaz ve durum kaydını döndür"""
+    status = {'conversation_id': conversation_id, 'source': path, 'pid': os.getpid()}
+    calls, tokens = analyzer.api_calls, analyzer.total_tokens
+    started = time.perf_counter()
+
+    try:
+        messages = load_chat_messages(path)
+        if concurrency > 1 and analyzer.supports_async:
+            df = loop.run_until_complete(
+                analyzer.analyze_conversation_async(messages, max_concurrency=concurrency)
+            )
+        elif concurrency > 1:
+            df = analyzer.analyze_conversation_threaded(messages, max_workers=concurrency)
+        else:
+            df = analyzer.analyze_conversation(messages)
+
+        # Yarım dosya kalmaması için önce geçici adla yazılır
+        temp_path = f"{part_path}.tmp"
+        with JSONLSink(temp_path) as sink:
+            sink.write_all({'conversation_id': conversation_id, **row} for row in df.to_dict('records'))
+        os.replace(temp_path, part_path)
+
+        status.update(status=STATUS_OK, messages=len(messages), rows=len(df),
+                      degraded=len(analyzer.degraded_message_ids), part=os.path.basename(part_path))
+    except Exception as e:
+        logger.error(f"❌ Konuşma analiz edilemedi ({conversation_id}): {e}")
+        status.update(status=STATUS_FAILED, error=f"{type(e).__name__}: {e}")
+
+    status.update(api_calls=analyzer.api_calls - calls, tokens=analyzer.total_tokens - tokens,
+                  seconds=round(time.perf_counter() - started, 3), finished_at=datetime.now().isoformat())
+    return status
+
+
+def merge_parts(part_paths: List[str], output_dir: str, partition_rows: int = DEFAULT_PARTITION_ROWS,
+                prefix: str = "part") -> Dict[str, str]:
+    """
+    Konuşma bölüm dosyalarını en fazla partition_rows satırlık CSV bölümlerine birleştir
+
+    Bir konuşmanın satırları bölümler arasında bölünmez (bölüm sınırı konuşma sınırına denk gelir).
+
+    Returns:
+        conversation_id -> yazıldığı bölüm dosyası
+    """
+    partition_rows = max(1, partition_rows)
+    assignments: Dict[str, str] = {}
+    sink, index, sink_rows = None, 0, 0
+
+    try:
+        for part_path in part_paths:
+            with open(part_path, 'r', encoding='utf-8') as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            if not rows:
+                continue
+            if sink is not None and sink_rows + len(rows) > partition_rows:
+                sink.close()
+                sink = None
+            if sink is None:
+                sink = CSVSink(os.path.join(output_dir, f"{prefix}-{index:05d}.csv"))
+                index, sink_rows = index + 1, 0
+            for row in rows:
+                sink.write(row)
+            sink_rows += len(rows)
+            assignments[rows[0]['conversation_id']] = os.path.basename(sink.path)
+    finally:
+        if sink is not None:
+            sink.close()
+    return assignments
+
+
+class CorpusRunner:
+    def __init__(self, output_dir: str, analyzer_options: Optional[Dict] = None, workers: Optional[int] = None,
+                 concurrency: int = 1, cache_path: Optional[str] = None,
+                 partition_rows: int = DEFAULT_PARTITION_ROWS):
+        """
+        Klasör veya glob ölçeğinde konuşma dosyalarını süreç havuzunda analiz eder
+
+        Her worker süreci kendi istemcisiyle bir EnhancedLLMAnalyzer kurar; provider
+        RPM/TPM bütçesi worker'lar arasında bölünür. Her konuşmanın sonucu ayrı bir
+        bölüm dosyasına yazılır, durum kaydı manifest.jsonl'e eklenir; sonunda
+        başarılı konuşmalar CSV bölümlerine (part-00000.csv, ...) birleştirilir.
+
+        Args:
+            output_dir (str): Çıktı klasörü (bölümler, manifest ve birleştirilmiş sonuçlar)
+            analyzer_options (dict): EnhancedLLMAnalyzer parametreleri (provider, model, fused, ...)
+            workers (int): Worker süreç sayısı (verilmezse CPU sayısı)
+            concurrency (int): Worker başına eşzamanlı API isteği (1 = sıralı)
+            cache_path (str): Worker'ların paylaştığı SQLite önbellek dosyası (None = kapalı)
+            partition_rows (int): Birleştirilmiş CSV bölümü başına en fazla satır
+        """
+        self.output_dir = output_dir
+        self.analyzer_options = analyzer_options or {}
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.concurrency = max(1, concurrency)
+        self.cache_path = cache_path
+        self.partition_rows = partition_rows
+
+        self.parts_dir = os.path.join(output_dir, "_parts")
+        self.manifest_log = os.path.join(output_dir, "manifest.jsonl")
+        self.manifest_path = os.path.join(output_dir, "manifest.json")
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+    def _part_path(self, conversation_id: str) -> str:
+        return os.path.join(self.parts_dir, conversation_id.replace("/", "__") + ".jsonl")
+
+    def load_statuses(self) -> Dict[str, Dict]:
+        """manifest.jsonl'deki konuşma durumları (her konuşma için son kayıt geçerlidir)"""
+        statuses = {}
+        if os.path.exists(self.manifest_log):
+            with open(self.manifest_log, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Çökme anında yarım kalan satır
+                        continue
+                    statuses[entry['conversation_id']] = entry
+        return statuses
+
+    def run(self, source: str, resume: bool = False) -> Dict:
+        """
+        Kaynaktaki tüm konuşmaları analiz et ve sonuçları birleştir
+
+        Args:
+            source (str): Klasör veya glob kalıbı (ör. "exports/2024-12-15/*.json")
+            resume (bool): True ise önceki çalışmada başarılı olan konuşmalar atlanır
+
+        Returns:
+            Manifest (özet, konuşma durumları ve bölüm dosyaları)
+        """
+        conversations = discover_conversations(source)
+        if not conversations:
+            raise FileNotFoundError(f"Konuşma dosyası bulunamadı: {source}")
+
+        statuses = self.load_statuses() if resume else {}
+        if not resume and os.path.exists(self.manifest_log):
+            os.remove(self.manifest_log)
+
+        pending = {
+            conversation_id: path for conversation_id, path in conversations.items()
+            if not (statuses.get(conversation_id, {}).get('status') == STATUS_OK
+                    and os.path.exists(self._part_path(conversation_id)))
+        }
+        logger.info(f"📂 {len(conversations)} konuşma bulundu, {len(pending)} analiz edilecek "
+                    f"({self.workers} worker x {self.concurrency} eşzamanlı istek)")
+
+        started = time.perf_counter()
+        if pending:
+            self._run_pool(pending, statuses)
+        elapsed = time.perf_counter() - started
+
+        return self._finalize(source, conversations, statuses, elapsed)
+
+    def _run_pool(self, pending: Dict[str, str], statuses: Dict[str, Dict]):
+        """Bekleyen konuşmaları süreç havuzunda analiz et; her sonucu manifest.jsonl'e ekle"""
+        done = 0
+        with open(self.manifest_log, 'a', encoding='utf-8') as log, ProcessPoolExecutor(
+                max_workers=min(self.workers, len(pending)), initializer=_init_worker,
+                initargs=(self.analyzer_options, self.cache_path, self.workers)) as executor:
+            futures = {
+                executor.submit(_analyze_conversation_file, conversation_id, path,
+                                self._part_path(conversation_id), self.concurrency): conversation_id
+                for conversation_id, path in pending.items()
+            }
+            for future in as_completed(futures):
+                conversation_id = futures[future]
+                try:
+                    status = future.result()
+                except Exception as e:
+                    # Worker süreci çöktüyse (ör. bellek yetersiz) konuşma başarısız sayılır
+                    status = {'conversation_id': conversation_id, 'source': pending[conversation_id],
+                              'status': STATUS_FAILED, 'error': f"{type(e).__name__}: {e}",
+                              'finished_at': datetime.now().isoformat()}
+
+                statuses[conversation_id] = status
+                log.write(json.dumps(status, ensure_ascii=False) + "\n")
+                log.flush()
+
+                done += 1
+                icon = "✅" if status['status'] == STATUS_OK else "❌"
+                logger.info(f"{icon} [{done}/{len(pending)}] {conversation_id} "
+                            f"({status.get('rows', 0)} satır, {status.get('seconds', 0)} sn)")
+
+    def _finalize(self, source: str, conversations: Dict[str, str], statuses: Dict[str, Dict],
+                  elapsed: float) -> Dict:
+        """Başarılı konuşmaları CSV bölümlerine birleştir ve manifest.json'u yaz"""
+        for old_partition in glob.glob(os.path.join(self.output_dir, "part-*.csv")):
+            os.remove(old_partition)
+
+        succeeded = [conversation_id for conversation_id in conversations
+                     if statuses.get(conversation_id, {}).get('status') == STATUS_OK]
+        assignments = merge_parts([self._part_path(conversation_id) for conversation_id in succeeded],
+                                  self.output_dir, self.partition_rows)
+
+        entries = {}
+        for conversation_id in conversations:
+            entry = dict(statuses.get(conversation_id, {'status': STATUS_FAILED, 'error': "Sonuç yok"}))
+            entry.pop('conversation_id', None)
+            entry['partition'] = assignments.get(conversation_id)
+            entries[conversation_id] = entry
+
+        summary = {
+            'conversations': len(conversations),
+            'succeeded': len(succeeded),
+            'failed': len(conversations) - len(succeeded),
+            'rows': sum(entry.get('rows', 0) for entry in entries.values() if entry['status'] == STATUS_OK),
+            'api_calls': sum(entry.get('api_calls', 0) for entry in entries.values()),
+            'total_tokens': sum(entry.get('tokens', 0) for entry in entries.values()),
+            'degraded_messages': sum(entry.get('degraded', 0) for entry in entries.values()),
+            'seconds': round(elapsed, 3),
+        }
+        manifest = {
+            'created_at': datetime.now().isoformat(),
+            'source': source,
+            'analyzer_options': self.analyzer_options,
+            'workers': self.workers,
+            'concurrency': self.concurrency,
+            'partition_rows': self.partition_rows,
+            'partitions': sorted(set(assignments.values())),
+            'summary': summary,
+            'conversations': entries
+        }
+
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False, default=str)
+        os.replace(temp_path, self.manifest_path)
+
+        logger.info(f"📋 Manifest: {self.manifest_path} ({summary['succeeded']}/{summary['conversations']} başarılı, "
+                    f"{len(manifest['partitions'])} bölüm, {summary['rows']} satır)")
+        return manifest
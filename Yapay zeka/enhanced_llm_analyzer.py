@@ -1,13 +1,28 @@
-import openai
 import json
 import pandas as pd
 import os
 import time
+import queue
+import asyncio
+import threading
+import contextvars
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
 from dotenv import load_dotenv
 import logging
-import requests
+from llm_executor import ThreadPoolLLMExecutor, resolve_worker_limit
+from llm_cache import LLMResponseCache
+from rate_limiter import (TokenBucketRateLimiter, get_rate_limiter, estimate_prompt_tokens,
+                          retry_after_from_error, is_rate_limit_error)
+from circuit_breaker import CircuitBreaker, classify_error, NON_RETRIABLE_ERRORS, OPEN
+from checkpoint import CheckpointJournal
+from batch_api import BatchJobRunner, batch_request, write_batch_file
+from local_inference import LocalInferenceClient, DEFAULT_LOCAL_MODEL
+from telemetry import LLMTelemetry
+from client_registry import get_client, client_pool_stats
+from hedging import HedgePolicy
+from adaptive_concurrency import get_concurrency_controller
+from api_key_pool import APIKeyPool, parse_api_keys
 
 # Logging ayarla
 logging.basicConfig(level=logging.INFO)
@@ -16,16 +31,175 @@ logger = logging.getLogger(__name__)
 # .env dosyasından API anahtarlarını yükle
 load_dotenv()
 
+# Analiz edilen satırın durumu ({'degraded': bool}); thread ve asyncio görevleri arasında ayrı tutulur
+_row_state = contextvars.ContextVar('llm_row_state', default=None)
+
+# Bot yanıtı için bakılan sonraki mesaj sayısı (prompt bağlamı ve kural tabanlı analizle aynı)
+BOT_RESPONSE_WINDOW = 2
+
+# Analiz görevleri ve görevin mesaja uygulanmadığı hücrelerin değeri
+ANALYSIS_TASKS = ('sentiment', 'topic', 'bot_response')
+NOT_APPLICABLE = "N/A"
+
+# base_url tanımlı ve API anahtarı yokken kullanılan yer tutucu (yerel sunucular anahtar doğrulamaz)
+MOCK_API_KEY = "mock-key"
+
+# Rol bazlı yönlendirme: destek mesajlarında yalnızca konu analiz edilir
+# (bot yanıtı sorusu anlamsız, temsilci şablonlarının duygusu nadiren gerekir)
+ROLE_AWARE_ROUTING = {
+    'customer': ANALYSIS_TASKS,
+    'support': ('topic',)
+}
+
+# Yerel modelde tek seferde gruplanan varsayılan mesaj sayısı
+LOCAL_DEFAULT_GROUP_SIZE = 64
+
+# Kısa kod modunda etiket kodları (konu kodları kategori listesinden T01..T18 olarak üretilir)
+SENTIMENT_CODES = {"S+": "Pozitif", "S-": "Negatif", "S0": "Nötr"}
+BOT_RESPONSE_CODES = {"Y": "Evet", "N": "Hayır"}
+
+# JSON çıktı modunu (response_format) desteklemeyen modeller
+JSON_MODE_UNSUPPORTED_MODELS = {"gpt-4"}
+
+# Kural tabanlı (fallback) analiz için anahtar kelimeler
+FALLBACK_POSITIVE_WORDS = ['güzel', 'harika', 'mükemmel', 'teşekkür', 'memnun', 'beğendim', 'süper', 'muhteşem']
+FALLBACK_NEGATIVE_WORDS = ['kötü', 'berbat', 'şikayet', 'memnun değil', 'problem', 'geç', 'pahalı', 'kızgın']
+FALLBACK_TOPIC_KEYWORDS = {
+    "Düğün Mekanı": ["mekan", "salon", "bahçe", "düğün salonu", "yer"],
+    "Gelinlik": ["gelinlik", "elbise", "gelin", "kıyafet"],
+    "Fotoğrafçı": ["fotoğraf", "çekim", "albüm", "kameraman"],
+    "Fiyat Sorgusu": ["fiyat", "ücret", "maliyet", "ne kadar", "para", "tutar"],
+    "Rezervasyon": ["rezervasyon", "randevu", "tarih", "saat"],
+    "Şikayet": ["şikayet", "memnun değil", "problem", "sorun"]
+}
+
+def _margin_confidence(best: int, runner_up: int) -> float:
+    """En iyi ve ikinci sonuç arasındaki anahtar kelime farkından 0-1 arası güven skoru"""
+    return round((best - runner_up) / (best + 1), 3) if best else 0.0
+
+def keyword_sentiment_scored(text: str) -> Tuple[str, float]:
+    """Anahtar kelime sayımına dayalı sentiment analizi ve güven skoru"""
+    text_lower = text.lower()
+    
+    pos_count = sum(1 for word in FALLBACK_POSITIVE_WORDS if word in text_lower)
+    neg_count = sum(1 for word in FALLBACK_NEGATIVE_WORDS if word in text_lower)
+    
+    if pos_count > neg_count:
+        return "Pozitif", _margin_confidence(pos_count, neg_count)
+    elif neg_count > pos_count:
+        return "Negatif", _margin_confidence(neg_count, pos_count)
+    elif pos_count == 0 and "?" in text:
+        # Duygu kelimesi içermeyen sorular genellikle nötrdür
+        return "Nötr", 0.5
+    else:
+        return "Nötr", 0.0
+
+def keyword_sentiment(text: str) -> str:
+    """Anahtar kelime sayımına dayalı sentiment analizi"""
+    return keyword_sentiment_scored(text)[0]
+
+def normalize_text(text: str) -> str:
+    """Tekilleştirme için metni normalize et (küçük harf, tek boşluk)"""
+    return " ".join(text.lower().split())
+
+def keyword_topic_scored(text: str) -> Tuple[str, float]:
+    """
+    Kademeli mod için en çok anahtar kelime eşleşen konu ve güven skoru (eşitlikte ilk kategori)
+    
+    Fallback analizi keyword_topic ile ilk eşleşen kategoriyi kullanmaya devam eder.
+    """
+    text_lower = text.lower()
+    
+    scores = [
+        (category, sum(1 for keyword in keywords if keyword in text_lower))
+        for category, keywords in FALLBACK_TOPIC_KEYWORDS.items()
+    ]
+    ranked = sorted(scores, key=lambda item: -item[1])
+    (category, best), (_, runner_up) = ranked[0], ranked[1]
+    
+    if best == 0:
+        return "Genel Bilgi", 0.0
+    return category, _margin_confidence(best, runner_up)
+
+def keyword_topic(text: str) -> str:
+    """Anahtar kelime eşleşmesine dayalı konu analizi"""
+    text_lower = text.lower()
+    
+    for category, keywords in FALLBACK_TOPIC_KEYWORDS.items():
+        if any(keyword in text_lower for keyword in keywords):
+            return category
+    
+    return "Genel Bilgi"
+
 class EnhancedLLMAnalyzer:
-    def __init__(self, provider="openai", model=None):
+    def __init__(self, provider="openai", model=None, fused=False, batch_size=1, client=None, async_client=None,
+                 cache: Optional[LLMResponseCache] = None, dedup=True,
+                 rate_limiter: Optional[TokenBucketRateLimiter] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None, cascade_threshold: Optional[float] = None,
+                 task_routing: Optional[Dict[str, Tuple[str, ...]]] = None, compact_labels: bool = False,
+                 base_url: Optional[str] = None, hedge: Optional[HedgePolicy] = None,
+                 adaptive_concurrency: bool = False, api_keys: Optional[List[str]] = None):
         """
         Gelişmiş LLM tabanlı sohbet analiz sistemi
         
         Args:
-            provider (str): "openai", "anthropic", "groq", "huggingface"
+            provider (str): "openai", "anthropic", "groq", "huggingface", "local"
+                ("local": transformers ile CPU'da sıfır-atış sınıflandırma, ağ gerektirmez)
             model (str): Kullanılacak model adı
+            fused (bool): True ise sentiment, konu ve bot yanıtı tek bir
+                JSON çağrısında birlikte analiz edilir (mesaj başına 1 çağrı)
+            batch_size (int): 1'den büyükse bu kadar mesaj tek bir prompt'ta
+                paketlenir ve etiketler JSON dizisi olarak alınır
+            client: Hazır API istemcisi (verilirse setup_client atlanır)
+            async_client: Hazır asenkron API istemcisi (analyze_conversation_async için)
+            cache (LLMResponseCache): Verilirse aynı çağrılar API'ye gitmeden önbellekten döner
+            dedup (bool): Aynı metne sahip mesajlarda bağlamdan bağımsız görevler
+                (sentiment, konu) bir kez çalıştırılır; bot yanıtı her mesaj için ayrı analiz edilir
+            rate_limiter (TokenBucketRateLimiter): RPM/TPM limiter (verilmezse provider/model
+                için süreç genelinde paylaşılan limiter kullanılır)
+            circuit_breaker (CircuitBreaker): Provider kesintisinde çağrıları durduran devre
+                kesici (açıkken mesajlar doğrudan kural tabanlı analiz edilir)
+            cascade_threshold (float): Verilirse kademeli mod: sentiment/konu önce kural motoruyla
+                belirlenir, yalnızca güven skoru bu eşiğin altındaki görevler LLM'e gider (0-1)
+            task_routing (dict): user_type -> çalıştırılacak görevler (ör. ROLE_AWARE_ROUTING);
+                tabloda olmayan kullanıcı tiplerinde tüm görevler çalışır, uygulanmayan
+                görevlerin hücreleri "N/A" olur (verilmezse her mesajda tüm görevler)
+            compact_labels (bool): True ise model etiket adları yerine kısa kodlar döndürür
+                (T01..T18, S+/S-/S0, Y/N); yanıt token sınırı birkaç token'a iner ve
+                kodlar sözlükten doğrudan çözülür
+            base_url (str): OpenAI/Groq uyumlu sunucu adresi (ör. mock_llm_server, verilmezse
+                LLM_BASE_URL); tanımlıyken API anahtarı zorunlu değildir
+            hedge (HedgePolicy): Verilirse görevin gecikme yüzdeliğini aşan çağrılar için aynı veya
+                ikincil provider/modele yedek çağrı gönderilir, ilk geçerli yanıt kullanılır
+                (yalnızca OpenAI/Groq)
+            adaptive_concurrency (bool): True ise uçuştaki istek sayısı provider/model başına
+                paylaşılan AIMD denetleyiciyle ayarlanır: sağlıklı yanıtlarda artar, 429/zaman
+                aşımında yarıya iner (max_concurrency / worker sayısı üst sınır olarak kalır)
+            api_keys (list): OpenAI/Groq API anahtarları (verilmezse OPENAI_API_KEY / GROQ_API_KEY,
+                virgülle ayrılmış birden çok anahtar olabilir); birden fazlaysa istekler anahtar
+                başına limitlerle dağıtılır, geçersiz/kotası biten anahtarlar havuzdan çıkarılır
         """
         self.provider = provider
+        self.base_url = base_url or os.getenv("LLM_BASE_URL") or None
+        self.fused = fused
+        self.batch_size = max(1, int(batch_size))
+        if provider == "local" and self.batch_size == 1:
+            # Yerel modelde mesajlar ileri geçiş başına gruplanır
+            self.batch_size = LOCAL_DEFAULT_GROUP_SIZE
+        self.cache = cache
+        self.dedup = dedup
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.cascade_threshold = cascade_threshold
+        self.task_routing = self._validate_task_routing(task_routing)
+        self.compact_labels = compact_labels
+        
+        # Yanıt token sınırları: tek etiketli çağrı, birleşik çağrı ve toplu prompt'taki mesaj başına
+        self.label_max_tokens = 4 if compact_labels else 50
+        self.fused_max_tokens = 30 if compact_labels else 80
+        self.batch_item_max_tokens = 20 if compact_labels else 40
+        if cascade_threshold is not None and (provider == "local" or self.batch_size > 1):
+            logger.warning("⚠️ Kademeli mod yalnızca mesaj bazlı analizde (batch_size=1) kullanılır")
         
         # Provider'a göre varsayılan model seç
         if model is None:
@@ -35,12 +209,24 @@ class EnhancedLLMAnalyzer:
                 self.model = "gpt-4o"  # En yeni GPT-4o modeli
             elif provider == "huggingface":
                 self.model = "microsoft/DialoGPT-medium"
+            elif provider == "local":
+                self.model = DEFAULT_LOCAL_MODEL
             else:
                 self.model = "gpt-4o"
         else:
             self.model = model
-            
-        self.setup_client()
+        
+        self.api_key = None
+        self.async_client = async_client
+        # Registry'den alınan (paylaşılan havuzlu) istemciler; dışarıdan verilenler yeniden boyutlandırılmaz
+        self._pooled_client = None
+        self._pooled_async_client = None
+        self._api_keys = api_keys
+        self.key_pool = None
+        if client is not None:
+            self.client = client
+        else:
+            self.setup_client()
         
         # DüğünBuketi.com kategorileri (web araştırmasından)
         self.dugum_buketi_categories = [
@@ -64,21 +250,100 @@ class EnhancedLLMAnalyzer:
             "Diğer"
         ]
         
+        # O(1) etiket çözümleme tabloları: kod -> kategori ve küçük harfli ad -> kategori
+        self.topic_codes = {f"T{n:02d}": category for n, category in enumerate(self.dugum_buketi_categories, 1)}
+        self._topic_names = {category.lower(): category for category in self.dugum_buketi_categories}
+        
+        # Önbelleğe yazmadan önce yanıtı doğrulayan fonksiyonlar (görev adına göre)
+        self._response_validators = {
+            'sentiment': self._validate_sentiment,
+            'topic': self._validate_topic,
+            'bot_response': self._validate_bot_response,
+            'fused': self._is_valid_fused,
+        }
+        
+        # setup_client modeli değiştirebileceği için limiter en son belirlenir
+        if self.rate_limiter is None:
+            self.rate_limiter = get_rate_limiter(self.provider, self.model)
+        
+        self.hedge_policy = hedge
+        self._setup_hedging()
+        
+        self.concurrency_controller = None
+        if adaptive_concurrency:
+            if provider == "local":
+                logger.warning("⚠️ Uyarlanabilir eşzamanlılık yerel modelde kullanılmaz")
+            else:
+                self.concurrency_controller = get_concurrency_controller(self.provider, self.model)
+        
+        # Asenkron uçuştaki istek sınırı: analyze_conversation_async max_concurrency ile kurar,
+        # doğrudan async çağrılarda ilk kullanımda provider worker limitiyle oluşturulur
+        self._inflight_semaphore = None
+        self._inflight_loop = None
+        
         # Gelişmiş prompt şablonları
         self.setup_prompts()
         
-        # API çağrı sayacı ve maliyet takibi
+        # API çağrı sayacı ve maliyet takibi (thread'ler arası paylaşıldığı için kilitli)
         self.api_calls = 0
         self.total_tokens = 0
+        self._stats_lock = threading.Lock()
+        
+        # Görev bazında gecikme, token, retry, önbellek ve fallback metrikleri
+        self.telemetry = LLMTelemetry()
+        
+        # Toplu (batch) analiz istatistikleri
+        self.batch_stats = {'batches': 0, 'batched_messages': 0, 'retried_messages': 0}
+        
+        # Tekilleştirme: normalize metin -> {sentiment, konu} (her analizde sıfırlanır)
+        self._text_labels = {}
+        self.dedup_stats = {'messages': 0, 'unique_texts': 0, 'reused': 0, 'dedup_ratio': 0}
+        
+        # Kural tabanlı analize düşen (degrade) mesajlar (her analizde sıfırlanır)
+        self.degraded_message_ids = []
+        
+        # Checkpoint'ten geri yüklenen / yazılan satır sayıları
+        self.checkpoint_stats = {'path': None, 'restored': 0, 'written': 0}
         
+        # Kademeli mod: kural motorunda çözülen ve LLM'e yükseltilen görev/mesaj sayıları
+        self.cascade_stats = {'messages': 0, 'escalated_messages': 0, 'rule_sentiment': 0,
+                              'rule_topic': 0, 'escalation_rate': 0}
+        
+        # Model yanıtı çözümlenemediği için anahtar kelime/kural analizine düşen görevler
+        self.parse_fallbacks = {'sentiment': 0, 'topic': 0, 'bot_response': 0}
+        
+        # Bot yanıtının nasıl belirlendiği: konuşma yapısından (neden bazında) veya modelle
+        self.bot_response_resolution = {'no_support_reply': 0, 'ambiguous': 0}
+        
+        # Rol bazlı yönlendirmede "N/A" bırakılan (çalıştırılmayan) görev hücreleri
+        self.routing_stats = {task: 0 for task in ANALYSIS_TASKS}
+        
+        # Batch API (bulk) analiz istatistikleri (yalnızca analyze_conversation_bulk ile dolar)
+        self.bulk_stats = None
+        
+    def _validate_task_routing(self, task_routing: Optional[Dict]) -> Optional[Dict[str, Tuple[str, ...]]]:
+        """Yönlendirme tablosundaki görev adlarını doğrula"""
+        if task_routing is None:
+            return None
+        
+        routing = {}
+        for user_type, tasks in task_routing.items():
+            unknown = set(tasks) - set(ANALYSIS_TASKS)
+            if unknown:
+                raise ValueError(f"Bilinmeyen görev(ler) ({user_type}): {sorted(unknown)}")
+            routing[user_type] = tuple(task for task in ANALYSIS_TASKS if task in tasks)
+        return routing
+    
     def setup_client(self):
         """API istemcisini ayarla"""
         if self.provider == "openai":
-            try:
-                import openai
-                api_key = os.getenv("OPENAI_API_KEY")
-                if not api_key or api_key == "your_openai_api_key_here":
-                    raise ValueError("""
+            keys = self._api_keys or parse_api_keys(os.getenv("OPENAI_API_KEY"))
+            api_key = keys[0] if keys else None
+            if self.base_url and (not api_key or api_key == "your_openai_api_key_here"):
+                # Yerel/uyumlu sunucular anahtarı doğrulamaz
+                api_key = MOCK_API_KEY
+            if not api_key or api_key == "your_openai_api_key_here":
+                raise ValueError("""
 🔑 OPENAI_API_KEY bulunamadı!
 
 API anahtarını almak için:
@@ -93,29 +358,29 @@ Mevcut modeller:
 - gpt-4-turbo
 - gpt-4
 - gpt-3.5-turbo
-                    """)
-                
-                self.client = openai.OpenAI(api_key=api_key)
-                logger.info(f"✅ OpenAI client başlatıldı. Model: {self.model}")
-                
-                # Model doğrulaması
-                if self.model not in ["gpt-4o", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo"]:
-                    logger.warning(f"⚠️ Model '{self.model}' doğrulanamadı. gpt-4o kullanılacak.")
-                    self.model = "gpt-4o"
-                    
-            except ImportError:
-                raise ValueError("OpenAI kütüphanesi yüklü değil! Çalıştırın: pip install openai")
+                """)
+            
+            self.api_key = api_key
+            self.client = self._pooled_client = get_client("openai", api_key, self.base_url)
+            logger.info(f"✅ OpenAI client başlatıldı. Model: {self.model}")
+            if self.base_url:
+                logger.info(f"🔗 Base URL: {self.base_url}")
+            
+            # Model doğrulaması (uyumlu sunucular kendi model adlarını kullanır)
+            if not self.base_url and self.model not in ["gpt-4o", "gpt-4-turbo", "gpt-4", "gpt-3.5-turbo"]:
+                logger.warning(f"⚠️ Model '{self.model}' doğrulanamadı. gpt-4o kullanılacak.")
+                self.model = "gpt-4o"
+            self._setup_key_pool(keys)
                 
         elif self.provider == "groq":
-            try:
-                from groq import Groq
-                api_key = os.getenv("GROQ_API_KEY")
-                if not api_key:
-                    raise ValueError("GROQ_API_KEY environment variable bulunamadı!")
-                self.client = Groq(api_key=api_key)
-                logger.info(f"Groq client başlatıldı. Model: {self.model}")
-            except ImportError:
-                raise ValueError("Groq kütüphanesi yüklü değil! pip install groq")
+            keys = self._api_keys or parse_api_keys(os.getenv("GROQ_API_KEY"))
+            api_key = keys[0] if keys else (MOCK_API_KEY if self.base_url else None)
+            if not api_key:
+                raise ValueError("GROQ_API_KEY environment variable bulunamadı!")
+            self.api_key = api_key
+            self.client = self._pooled_client = get_client("groq", api_key, self.base_url)
+            logger.info(f"Groq client başlatıldı. Model: {self.model}")
+            self._setup_key_pool(keys)
                 
         elif self.provider == "huggingface":
             try:
@@ -123,13 +388,105 @@ Mevcut modeller:
                 api_key = os.getenv("HUGGINGFACE_API_KEY")
                 if not api_key:
                     raise ValueError("HUGGINGFACE_API_KEY environment variable bulunamadı!")
+                self.api_key = api_key
                 self.client = InferenceClient(token=api_key)
                 logger.info(f"Hugging Face client başlatıldı. Model: {self.model}")
             except ImportError:
                 raise ValueError("Hugging Face kütüphanesi yüklü değil! pip install huggingface_hub")
+                
+        elif self.provider == "local":
+            # Model ilk analizde yüklenir; LOCAL_MODEL_QUANTIZE=1 ile int8 kuantizasyon
+            quantize = os.getenv("LOCAL_MODEL_QUANTIZE", "").lower() in ("1", "true", "evet")
+            batch_size = os.getenv("LOCAL_MODEL_BATCH_SIZE", "")
+            self.client = LocalInferenceClient(
+                self.model, quantize=quantize, batch_size=int(batch_size) if batch_size.isdigit() else 16
+            )
+            logger.info(f"✅ Yerel model ayarlandı: {self.model} (int8: {quantize})")
         else:
             raise ValueError(f"Desteklenmeyen provider: {self.provider}")
     
+    def _setup_key_pool(self, keys: List[str]):
+        """Birden fazla anahtar verildiyse istekleri anahtarlara dağıtan havuzu kur"""
+        if len(keys) > 1:
+            self.key_pool = APIKeyPool(self.provider, self.model, keys, self.base_url)
+    
+    def _setup_hedging(self):
+        """Hedge hedefini hazırla: ana provider'dan farklıysa ayrı istemci ve limiter kullanılır"""
+        self._hedge_client = self._hedge_async_client = self._hedge_api_key = None
+        self._hedge_rate_limiter = None
+        if self.hedge_policy is None:
+            return
+        if self.provider not in ("openai", "groq"):
+            logger.warning("⚠️ Hedge yalnızca OpenAI/Groq provider'larında kullanılır; kapatıldı")
+            self.hedge_policy = None
+            return
+        
+        policy = self.hedge_policy
+        self.hedge_provider = policy.provider or self.provider
+        if self.hedge_provider not in ("openai", "groq"):
+            raise ValueError(f"Hedge provider'ı desteklenmiyor: {self.hedge_provider} (openai, groq)")
+        if self.hedge_provider != self.provider and policy.model is None:
+            raise ValueError("Farklı provider'a hedge için model belirtilmeli")
+        self.hedge_model = policy.model or self.model
+        self._hedge_base_url = policy.base_url or (self.base_url if self.hedge_provider == self.provider else None)
+        
+        if self.hedge_provider != self.provider or self._hedge_base_url != self.base_url:
+            # Env değişkeni virgülle ayrılmış bir anahtar havuzu olabilir; hedge ilk anahtarı kullanır
+            keys = parse_api_keys(os.getenv(f"{self.hedge_provider.upper()}_API_KEY"))
+            api_key = keys[0] if keys else (MOCK_API_KEY if self._hedge_base_url else None)
+            if not api_key:
+                raise ValueError(f"{self.hedge_provider.upper()}_API_KEY environment variable bulunamadı (hedge)!")
+            self._hedge_api_key = api_key
+            self._hedge_client = get_client(self.hedge_provider, api_key, self._hedge_base_url)
+        
+        # Aynı provider/model'de hedge ana limiter'ı kullanır; o limiter çağrı anında okunur
+        # (build_worker_analyzer / QueueWorker analyzer.rate_limiter'ı sonradan değiştirebilir)
+        if (self.hedge_provider, self.hedge_model) != (self.provider, self.model):
+            self._hedge_rate_limiter = get_rate_limiter(self.hedge_provider, self.hedge_model)
+        logger.info(f"🛡️ Hedge: {self.hedge_provider}/{self.hedge_model} (p{policy.latency_percentile:g} "
+                    f"üzeri çağrılar, en fazla %{policy.max_hedge_rate * 100:g})")
+    
+    def setup_async_client(self, max_connections: Optional[int] = None):
+        """
+        Asenkron API istemcisini ayarla (yalnızca OpenAI ve Groq için)
+        
+        İstemci registry'den alınır; havuz en az max_connections bağlantılık olur ve
+        her olay döngüsü kendi havuzunu kullanır. Dışarıdan verilen istemciye dokunulmaz.
+        """
+        if self._hedge_api_key is not None:
+            self._hedge_async_client = get_client(self.hedge_provider, self._hedge_api_key, self._hedge_base_url,
+                                                  is_async=True, max_connections=max_connections)
+        if self.api_key is None or self.provider not in ("openai", "groq"):
+            return
+        if self.key_pool is not None:
+            self.key_pool.setup_async(max_connections)
+        if self.async_client is not None and self.async_client is not self._pooled_async_client:
+            return
+        
+        self.async_client = self._pooled_async_client = get_client(
+            self.provider, self.api_key, self.base_url, is_async=True, max_connections=max_connections
+        )
+    
+    def _size_client_pool(self, max_connections: int):
+        """Paylaşılan senkron istemcinin havuzunu eşzamanlılığa göre büyüt"""
+        if self.client is not None and self.client is self._pooled_client:
+            self.client = self._pooled_client = get_client(self.provider, self.api_key, self.base_url,
+                                                           max_connections=max_connections)
+    
+    @property
+    def supports_async(self) -> bool:
+        """Provider'ın native asenkron istemcisi var mı"""
+        return self.async_client is not None or (self.provider in ("openai", "groq") and self.api_key is not None)
+    
+    @property
+    def analysis_mode(self) -> str:
+        """Aktif analiz modu ("local(N)", "batch(N)", "fused" veya "separate")"""
+        if self.provider == "local":
+            return f"local({self.batch_size})"
+        if self.batch_size > 1:
+            return f"batch({self.batch_size})"
+        return "fused" if self.fused else "separate"
+    
     def setup_prompts(self):
         """Gelişmiş prompt şablonlarını ayarla"""
         
@@ -221,171 +578,1024 @@ Müşteri: "Teşekkür ederim"
 
 CEVAP (Evet/Hayır):"""
 
-    def call_llm_with_retry(self, messages: List[Dict], max_retries: int = 3) -> str:
-        """LLM API çağrısı yap (retry mekanizması ile)"""
+        # Birleşik (fused) analiz prompt'u - tek çağrıda üç görev
+        self.fused_prompt = """
+Aşağıdaki konuşmadaki son müşteri mesajını üç açıdan analiz et.
+
+KONUŞMA GEÇMİŞİ:
+{conversation_context}
+
+ANALİZ EDİLECEK MESAJ: "{text}"
+
+GÖREVLER:
+1. sentiment: Pozitif, Negatif veya Nötr
+   - Pozitif: Memnuniyet, teşekkür, beğeni, heyecan, övgü
+   - Negatif: Şikayet, memnuniyetsizlik, kızgınlık, eleştiri
+   - Nötr: Soru sorma, bilgi isteme, tarafsız ifadeler
+2. topic: Şu kategorilerden biri: """ + categories_text + """
+   - Fiyat soruları için "Fiyat Sorgusu", şikayetler için "Şikayet" kullan
+3. bot_response: Mesaj destek ekibi tarafından yanıtlanmış mı? Evet veya Hayır
+   - Otomatik yanıtlar da "Evet" sayılır
+
+ÇIKTI FORMATI (sadece JSON, açıklama ekleme):
+{{"sentiment": "Nötr", "topic": "Fiyat Sorgusu", "bot_response": "Evet"}}"""
+
+        # Toplu (batch) analiz prompt'u - birden çok mesaj tek çağrıda
+        self.batch_prompt = """
+Aşağıdaki konuşmada [numara] ile işaretlenmiş HER mesajı ayrı ayrı analiz et.
+Numarasız satırlar sadece bağlam içindir, onları etiketleme.
+
+KONUŞMA:
+{conversation}
+
+GÖREVLER (her numaralı mesaj için):
+1. sentiment: Pozitif, Negatif veya Nötr
+2. topic: Şu kategorilerden biri: """ + categories_text + """
+3. bot_response: Mesaj destek ekibi tarafından yanıtlanmış mı? Evet veya Hayır
+
+ÇIKTI FORMATI (sadece JSON, her numaralı mesaj için bir eleman):
+{{"results": [{{"index": 1, "sentiment": "Nötr", "topic": "Fiyat Sorgusu", "bot_response": "Evet"}}]}}"""
+        
+        if self.compact_labels:
+            self.setup_compact_prompts()
+    
+    def setup_compact_prompts(self):
+        """Etiket adları yerine kısa kod isteyen prompt şablonlarını ayarla"""
+        sentiment_codes = "\n".join(f"{code} = {label}" for code, label in SENTIMENT_CODES.items())
+        topic_codes = "\n".join(f"{code} = {category}" for code, category in self.topic_codes.items())
+        bot_response_codes = "\n".join(f"{code} = {label}" for code, label in BOT_RESPONSE_CODES.items())
+        
+        self.sentiment_prompt = """
+Aşağıdaki müşteri mesajının duygusal tonunu analiz et.
+
+MESAJ: "{text}"
+
+KODLAR:
+""" + sentiment_codes + """
+
+KURALLAR:
+- Pozitif: Memnuniyet, teşekkür, beğeni, heyecan, övgü ifadeleri
+- Negatif: Şikayet, memnuniyetsizlik, kızgınlık, hayal kırıklığı, eleştiri
+- Nötr: Soru sorma, bilgi isteme, tarafsız ifadeler, normal konuşma
+
+CEVAP (sadece kod):"""
+
+        self.topic_prompt = """
+Aşağıdaki düğün sektörü mesajının ana konusunu belirle.
+
+MESAJ: "{text}"
+
+KODLAR:
+""" + topic_codes + """
+
+KURALLAR:
+- Mesajın ana konusuna ve amacına odaklan, belirsizse en yakın kategoriyi seç
+- Fiyat soruları için "Fiyat Sorgusu", şikayet ifadeleri için "Şikayet" kodunu kullan
+
+CEVAP (sadece kod):"""
+
+        self.bot_response_prompt = """
+Aşağıdaki konuşmada müşteri sorusu/talebi destek ekibi tarafından yanıtlanmış mı?
+
+KONUŞMA GEÇMİŞİ:
+{conversation_context}
+
+SON MÜŞTERİ MESAJI: "{customer_message}"
+
+KODLAR:
+""" + bot_response_codes + """
+
+KURALLAR:
+- Müşteri mesajından sonra destek/bot yanıtı var mı ve talebi karşılıyor mu kontrol et
+- Otomatik yanıtlar da "Evet" sayılır
+
+CEVAP (sadece kod):"""
+
+        self.fused_prompt = """
+Aşağıdaki konuşmadaki son müşteri mesajını üç açıdan analiz et.
+
+KONUŞMA GEÇMİŞİ:
+{conversation_context}
+
+ANALİZ EDİLECEK MESAJ: "{text}"
+
+KODLAR:
+""" + sentiment_codes + "\n" + topic_codes + "\n" + bot_response_codes + """
+
+GÖREVLER:
+1. sentiment: S kodlarından biri (Nötr: soru sorma, bilgi isteme, tarafsız ifadeler)
+2. topic: T kodlarından biri (fiyat soruları için "Fiyat Sorgusu", şikayetler için "Şikayet")
+3. bot_response: Mesaj destek ekibi tarafından yanıtlanmış mı? Y veya N
+
+ÇIKTI FORMATI (sadece JSON, açıklama ekleme):
+{{"sentiment": "S0", "topic": "T15", "bot_response": "Y"}}"""
+
+        self.batch_prompt = """
+Aşağıdaki konuşmada [numara] ile işaretlenmiş HER mesajı ayrı ayrı analiz et.
+Numarasız satırlar sadece bağlam içindir, onları etiketleme.
+
+KONUŞMA:
+{conversation}
+
+KODLAR:
+""" + sentiment_codes + "\n" + topic_codes + "\n" + bot_response_codes + """
+
+GÖREVLER (her numaralı mesaj için):
+1. sentiment: S kodlarından biri
+2. topic: T kodlarından biri
+3. bot_response: Mesaj destek ekibi tarafından yanıtlanmış mı? Y veya N
+
+ÇIKTI FORMATI (sadece JSON, her numaralı mesaj için bir eleman):
+{{"results": [{{"index": 1, "sentiment": "S0", "topic": "T15", "bot_response": "Y"}}]}}"""
+
+    def _completion_params(self, max_tokens: int, json_mode: bool) -> Dict:
+        """Provider'a göre chat.completions (veya text_generation) parametrelerini hazırla"""
+        if self.provider == "huggingface":
+            return {'model': self.model, 'max_new_tokens': max_tokens, 'temperature': 0.1}
+        
+        params = {
+            'model': self.model,
+            'max_tokens': max_tokens,
+            'temperature': 0.1,
+            'top_p': 0.9
+        }
+        if self.provider == "openai":
+            params['frequency_penalty'] = 0
+            params['presence_penalty'] = 0
+        
+        # JSON modu destekleyen modellerde yapılandırılmış çıktı iste
+        if json_mode and self.model not in JSON_MODE_UNSUPPORTED_MODELS:
+            params['response_format'] = {"type": "json_object"}
+        
+        return params
+    
+    def _record_usage(self, tokens: int = 0):
+        """API çağrısı ve token sayaçlarını thread-safe olarak güncelle"""
+        with self._stats_lock:
+            self.api_calls += 1
+            self.total_tokens += tokens
+    
+    def _response_tokens(self, response) -> int:
+        """Yanıttaki toplam token (usage yoksa 0)"""
+        usage = getattr(response, 'usage', None)
+        return (usage.total_tokens or 0) if usage else 0
+    
+    def _read_completion(self, response, reserved_tokens: int = 0, task: str = "other",
+                         latency: Optional[float] = None, wait: float = 0.0,
+                         rate_limiter: Optional[TokenBucketRateLimiter] = None) -> str:
+        """Chat completion yanıtından metni al, istatistikleri ve token rezervasyonunu güncelle"""
+        usage = response.usage if hasattr(response, 'usage') and response.usage else None
+        tokens = usage.total_tokens if usage else 0
+        self._record_usage(tokens)
+        (rate_limiter or self.rate_limiter).reconcile(reserved_tokens, tokens)
+        self.telemetry.record_call(
+            task, latency,
+            prompt_tokens=getattr(usage, 'prompt_tokens', 0) or 0,
+            completion_tokens=getattr(usage, 'completion_tokens', 0) or 0,
+            wait=wait
+        )
+        
+        result = response.choices[0].message.content.strip()
+        logger.info(f"LLM Response: {result}")
+        return result
+    
+    def _read_text_generation(self, response, prompt: str, task: str = "other",
+                              latency: Optional[float] = None, wait: float = 0.0) -> str:
+        """Hugging Face text_generation yanıtını al (usage dönmediği için token sayısı tahminidir)"""
+        result = response.strip()
+        prompt_tokens = estimate_prompt_tokens([{'content': prompt}])
+        completion_tokens = max(1, len(result) // 4)
+        self._record_usage(prompt_tokens + completion_tokens)
+        self.telemetry.record_call(task, latency, prompt_tokens, completion_tokens, wait)
+        logger.info(f"LLM Response: {result}")
+        return result
+
+    def _cache_key(self, messages: List[Dict], params: Dict, hedge: bool = False) -> Optional[str]:
+        """
+        Çağrının önbellek anahtarı: provider, model ve base_url (hedge kazandıysa hedge hedefininkiler)
+        
+        base_url anahtara girdiği için mock sunucu veya uyumlu sunucu yanıtları gerçek provider
+        yanıtlarıyla karışmaz.
+        """
+        if self.cache is None:
+            return None
+        if hedge:
+            return self.cache.make_key(self.hedge_provider, self.hedge_model, messages, self._hedge_params(params),
+                                       self._hedge_base_url)
+        return self.cache.make_key(self.provider, self.model, messages, params, self.base_url)
+    
+    def _cache_lookup(self, messages: List[Dict], params: Dict) -> Tuple[Optional[str], Optional[str]]:
+        """Önbellek anahtarını üret ve varsa önbellekteki yanıtı döndür"""
+        if self.cache is None:
+            return None, None
+        
+        cache_key = self._cache_key(messages, params)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"💾 Önbellekten: {cached}")
+        return cache_key, cached
+    
+    def _cache_store(self, cache_key: Optional[str], result: str, task: str = "other",
+                     validate: Optional[Callable[[str], bool]] = None):
+        """
+        Başarılı yanıtı önbelleğe yaz
+        
+        Etiket/JSON doğrulamasından geçmeyen yanıtlar yazılmaz; aksi halde fallback'e düşen
+        bir yanıt sonraki çalıştırmalarda API'ye hiç gidilmeden tekrar kullanılırdı.
+        validate verilmezse görev adına göre doğrulanır (bilinmeyen görevler her zaman yazılır).
+        """
+        if self.cache is None or cache_key is None:
+            return
+        if validate is None:
+            validate = self._response_validators.get(task)
+        if validate is not None and not validate(result):
+            logger.info(f"💾 Geçersiz yanıt önbelleğe yazılmadı ({task})")
+            return
+        self.cache.set(cache_key, result)
+    
+    def _is_valid_fused(self, result: str) -> bool:
+        """Birleşik JSON yanıtının üç alanı da geçerli mi"""
+        parsed = self._parse_json_object(result)
+        return parsed is not None and bool(self._validate_sentiment(parsed.get('sentiment'))
+                                           and self._validate_topic(parsed.get('topic'))
+                                           and self._validate_bot_response(parsed.get('bot_response')))
+    
+    def _batch_validator(self, indices: List[int]) -> Callable[[str], bool]:
+        """Toplu yanıt yalnızca tüm mesajların etiketleri geçerliyse önbelleğe yazılır"""
+        return lambda result: len(self._parse_batch_labels(result, indices)) == len(indices)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """Tekrar denemeden önce beklenecek süre: 429'da 0 (bekleme limiter üzerinden), diğerlerinde exponential"""
+        if is_rate_limit_error(error):
+            # Bekleme bir sonraki acquire içinde yapılır, böylece diğer thread'ler de yavaşlar
+            # (anahtar havuzunda yalnızca 429 alan anahtar bekletilir, kotası biten anahtar çıkarılır;
+            # bkz. APIKeyPool.record_failure)
+            if self.key_pool is None:
+                self.rate_limiter.penalize(retry_after_from_error(error) or 2 ** attempt)
+            return 0.0
+        if self.key_pool is not None and classify_error(error) == "auth":
+            # Geçersiz anahtar havuzdan çıkarıldı; sıradaki deneme sağlam bir anahtarla hemen yapılır
+            return 0.0
+        return 2 ** attempt  # Exponential backoff
+    
+    def _backoff(self, error: Exception, attempt: int):
+        """Hata sonrası bekle (bkz. _retry_delay)"""
+        delay = self._retry_delay(error, attempt)
+        if delay:
+            time.sleep(delay)
+
+    def _record_failure(self, error: Exception, attempt: int, max_retries: int, task: str = "other") -> bool:
+        """Hatayı sınıflandır, devre kesiciye ve telemetriye bildir; tekrar denenecekse True döndür"""
+        error_kind = classify_error(error)
+        if error_kind == "auth" and self.key_pool is not None and self.key_pool.active_keys:
+            # Geçersiz anahtar havuzdan çıkarıldı; provider sağlıklı, çağrı kalan anahtarlarla denenir
+            logger.warning(f"🔑 Anahtar hatası (deneme {attempt + 1}): {error}")
+            retry = attempt < max_retries - 1
+            self.telemetry.record_error(task, "key_disabled", retry)
+            return retry
+        self.circuit_breaker.record_failure(error_kind)
+        logger.warning(f"API çağrısı hatası (deneme {attempt + 1}, {error_kind}): {error}")
+        
+        retry = error_kind not in NON_RETRIABLE_ERRORS and attempt < max_retries - 1
+        self.telemetry.record_error(task, error_kind, retry)
+        return retry
+    
+    def _begin_row_state(self, degraded: bool = False) -> Dict:
+        """Analiz edilen satır için degrade durumunu başlat"""
+        state = {'degraded': degraded}
+        _row_state.set(state)
+        return state
+    
+    def _mark_degraded(self):
+        """Aktif satırı kural tabanlı analize düşmüş olarak işaretle"""
+        state = _row_state.get()
+        if state is not None:
+            state['degraded'] = True
+    
+    def _is_degraded(self) -> bool:
+        """Aktif satır kural tabanlı analize düştü mü"""
+        state = _row_state.get()
+        return state is not None and state['degraded']
+    
+    def _hedge_params(self, params: Dict) -> Dict:
+        """Çağrı parametrelerini hedge provider/modeline uyarla"""
+        hedge_params = dict(params, model=self.hedge_model)
+        if self.hedge_provider != "openai":
+            hedge_params.pop('frequency_penalty', None)
+            hedge_params.pop('presence_penalty', None)
+        if self.hedge_model in JSON_MODE_UNSUPPORTED_MODELS:
+            hedge_params.pop('response_format', None)
+        return hedge_params
+    
+    def _without_sdk_retries(self, client):
+        """
+        Uyarlanabilir eşzamanlılıkta SDK'nın kendi retry'larını kapat
+        
+        SDK 429'ları kendi içinde tekrar denerse denetleyici yalnızca uzayan gecikmeyi görür;
+        tekrar denemeler zaten call_llm_with_retry döngüsünde (limiter ile) yapılır.
+        """
+        if self.concurrency_controller is None or not hasattr(client, 'with_options'):
+            return client
+        return client.with_options(max_retries=0)
+    
+    def _get_inflight_semaphore(self) -> asyncio.Semaphore:
+        """Çalışan olay döngüsüne ait eşzamanlı istek sınırı (yoksa veya döngü değiştiyse yeniden kurulur)"""
+        if self._inflight_semaphore is None or self._inflight_loop is not asyncio.get_running_loop():
+            self._set_inflight_limit(resolve_worker_limit(self.provider))
+        return self._inflight_semaphore
+    
+    def _set_inflight_limit(self, max_concurrency: int):
+        """Çalışan olay döngüsü için eşzamanlı istek sınırını kur"""
+        self._inflight_semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._inflight_loop = asyncio.get_running_loop()
+    
+    def _hedge_limiter(self) -> TokenBucketRateLimiter:
+        """Hedge'in RPM/TPM limiter'ı: farklı provider/model'in limiter'ı veya güncel ana limiter"""
+        return self._hedge_rate_limiter if self._hedge_rate_limiter is not None else self.rate_limiter
+    
+    def _call_target(self, hedge: bool, reserved_tokens: int = 0, is_async: bool = False) -> Tuple:
+        """
+        Çağrının gideceği (istemci, limiter, havuzdaki anahtar): hedge hedefi, havuzdan anahtar veya ana istemci
+        
+        Havuzda anahtar, rezerve edilecek token'larla birlikte (RPM ve TPM) en kısa bekleyecek olandır.
+        """
+        if hedge and self._hedge_api_key is not None:
+            return (self._hedge_async_client if is_async else self._hedge_client), self._hedge_limiter(), None
+        if self.key_pool is not None:
+            key = self.key_pool.select(reserved_tokens)
+            client = (key.async_client or self.async_client) if is_async else key.client
+            return client, key.rate_limiter, key
+        client = self.async_client if is_async else self.client
+        return client, (self._hedge_limiter() if hedge else self.rate_limiter), None
+    
+    def _complete(self, messages: List[Dict], params: Dict, reserved_tokens: int, task: str,
+                  hedge: bool = False, sent: Optional[threading.Event] = None) -> str:
+        """Tek API denemesi: limiter, çağrı ve yanıtın okunması (hedge=True ise hedge hedefine)"""
+        client, rate_limiter, key = self._call_target(hedge, reserved_tokens)
+        controller = None if hedge else self.concurrency_controller
+        started = time.perf_counter()
+        rate_limiter.acquire(reserved_tokens)
+        ticket = controller.acquire() if controller is not None else None
+        wait = time.perf_counter() - started
+        if sent is not None:
+            sent.set()
+        
+        latency, error = None, None
+        started = time.perf_counter()
+        try:
+            if self.provider == "huggingface":
+                # Hugging Face için farklı format
+                prompt = f"{messages[0]['content']}\n\n{messages[1]['content']}"
+                response = self.client.text_generation(prompt=prompt, **params)
+            else:
+                client = client if hedge else self._without_sdk_retries(client)
+                response = client.chat.completions.create(messages=messages, **params)
+            latency = time.perf_counter() - started
+        except Exception as e:
+            error = e
+            if key is not None:
+                self.key_pool.record_failure(key, e)
+            raise
+        finally:
+            if ticket is not None:
+                controller.release(ticket, latency, error)
+        
+        if key is not None:
+            self.key_pool.record_success(key, self._response_tokens(response))
+        if self.provider == "huggingface":
+            return self._read_text_generation(response, prompt, task, latency, wait)
+        if self.hedge_policy is not None and not hedge:
+            self.hedge_policy.observe(task, latency)
+        return self._read_completion(response, reserved_tokens, task, latency, wait, rate_limiter)
+    
+    def _complete_hedged(self, messages: List[Dict], params: Dict, reserved_tokens: int,
+                         task: str) -> Tuple[str, bool]:
+        """
+        Ana çağrı gecikme eşiğini aşarsa hedge gönder; ilk başarılı yanıtı ve hedge'in kazanıp kazanmadığını döndür
+        
+        Senkron çağrılar kesilemediği için kaybeden çağrı arka planda tamamlanır, sonucu atılır.
+        """
+        delay = self.hedge_policy.hedge_delay(task)
+        if delay is None:
+            return self._complete(messages, params, reserved_tokens, task), False
+        
+        outcomes = queue.Queue()
+        sent = threading.Event()
+        
+        def attempt(hedge: bool, attempt_params: Dict):
+            try:
+                result = self._complete(messages, attempt_params, reserved_tokens, task, hedge, sent)
+                outcomes.put((hedge, result, None))
+            except Exception as e:
+                outcomes.put((hedge, None, e))
+            finally:
+                sent.set()
+        
+        threading.Thread(target=attempt, args=(False, params), daemon=True).start()
+        # Eşik, limiter beklemesi bittikten (istek gönderildikten) sonra işlemeye başlar
+        sent.wait()
+        
+        pending, hedged, errors = 1, False, []
+        while pending:
+            try:
+                hedge, result, error = outcomes.get(timeout=None if hedged else delay)
+            except queue.Empty:
+                hedged = True
+                if self.hedge_policy.try_hedge():
+                    logger.info(f"🛡️ Hedge gönderildi ({task}, eşik: {delay:.2f} sn)")
+                    self.telemetry.record_hedge(task)
+                    threading.Thread(target=attempt, args=(True, self._hedge_params(params)), daemon=True).start()
+                    pending += 1
+                continue
+            
+            pending -= 1
+            if error is None:
+                if hedge:
+                    self.telemetry.record_hedge(task, won=True)
+                return result, hedge
+            errors.append(error)
+        raise errors[0]
+    
+    async def _complete_async(self, messages: List[Dict], params: Dict, reserved_tokens: int, task: str,
+                              hedge: bool = False, sent: Optional[asyncio.Event] = None) -> str:
+        """
+        Tek asenkron API denemesi (hedge=True ise hedge hedefine)
+        
+        Hedge'ler eşzamanlılık sınırını beklemez (ek yük HedgePolicy.max_hedge_rate ile sınırlıdır);
+        aksi halde yavaş çağrıların tuttuğu slotlar hedge'i de geciktirirdi.
+        """
+        client, rate_limiter, key = self._call_target(hedge, reserved_tokens, is_async=True)
+        client = client if hedge else self._without_sdk_retries(client)
+        started = time.perf_counter()
+        await rate_limiter.acquire_async(reserved_tokens)
+        semaphore = None if hedge else self._get_inflight_semaphore()
+        controller = None if hedge else self.concurrency_controller
+        if semaphore is not None:
+            await semaphore.acquire()
+        latency, error, ticket = None, None, None
+        try:
+            if controller is not None:
+                ticket = await controller.acquire_async()
+            # Bekleme süresi limiter ve eşzamanlılık sınırını birlikte kapsar
+            wait = time.perf_counter() - started
+            if sent is not None:
+                sent.set()
+            started = time.perf_counter()
+            response = await client.chat.completions.create(messages=messages, **params)
+            latency = time.perf_counter() - started
+        except Exception as e:
+            error = e
+            if key is not None:
+                self.key_pool.record_failure(key, e)
+            raise
+        finally:
+            if ticket is not None:
+                controller.release(ticket, latency, error)
+            if semaphore is not None:
+                semaphore.release()
+        if key is not None:
+            self.key_pool.record_success(key, self._response_tokens(response))
+        if self.hedge_policy is not None and not hedge:
+            self.hedge_policy.observe(task, latency)
+        return self._read_completion(response, reserved_tokens, task, latency, wait, rate_limiter)
+    
+    async def _complete_hedged_async(self, messages: List[Dict], params: Dict, reserved_tokens: int,
+                                     task: str) -> Tuple[str, bool]:
+        """Asenkron hedge: eşik aşılırsa kopya gönderilir, ilk başarılı yanıt kazanır, diğeri iptal edilir"""
+        delay = self.hedge_policy.hedge_delay(task)
+        if delay is None:
+            return await self._complete_async(messages, params, reserved_tokens, task), False
+        
+        sent = asyncio.Event()
+        primary = asyncio.ensure_future(self._complete_async(messages, params, reserved_tokens, task, sent=sent))
+        sent_waiter = asyncio.ensure_future(sent.wait())
+        hedge = None
+        pending = {primary}
+        try:
+            # Eşik, limiter ve eşzamanlılık beklemesi bittikten sonra işlemeye başlar
+            await asyncio.wait({primary, sent_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if pending and self.hedge_policy.try_hedge():
+                logger.info(f"🛡️ Hedge gönderildi ({task}, eşik: {delay:.2f} sn)")
+                self.telemetry.record_hedge(task)
+                hedge = asyncio.ensure_future(self._complete_async(messages, self._hedge_params(params),
+                                                                   reserved_tokens, task, hedge=True))
+                pending.add(hedge)
+            
+            errors = []
+            while True:
+                for finished in done:
+                    if finished.exception() is None:
+                        if finished is hedge:
+                            self.telemetry.record_hedge(task, won=True)
+                        return finished.result(), finished is hedge
+                    errors.append(finished.exception())
+                if not pending:
+                    raise errors[0]
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sent_waiter.cancel()
+            # Kaybeden çağrı iptal edilir (httpx isteği kapatılır)
+            for unfinished in pending:
+                unfinished.cancel()
+    
+    def call_llm_with_retry(self, messages: List[Dict], max_retries: int = 3,
+                            max_tokens: int = 50, json_mode: bool = False, task: str = "other",
+                            validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        LLM API çağrısı yap (önbellek ve retry mekanizması ile; metrikler task adıyla tutulur)
+        
+        Yanıt yalnızca doğrulamadan geçerse önbelleğe yazılır (bkz. _cache_store).
+        """
+        params = self._completion_params(max_tokens, json_mode)
+        cache_key, cached = self._cache_lookup(messages, params)
+        if cached is not None:
+            self.telemetry.record_cache_hit(task)
+            return cached
+        
+        # RPM/TPM bütçesinden tahmini prompt + en fazla completion token'ı ayrılır
+        reserved_tokens = estimate_prompt_tokens(messages) + max_tokens
         
         for attempt in range(max_retries):
+            if not self.circuit_breaker.allow_request():
+                # Devre açık: API'ye gitmeden kural tabanlı analize düşülür
+                self._mark_degraded()
+                return "Hata"
+            
             try:
-                if self.provider == "groq":
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        max_tokens=50,
-                        temperature=0.1,
-                        top_p=0.9
-                    )
-                    
-                elif self.provider == "openai":
-                    response = self.client.chat.completions.create(
-                        model=self.model,
-                        messages=messages,
-                        max_tokens=50,
-                        temperature=0.1,
-                        top_p=0.9,
-                        frequency_penalty=0,
-                        presence_penalty=0
-                    )
-                    
-                elif self.provider == "huggingface":
-                    # Hugging Face için farklı format
-                    prompt = f"{messages[0]['content']}\n\n{messages[1]['content']}"
-                    response = self.client.text_generation(
-                        prompt=prompt,
-                        model=self.model,
-                        max_new_tokens=50,
-                        temperature=0.1
-                    )
-                    result = response.strip()
-                    self.api_calls += 1
-                    logger.info(f"LLM Response: {result}")
-                    return result
-                
-                # İstatistikleri güncelle
-                self.api_calls += 1
-                if hasattr(response, 'usage') and response.usage:
-                    self.total_tokens += response.usage.total_tokens
+                if self.hedge_policy is not None:
+                    result, hedged = self._complete_hedged(messages, params, reserved_tokens, task)
+                else:
+                    result, hedged = self._complete(messages, params, reserved_tokens, task), False
                 
-                result = response.choices[0].message.content.strip()
-                logger.info(f"LLM Response: {result}")
+                self.circuit_breaker.record_success()
+                self._cache_store(self._cache_key(messages, params, hedge=True) if hedged else cache_key,
+                                  result, task, validate)
                 return result
                 
             except Exception as e:
-                logger.warning(f"API çağrısı hatası (deneme {attempt + 1}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                if not self._record_failure(e, attempt, max_retries, task):
+                    logger.error(f"API çağrısı başarısız: {e}")
+                    self._mark_degraded()
+                    return "Hata"
+                self._backoff(e, attempt)
+        
+        return "Hata"
+    
+    async def call_llm_with_retry_async(self, messages: List[Dict], max_retries: int = 3,
+                                        max_tokens: int = 50, json_mode: bool = False, task: str = "other",
+                                        validate: Optional[Callable[[str], bool]] = None) -> str:
+        """Asenkron LLM API çağrısı yap (eşzamanlı istek sınırı, önbellek ve retry ile)"""
+        
+        # Asenkron istemcisi olmayan provider'larda senkron çağrı thread'e taşınır
+        if self.async_client is None:
+            async with self._get_inflight_semaphore():
+                return await asyncio.to_thread(self.call_llm_with_retry, messages, max_retries, max_tokens,
+                                               json_mode, task, validate)
+        
+        params = self._completion_params(max_tokens, json_mode)
+        cache_key, cached = self._cache_lookup(messages, params)
+        if cached is not None:
+            self.telemetry.record_cache_hit(task)
+            return cached
+        
+        reserved_tokens = estimate_prompt_tokens(messages) + max_tokens
+        
+        for attempt in range(max_retries):
+            if not self.circuit_breaker.allow_request():
+                self._mark_degraded()
+                return "Hata"
+            
+            try:
+                if self.hedge_policy is not None:
+                    result, hedged = await self._complete_hedged_async(messages, params, reserved_tokens, task)
                 else:
+                    result, hedged = await self._complete_async(messages, params, reserved_tokens, task), False
+                self.circuit_breaker.record_success()
+                self._cache_store(self._cache_key(messages, params, hedge=True) if hedged else cache_key,
+                                  result, task, validate)
+                return result
+                
+            except Exception as e:
+                if not self._record_failure(e, attempt, max_retries, task):
                     logger.error(f"API çağrısı başarısız: {e}")
+                    self._mark_degraded()
                     return "Hata"
+                delay = self._retry_delay(e, attempt)
+                if delay:
+                    await asyncio.sleep(delay)
         
         return "Hata"
 
-    def analyze_sentiment_enhanced(self, text: str) -> str:
-        """Gelişmiş sentiment analizi"""
-        messages = [
-            {"role": "system", "content": self.system_message},
-            {"role": "user", "content": self.sentiment_prompt.format(text=text)}
-        ]
+    def _decode_label(self, value: str, codes: Dict[str, str]) -> Optional[str]:
+        """Kısa kod modunda yanıtı kod tablosundan çöz (tırnak/nokta gibi süsler atılır)"""
+        if not self.compact_labels:
+            return None
+        return codes.get(value.strip().strip('"\'`.').upper())
+    
+    def _validate_sentiment(self, value) -> Optional[str]:
+        """LLM sentiment çıktısını doğrula, geçersizse None döndür"""
+        if not isinstance(value, str):
+            return None
+        decoded = self._decode_label(value, SENTIMENT_CODES)
+        if decoded:
+            return decoded
+        value = value.strip().title()
+        return value if value in ["Pozitif", "Negatif", "Nötr"] else None
+    
+    def _validate_topic(self, value) -> Optional[str]:
+        """LLM konu çıktısını en yakın kategoriye eşle, eşleşme yoksa None döndür"""
+        if not isinstance(value, str) or not value.strip():
+            return None
+        decoded = self._decode_label(value, self.topic_codes)
+        if decoded:
+            return decoded
         
-        result = self.call_llm_with_retry(messages)
+        # Önce birebir eşleşme, yoksa kategori adı içinde arama
+        value = value.strip().strip('"\'`.').lower()
+        if value in self._topic_names:
+            return self._topic_names[value]
+        for category in self.dugum_buketi_categories:
+            if category.lower() in value or value in category.lower():
+                return category
+        return None
+    
+    def _validate_bot_response(self, value) -> Optional[str]:
+        """LLM bot yanıt çıktısını doğrula, geçersizse None döndür"""
+        if not isinstance(value, str):
+            return None
+        decoded = self._decode_label(value, BOT_RESPONSE_CODES)
+        if decoded:
+            return decoded
+        if "evet" in value.lower():
+            return "Evet"
+        elif "hayır" in value.lower():
+            return "Hayır"
+        return None
+    
+    def _build_conversation_context(self, conversation_history: List[Dict], current_index: int) -> str:
+        """Mesajın etrafındaki konuşma bağlamını (önceki 2, sonraki 2 mesaj) hazırla"""
+        context_messages = []
+        start_idx = max(0, current_index - 2)
+        end_idx = min(len(conversation_history), current_index + 3)
         
-        # Sonucu temizle ve doğrula
-        result = result.strip().title()
-        valid_sentiments = ["Pozitif", "Negatif", "Nötr"]
+        for i in range(start_idx, end_idx):
+            msg = conversation_history[i]
+            sender_type = "Müşteri" if msg.get('user_type') == 'customer' else "Destek"
+            context_messages.append(f"{sender_type}: {msg.get('message', '')}")
         
-        if result in valid_sentiments:
-            return result
+        return "\n".join(context_messages)
+
+    def _count_fallback(self, task: str, result: str):
+        """Fallback'e düşen görevi say (parse_fallbacks yalnızca yanıtı gelip çözümlenemeyenleri sayar)"""
+        self.telemetry.record_fallback(task)
+        if result != "Hata":
+            with self._stats_lock:
+                self.parse_fallbacks[task] += 1
+    
+    def _sentiment_messages(self, text: str) -> List[Dict]:
+        """Sentiment analizi için mesaj listesini hazırla"""
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "user", "content": self.sentiment_prompt.format(text=text)}
+        ]
+    
+    def _resolve_sentiment(self, result: str, text: str) -> str:
+        """Sentiment çıktısını doğrula, geçersizse anahtar kelime analizine düş"""
+        sentiment = self._validate_sentiment(result)
+        if sentiment:
+            return sentiment
         else:
             # Fallback: Anahtar kelime analizi
+            self._count_fallback('sentiment', result)
             return self._fallback_sentiment_analysis(text)
     
-    def analyze_topic_enhanced(self, text: str) -> str:
-        """Gelişmiş konu analizi"""
-        messages = [
+    def _topic_messages(self, text: str) -> List[Dict]:
+        """Konu analizi için mesaj listesini hazırla"""
+        return [
             {"role": "system", "content": self.system_message},
             {"role": "user", "content": self.topic_prompt.format(text=text)}
         ]
-        
-        result = self.call_llm_with_retry(messages)
-        
-        # En yakın kategoriyi bul
-        result = result.strip()
-        for category in self.dugum_buketi_categories:
-            if category.lower() in result.lower() or result.lower() in category.lower():
-                return category
+    
+    def _resolve_topic(self, result: str, text: str) -> str:
+        """Konu çıktısını en yakın kategoriye eşle, eşleşme yoksa anahtar kelime analizine düş"""
+        topic = self._validate_topic(result)
+        if topic:
+            return topic
         
         # Fallback: Anahtar kelime analizi
+        self._count_fallback('topic', result)
         return self._fallback_topic_analysis(text)
     
-    def analyze_bot_response_enhanced(self, conversation_history: List[Dict], current_index: int) -> str:
-        """Gelişmiş bot yanıt analizi"""
+    def _bot_response_messages(self, conversation_history: List[Dict], current_index: int) -> List[Dict]:
+        """Bot yanıt analizi için mesaj listesini hazırla"""
         current_msg = conversation_history[current_index]
         
         # Konuşma bağlamını hazırla
-        context_messages = []
-        start_idx = max(0, current_index - 2)
-        end_idx = min(len(conversation_history), current_index + 3)
-        
-        for i in range(start_idx, end_idx):
-            msg = conversation_history[i]
-            sender_type = "Müşteri" if msg.get('user_type') == 'customer' else "Destek"
-            context_messages.append(f"{sender_type}: {msg.get('message', '')}")
+        conversation_context = self._build_conversation_context(conversation_history, current_index)
         
-        conversation_context = "\n".join(context_messages)
-        
-        messages = [
+        return [
             {"role": "system", "content": self.system_message},
             {"role": "user", "content": self.bot_response_prompt.format(
                 conversation_context=conversation_context,
                 customer_message=current_msg.get('message', '')
             )}
         ]
-        
-        result = self.call_llm_with_retry(messages)
-        
-        # Sonucu temizle ve doğrula
-        if "evet" in result.lower():
-            return "Evet"
-        elif "hayır" in result.lower():
-            return "Hayır"
+    
+    def _resolve_bot_response(self, result: str, conversation_history: List[Dict], current_index: int) -> str:
+        """Bot yanıt çıktısını doğrula, geçersizse kural tabanlı analize düş"""
+        bot_response = self._validate_bot_response(result)
+        if bot_response:
+            return bot_response
         else:
             # Fallback: Basit kural tabanlı analiz
+            self._count_fallback('bot_response', result)
             return self._fallback_bot_response_analysis(conversation_history, current_index)
+
+    def analyze_sentiment_enhanced(self, text: str) -> str:
+        """Gelişmiş sentiment analizi"""
+        result = self.call_llm_with_retry(self._sentiment_messages(text), max_tokens=self.label_max_tokens,
+                                          task="sentiment")
+        return self._resolve_sentiment(result, text)
     
-    def _fallback_sentiment_analysis(self, text: str) -> str:
-        """Fallback sentiment analizi"""
-        text_lower = text.lower()
+    def analyze_topic_enhanced(self, text: str) -> str:
+        """Gelişmiş konu analizi"""
+        result = self.call_llm_with_retry(self._topic_messages(text), max_tokens=self.label_max_tokens, task="topic")
+        return self._resolve_topic(result, text)
+    
+    def _routed_tasks(self, message: Dict) -> Tuple[str, ...]:
+        """Mesajın user_type'ına göre çalıştırılacak görevler"""
+        if self.task_routing is None:
+            return ANALYSIS_TASKS
+        return self.task_routing.get(message.get('user_type'), ANALYSIS_TASKS)
+    
+    def _skipped_text_labels(self, message: Dict) -> Dict[str, str]:
+        """Mesaja uygulanmayan bağlamdan bağımsız görevler (sentiment, konu) için "N/A" etiketleri"""
+        routed = self._routed_tasks(message)
+        return {f'llm_{task}': NOT_APPLICABLE for task in ('sentiment', 'topic') if task not in routed}
+    
+    def _needs_llm(self, conversation_history: List[Dict], current_index: int) -> bool:
+        """Mesajın en az bir görevi model gerektiriyor mu"""
+        routed = self._routed_tasks(conversation_history[current_index])
+        if 'sentiment' in routed or 'topic' in routed:
+            return True
+        return ('bot_response' in routed
+                and self._structural_bot_response(conversation_history, current_index)[0] is None)
+    
+    def _apply_task_routing(self, message: Dict, result: Dict):
+        """Mesaja uygulanmayan görevlerin hücrelerini "N/A" yap ve say"""
+        skipped = [task for task in ANALYSIS_TASKS if task not in self._routed_tasks(message)]
+        if not skipped:
+            return
+        with self._stats_lock:
+            for task in skipped:
+                result[f'llm_{task}'] = NOT_APPLICABLE
+                self.routing_stats[task] += 1
+    
+    def _structural_bot_response(self, conversation_history: List[Dict], current_index: int) -> Tuple[Optional[str], str]:
+        """
+        Bot yanıtını yalnızca konuşma yapısından (user_type ve sıra) belirle
         
-        positive_words = ['güzel', 'harika', 'mükemmel', 'teşekkür', 'memnun', 'beğendim', 'süper', 'muhteşem']
-        negative_words = ['kötü', 'berbat', 'şikayet', 'memnun değil', 'problem', 'geç', 'pahalı', 'kızgın']
+        Returns:
+            (etiket, neden): Sonraki BOT_RESPONSE_WINDOW mesajda destek yanıtı olmayan
+            müşteri mesajı -> ("Hayır", "no_support_reply"); diğer tüm durumlar ->
+            (None, "ambiguous")
+
+        Destek mesajları yapıdan etiketlenmez: manuel etiketlerde bu satırlar çoğunlukla
+        "Hayır" olduğundan sonuç modele bırakılır. Destek mesajlarında bot yanıtı
+        istenmiyorsa task_routing ile kapatılır (ör. ROLE_AWARE_ROUTING), hücre "N/A" olur.
+        """
+        if conversation_history[current_index].get('user_type') == 'customer':
+            following = conversation_history[current_index + 1:current_index + 1 + BOT_RESPONSE_WINDOW]
+            if not any(msg.get('user_type') == 'support' for msg in following):
+                return "Hayır", "no_support_reply"
         
-        pos_count = sum(1 for word in positive_words if word in text_lower)
-        neg_count = sum(1 for word in negative_words if word in text_lower)
+        return None, "ambiguous"
+    
+    def _apply_structural_bot_response(self, conversation_history: List[Dict], current_index: int, result: Dict):
+        """Yapı kesin sonuç veriyorsa bot yanıtını onunla belirle ve nedeni say"""
+        if 'bot_response' not in self._routed_tasks(conversation_history[current_index]):
+            return
         
-        if pos_count > neg_count:
-            return "Pozitif"
-        elif neg_count > pos_count:
-            return "Negatif"
-        else:
-            return "Nötr"
+        label, reason = self._structural_bot_response(conversation_history, current_index)
+        if label is not None:
+            result['llm_bot_response'] = label
+        with self._stats_lock:
+            self.bot_response_resolution[reason] += 1
     
-    def _fallback_topic_analysis(self, text: str) -> str:
-        """Fallback konu analizi"""
-        text_lower = text.lower()
-        
-        keyword_mapping = {
-            "Düğün Mekanı": ["mekan", "salon", "bahçe", "düğün salonu", "yer"],
-            "Gelinlik": ["gelinlik", "elbise", "gelin", "kıyafet"],
-            "Fotoğrafçı": ["fotoğraf", "çekim", "albüm", "kameraman"],
-            "Fiyat Sorgusu": ["fiyat", "ücret", "maliyet", "ne kadar", "para", "tutar"],
-            "Rezervasyon": ["rezervasyon", "randevu", "tarih", "saat"],
-            "Şikayet": ["şikayet", "memnun değil", "problem", "sorun"]
+    def analyze_bot_response_enhanced(self, conversation_history: List[Dict], current_index: int) -> str:
+        """Gelişmiş bot yanıt analizi (yapı kesin sonuç veriyorsa veya görev uygulanmıyorsa çağrı yapılmaz)"""
+        if 'bot_response' not in self._routed_tasks(conversation_history[current_index]):
+            return NOT_APPLICABLE
+        
+        label, _ = self._structural_bot_response(conversation_history, current_index)
+        if label is not None:
+            return label
+        
+        result = self.call_llm_with_retry(self._bot_response_messages(conversation_history, current_index),
+                                          max_tokens=self.label_max_tokens, task="bot_response")
+        return self._resolve_bot_response(result, conversation_history, current_index)
+    
+    async def analyze_bot_response_enhanced_async(self, conversation_history: List[Dict], current_index: int) -> str:
+        """analyze_bot_response_enhanced'ın asenkron karşılığı"""
+        if 'bot_response' not in self._routed_tasks(conversation_history[current_index]):
+            return NOT_APPLICABLE
+        
+        label, _ = self._structural_bot_response(conversation_history, current_index)
+        if label is not None:
+            return label
+        
+        result = await self.call_llm_with_retry_async(self._bot_response_messages(conversation_history, current_index),
+                                                      max_tokens=self.label_max_tokens, task="bot_response")
+        return self._resolve_bot_response(result, conversation_history, current_index)
+    
+    def _parse_json_object(self, result: str) -> Optional[Dict]:
+        """LLM çıktısını JSON nesnesi olarak ayrıştır (```json blokları temizlenir)"""
+        text = result.strip()
+        if text.startswith("```"):
+            text = text.strip("`").strip()
+            if text.lower().startswith("json"):
+                text = text[4:].strip()
+        try:
+            parsed = json.loads(text)
+        except (json.JSONDecodeError, ValueError):
+            return None
+        return parsed if isinstance(parsed, dict) else None
+    
+    def _fused_messages(self, conversation_history: List[Dict], current_index: int) -> List[Dict]:
+        """Birleşik analiz için mesaj listesini hazırla"""
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "user", "content": self.fused_prompt.format(
+                conversation_context=self._build_conversation_context(conversation_history, current_index),
+                text=conversation_history[current_index].get('message', '')
+            )}
+        ]
+    
+    def _resolve_fused(self, result: str, conversation_history: List[Dict], current_index: int) -> Dict[str, str]:
+        """Birleşik JSON çıktısını alan alan doğrula, geçersiz alanlar için fallback kullan"""
+        text = conversation_history[current_index].get('message', '')
+        parsed = self._parse_json_object(result) or {}
+        
+        sentiment = self._validate_sentiment(parsed.get('sentiment'))
+        topic = self._validate_topic(parsed.get('topic'))
+        bot_response = self._validate_bot_response(parsed.get('bot_response'))
+        
+        if not (sentiment and topic and bot_response):
+            logger.warning(f"⚠️ Birleşik yanıt eksik/geçersiz, fallback kullanılıyor: {result}")
+            for task, label in (('sentiment', sentiment), ('topic', topic), ('bot_response', bot_response)):
+                if not label:
+                    self._count_fallback(task, result)
+        
+        return {
+            'llm_sentiment': sentiment or self._fallback_sentiment_analysis(text),
+            'llm_topic': topic or self._fallback_topic_analysis(text),
+            'llm_bot_response': bot_response or self._fallback_bot_response_analysis(conversation_history, current_index)
         }
+    
+    def analyze_message_fused(self, conversation_history: List[Dict], current_index: int) -> Dict[str, str]:
+        """Sentiment, konu ve bot yanıtını tek bir JSON çağrısında analiz et"""
+        result = self.call_llm_with_retry(
+            self._fused_messages(conversation_history, current_index), max_tokens=self.fused_max_tokens, json_mode=True,
+            task="fused"
+        )
+        return self._resolve_fused(result, conversation_history, current_index)
+    
+    async def analyze_message_fused_async(self, conversation_history: List[Dict], current_index: int) -> Dict[str, str]:
+        """analyze_message_fused'ın asenkron karşılığı"""
+        result = await self.call_llm_with_retry_async(
+            self._fused_messages(conversation_history, current_index), max_tokens=self.fused_max_tokens, json_mode=True,
+            task="fused"
+        )
+        return self._resolve_fused(result, conversation_history, current_index)
+    
+    def _build_batch_conversation(self, conversation_history: List[Dict], indices: List[int]) -> str:
+        """Toplu prompt için numaralı mesajları ve çevresindeki bağlamı hazırla"""
+        start_idx = max(0, indices[0] - 2)
+        end_idx = min(len(conversation_history), indices[-1] + 3)
         
-        for category, keywords in keyword_mapping.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return category
+        lines = []
+        for i in range(start_idx, end_idx):
+            msg = conversation_history[i]
+            sender_type = "Müşteri" if msg.get('user_type') == 'customer' else "Destek"
+            marker = f"[{i}] " if i in indices else ""
+            lines.append(f"{marker}{sender_type}: {msg.get('message', '')}")
+        
+        return "\n".join(lines)
+    
+    def _batch_indices(self, conversation_history: List[Dict], indices: List[int]) -> List[int]:
+        """Toplu analize girecek (boş olmayan ve model gerektiren) mesaj indekslerini seç"""
+        return [i for i in indices
+                if conversation_history[i].get('message', '').strip() and self._needs_llm(conversation_history, i)]
+    
+    def _batch_messages(self, conversation_history: List[Dict], indices: List[int]) -> List[Dict]:
+        """Toplu analiz için mesaj listesini hazırla"""
+        return [
+            {"role": "system", "content": self.system_message},
+            {"role": "user", "content": self.batch_prompt.format(
+                conversation=self._build_batch_conversation(conversation_history, indices)
+            )}
+        ]
+    
+    def _parse_batch_labels(self, result: str, indices: List[int]) -> Dict[int, Dict[str, str]]:
+        """Toplu JSON çıktısından geçerli etiketleri ayıkla (eksik/hatalı elemanlar atlanır)"""
+        parsed = self._parse_json_object(result)
+        
+        # {"results": [...]} veya doğrudan dizi kabul edilir
+        if parsed is not None:
+            items = parsed.get('results', [])
+        else:
+            try:
+                items = json.loads(result)
+            except (json.JSONDecodeError, ValueError):
+                items = []
+        if not isinstance(items, list):
+            items = []
+        
+        labels = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            index = item.get('index')
+            if not isinstance(index, int) or index not in indices or index in labels:
+                continue
+            
+            sentiment = self._validate_sentiment(item.get('sentiment'))
+            topic = self._validate_topic(item.get('topic'))
+            bot_response = self._validate_bot_response(item.get('bot_response'))
+            if sentiment and topic and bot_response:
+                labels[index] = {
+                    'llm_sentiment': sentiment,
+                    'llm_topic': topic,
+                    'llm_bot_response': bot_response
+                }
+        
+        return labels
+    
+    def _record_batch(self, indices: List[int], missing: List[int]):
+        """Toplu analiz istatistiklerini güncelle"""
+        if missing:
+            logger.warning(f"⚠️ Toplu yanıtta {len(missing)} mesaj eksik/hatalı, tek tek tekrar deneniyor")
+        with self._stats_lock:
+            self.batch_stats['batches'] += 1
+            self.batch_stats['batched_messages'] += len(indices)
+            self.batch_stats['retried_messages'] += len(missing)
+    
+    def analyze_batch(self, conversation_history: List[Dict], indices: List[int]) -> Dict[int, Dict[str, str]]:
+        """Birden çok mesajı tek çağrıda analiz et, eksik/hatalı elemanları tek tek tekrar dene"""
+        indices = self._batch_indices(conversation_history, indices)
+        if not indices:
+            return {}
+        
+        result = self.call_llm_with_retry(
+            self._batch_messages(conversation_history, indices),
+            max_tokens=self.batch_item_max_tokens * len(indices) + 20, json_mode=True, task="batch",
+            validate=self._batch_validator(indices)
+        )
+        labels = self._parse_batch_labels(result, indices)
         
-        return "Genel Bilgi"
+        # Eksik veya hatalı elemanlar tek başına (birleşik çağrı ile) tekrar denenir
+        missing = [i for i in indices if i not in labels]
+        self._record_batch(indices, missing)
+        for i in missing:
+            labels[i] = self.analyze_message_fused(conversation_history, i)
+        
+        return labels
+    
+    def analyze_batch_local(self, conversation_history: List[Dict], indices: List[int]) -> Dict[int, Dict[str, str]]:
+        """
+        Yerel modelle bir grup mesajı batch'li ileri geçişlerle analiz et
+        
+        Sentiment ve konu yerel sınıflandırıcıdan, bot yanıtı konuşma yapısından belirlenir.
+        """
+        indices = self._batch_indices(conversation_history, indices)
+        if not indices:
+            return {}
+        
+        texts = [conversation_history[i].get('message', '') for i in indices]
+        started = time.perf_counter()
+        sentiments = self.client.sentiment(texts)
+        self.telemetry.record_call("local_sentiment", time.perf_counter() - started)
+        started = time.perf_counter()
+        topics = self.client.topic(texts, self.dugum_buketi_categories)
+        self.telemetry.record_call("local_topic", time.perf_counter() - started)
+        
+        return {
+            i: {
+                'llm_sentiment': sentiment,
+                'llm_topic': topic,
+                'llm_bot_response': self._fallback_bot_response_analysis(conversation_history, i)
+            }
+            for i, sentiment, topic in zip(indices, sentiments, topics)
+        }
+    
+    def _fallback_sentiment_analysis(self, text: str) -> str:
+        """Fallback sentiment analizi"""
+        return keyword_sentiment(text)
+    
+    def _fallback_topic_analysis(self, text: str) -> str:
+        """Fallback konu analizi"""
+        return keyword_topic(text)
     
     def _fallback_bot_response_analysis(self, conversation_history: List[Dict], current_index: int) -> str:
         """Fallback bot yanıt analizi"""
@@ -398,92 +1608,729 @@ CEVAP (Evet/Hayır):"""
                 return "Evet"
         
         return "Hayır"
+    
+    def _rule_based_labels(self, conversation_history: List[Dict], current_index: int) -> Dict[str, str]:
+        """Provider kullanılamadığında tüm etiketleri kural tabanlı üret"""
+        text = conversation_history[current_index].get('message', '')
+        for task in ANALYSIS_TASKS:
+            self.telemetry.record_fallback(task)
+        return {
+            'llm_sentiment': self._fallback_sentiment_analysis(text),
+            'llm_topic': self._fallback_topic_analysis(text),
+            'llm_bot_response': self._fallback_bot_response_analysis(conversation_history, current_index)
+        }
 
-    def analyze_conversation(self, conversation_data: List[Dict]) -> pd.DataFrame:
-        """Tüm konuşmayı analiz et"""
-        results = []
+    def _record_degraded(self, result: Dict, state: Dict):
+        """Satırın degrade durumunu sonuca yaz ve mesaj kimliğini kaydet"""
+        result['llm_degraded'] = state['degraded']
+        if state['degraded']:
+            with self._stats_lock:
+                self.degraded_message_ids.append(result['message_id'])
+    
+    def _base_result(self, message: Dict, i: int) -> Dict:
+        """Sonuç satırının temel bilgilerini hazırla"""
+        return {
+            'message_id': message.get('message_id', i+1),
+            'timestamp': message.get('timestamp', ''),
+            'sender': message.get('sender', ''),
+            'user_type': message.get('user_type', ''),
+            'message': message.get('message', ''),
+        }
+    
+    def _finalize_result(self, result: Dict) -> Dict:
+        """Sonuç satırına analiz metadata'sını ekle"""
+        result['analysis_timestamp'] = datetime.now().isoformat()
+        result['provider_used'] = self.provider
+        result['model_used'] = self.model
+        return result
+    
+    def _empty_message_labels(self) -> Dict[str, str]:
+        """Boş mesajlar için varsayılan etiketler"""
+        return {'llm_sentiment': 'Nötr', 'llm_topic': 'Genel Bilgi', 'llm_bot_response': 'Hayır'}
+    
+    def _error_labels(self) -> Dict[str, str]:
+        """Analiz hatası durumunda kullanılan etiketler"""
+        return {'llm_sentiment': 'Hata', 'llm_topic': 'Hata', 'llm_bot_response': 'Hata'}
+    
+    def _begin_run(self, conversation_data: List[Dict]):
+        """Yeni analiz için tekilleştirme belleğini sıfırla ve istatistikleri güncelle"""
+        self._text_labels = {}
+        self.degraded_message_ids = []
         
-        logger.info(f"🔍 {len(conversation_data)} mesaj analiz ediliyor...")
+        texts = [normalize_text(m.get('message', '')) for m in conversation_data if m.get('message', '').strip()]
+        with self._stats_lock:
+            self.dedup_stats['messages'] += len(texts)
+            self.dedup_stats['unique_texts'] += len(set(texts))
+    
+    def _dedup_waves(self, conversation_data: List[Dict], indices: List[int]) -> Tuple[List[int], List[int]]:
+        """
+        Paralel analiz için indeksleri iki dalgaya ayır
+        
+        İlk dalga her metnin ilk geçtiği mesajları, ikinci dalga tekrarları içerir;
+        böylece tekrarlar ilk dalgada hesaplanan sentiment/konu etiketlerini kullanır.
+        """
+        if not self.dedup or self.batch_size > 1:
+            return list(indices), []
+        
+        seen = set()
+        first, repeats = [], []
+        for i in indices:
+            key = normalize_text(conversation_data[i].get('message', ''))
+            if key and key in seen:
+                repeats.append(i)
+            else:
+                seen.add(key)
+                first.append(i)
+        return first, repeats
+    
+    def _reuse_text_labels(self, text: str, skipped: Optional[Dict[str, str]] = None) -> Optional[Dict[str, str]]:
+        """
+        Aynı metin bu analizde daha önce etiketlendiyse sentiment/konu etiketlerini döndür
+        
+        Yönlendirmede atlanan görevler (skipped) "N/A" olarak döner; diğer görevlerin
+        hepsi bellekte yoksa None döner.
+        """
+        if not self.dedup:
+            return None
+        
+        skipped = skipped or {}
+        labels = self._text_labels.get(normalize_text(text), {})
+        if any(column not in labels and column not in skipped for column in ('llm_sentiment', 'llm_topic')):
+            return None
+        
+        with self._stats_lock:
+            self.dedup_stats['reused'] += 1
+            self.dedup_stats['dedup_ratio'] = round(self.dedup_stats['reused'] / self.dedup_stats['messages'], 4)
+        return {**labels, **skipped}
+    
+    def _known_text_labels(self, text: str) -> Dict[str, str]:
+        """Metin için bellekteki (eksik olabilecek) sentiment/konu etiketleri"""
+        if not self.dedup:
+            return {}
+        return dict(self._text_labels.get(normalize_text(text), {}))
+    
+    def _remember_text_labels(self, text: str, labels: Dict[str, str]):
+        """Bağlamdan bağımsız etiketleri (sentiment, konu) metin için sakla"""
+        # Kural tabanlı etiketler tekrarlara taşınmaz, provider dönünce yeniden analiz edilir
+        if self.dedup and not self._is_degraded():
+            remembered = self._text_labels.setdefault(normalize_text(text), {})
+            for column in ('llm_sentiment', 'llm_topic'):
+                # Yönlendirmede atlanan ("N/A") görevler tekrarlara taşınmaz
+                if labels[column] != NOT_APPLICABLE:
+                    remembered.setdefault(column, labels[column])
+    
+    def _cascade_labels(self, text: str) -> Dict[str, str]:
+        """Kademeli modda kural motorunun eşiği geçen (güvenilir) sentiment/konu etiketlerini döndür"""
+        if self.cascade_threshold is None:
+            return {}
+        
+        labels = {}
+        sentiment, sentiment_confidence = keyword_sentiment_scored(text)
+        topic, topic_confidence = keyword_topic_scored(text)
+        if sentiment_confidence >= self.cascade_threshold:
+            labels['llm_sentiment'] = sentiment
+        if topic_confidence >= self.cascade_threshold:
+            labels['llm_topic'] = topic
+        if self.fused and len(labels) < 2:
+            # Birleşik modda tek görev bile yükseltilirse üç görev tek çağrıda yapılır
+            labels = {}
+        
+        with self._stats_lock:
+            stats = self.cascade_stats
+            stats['messages'] += 1
+            stats['rule_sentiment'] += 'llm_sentiment' in labels
+            stats['rule_topic'] += 'llm_topic' in labels
+            stats['escalated_messages'] += len(labels) < 2
+            stats['escalation_rate'] = round(stats['escalated_messages'] / stats['messages'], 4)
+        return labels
+    
+    async def _call_unless_ruled_async(self, ruled: Optional[str], messages: List[Dict], task: str) -> str:
+        """Kural motoru güvenilir etiket ürettiyse çağrı yapmadan onu döndür"""
+        if ruled is not None:
+            return ruled
+        return await self.call_llm_with_retry_async(messages, max_tokens=self.label_max_tokens, task=task)
+    
+    def _label_message(self, conversation_data: List[Dict], i: int) -> Dict[str, str]:
+        """Boş olmayan bir mesaj için LLM etiketlerini üret"""
+        text = conversation_data[i].get('message', '')
+        skipped = self._skipped_text_labels(conversation_data[i])
+        
+        # Yönlendirme ve konuşma yapısı tüm görevleri belirliyorsa çağrı yapılmaz
+        if not self._needs_llm(conversation_data, i):
+            return {**skipped, 'llm_bot_response': self.analyze_bot_response_enhanced(conversation_data, i)}
+        
+        # Provider kesintisi (veya yerel modelin grubu işleyemediği durum): doğrudan kural tabanlı analiz
+        if self.circuit_breaker.state == OPEN or self.provider == "local":
+            self._mark_degraded()
+            return self._rule_based_labels(conversation_data, i)
+        
+        # Tekrarlanan metin: sadece bağlama bağlı bot yanıtı analiz edilir
+        reused = self._reuse_text_labels(text, skipped)
+        if reused is not None:
+            return {**reused, 'llm_bot_response': self.analyze_bot_response_enhanced(conversation_data, i)}
+        
+        # Kademeli mod: kural motorunda güvenilir olan görevler LLM'e gitmez; aynı metnin
+        # daha önce (başka rol için) bulunan etiketleri ve mesaja uygulanmayan görevler de
+        ruled = {**self._cascade_labels(text), **self._known_text_labels(text), **skipped}
+        
+        if len(ruled) == 2:
+            labels = {**ruled, 'llm_bot_response': self.analyze_bot_response_enhanced(conversation_data, i)}
+        elif self.fused:
+            # Tek çağrıda üç görev
+            labels = self.analyze_message_fused(conversation_data, i)
+        else:
+            labels = {
+                'llm_sentiment': ruled.get('llm_sentiment') or self.analyze_sentiment_enhanced(text),
+                'llm_topic': ruled.get('llm_topic') or self.analyze_topic_enhanced(text),
+                'llm_bot_response': self.analyze_bot_response_enhanced(conversation_data, i)
+            }
+        
+        self._remember_text_labels(text, labels)
+        return labels
+    
+    async def _label_message_async(self, conversation_data: List[Dict], i: int) -> Dict[str, str]:
+        """_label_message'ın asenkron karşılığı (ayrı görevler eşzamanlı çalışır)"""
+        text = conversation_data[i].get('message', '')
+        skipped = self._skipped_text_labels(conversation_data[i])
+        
+        if not self._needs_llm(conversation_data, i):
+            return {**skipped, 'llm_bot_response': await self.analyze_bot_response_enhanced_async(conversation_data, i)}
+        
+        if self.circuit_breaker.state == OPEN or self.provider == "local":
+            self._mark_degraded()
+            return self._rule_based_labels(conversation_data, i)
+        
+        reused = self._reuse_text_labels(text, skipped)
+        if reused is not None:
+            return {**reused, 'llm_bot_response': await self.analyze_bot_response_enhanced_async(conversation_data, i)}
+        
+        ruled = {**self._cascade_labels(text), **self._known_text_labels(text), **skipped}
+        
+        if self.fused and len(ruled) < 2:
+            labels = await self.analyze_message_fused_async(conversation_data, i)
+        else:
+            sentiment, topic, bot_response = await asyncio.gather(
+                self._call_unless_ruled_async(ruled.get('llm_sentiment'), self._sentiment_messages(text), "sentiment"),
+                self._call_unless_ruled_async(ruled.get('llm_topic'), self._topic_messages(text), "topic"),
+                self.analyze_bot_response_enhanced_async(conversation_data, i)
+            )
+            labels = {
+                'llm_sentiment': self._resolve_sentiment(sentiment, text),
+                'llm_topic': self._resolve_topic(topic, text),
+                'llm_bot_response': bot_response
+            }
+        
+        self._remember_text_labels(text, labels)
+        return labels
+    
+    def _analyze_message(self, conversation_data: List[Dict], i: int, precomputed: Optional[Dict[str, str]] = None,
+                         degraded: bool = False) -> Dict:
+        """Tek bir mesajı analiz et ve sonuç satırını döndür"""
+        message = conversation_data[i]
+        result = self._base_result(message, i)
+        state = self._begin_row_state(degraded)
+        
+        try:
+            logger.info(f"📝 Mesaj {i+1}/{len(conversation_data)} analiz ediliyor...")
+            
+            if message.get('message', '').strip():
+                # Toplu analizden gelen etiketler varsa yeniden çağrı yapılmaz
+                result.update(precomputed or self._label_message(conversation_data, i))
+                self._apply_structural_bot_response(conversation_data, i, result)
+                self._apply_task_routing(message, result)
+                logger.info(f"✅ Analiz tamamlandı: {result['llm_sentiment']} | {result['llm_topic']} | {result['llm_bot_response']}")
+            else:
+                result.update(self._empty_message_labels())
+                self._apply_task_routing(message, result)
+            
+        except Exception as e:
+            logger.error(f"❌ Mesaj {i+1} analiz hatası: {e}")
+            # Hata durumunda varsayılan değerler
+            result.update(self._error_labels())
+        
+        self._record_degraded(result, state)
+        return self._finalize_result(result)
+    
+    async def _analyze_message_async(self, conversation_data: List[Dict], i: int,
+                                     precomputed: Optional[Dict[str, str]] = None, degraded: bool = False) -> Dict:
+        """_analyze_message'ın asenkron karşılığı"""
+        message = conversation_data[i]
+        result = self._base_result(message, i)
+        state = self._begin_row_state(degraded)
+        
+        try:
+            if message.get('message', '').strip():
+                result.update(precomputed or await self._label_message_async(conversation_data, i))
+                self._apply_structural_bot_response(conversation_data, i, result)
+                self._apply_task_routing(message, result)
+                logger.info(f"✅ Mesaj {i+1} tamamlandı: {result['llm_sentiment']} | {result['llm_topic']} | {result['llm_bot_response']}")
+            else:
+                result.update(self._empty_message_labels())
+                self._apply_task_routing(message, result)
+            
+        except Exception as e:
+            logger.error(f"❌ Mesaj {i+1} analiz hatası: {e}")
+            result.update(self._error_labels())
+        
+        self._record_degraded(result, state)
+        return self._finalize_result(result)
+    
+    async def _analyze_batch_async(self, conversation_data: List[Dict], indices: List[int]) -> List[Dict]:
+        """Bir grup mesajı asenkron olarak toplu analiz et ve sonuç satırlarını döndür"""
+        batch_labels = {}
+        batch_indices = self._batch_indices(conversation_data, indices)
+        
+        # Toplu modda degrade işareti grup bazındadır
+        state = self._begin_row_state()
+        if batch_indices and self.provider == "local":
+            try:
+                batch_labels = await asyncio.to_thread(self.analyze_batch_local, conversation_data, batch_indices)
+            except Exception as e:
+                logger.error(f"❌ Yerel model hatası (mesaj {indices[0]+1}-{indices[-1]+1}): {e}")
+        elif batch_indices:
+            try:
+                result = await self.call_llm_with_retry_async(
+                    self._batch_messages(conversation_data, batch_indices),
+                    max_tokens=self.batch_item_max_tokens * len(batch_indices) + 20, json_mode=True, task="batch",
+                    validate=self._batch_validator(batch_indices)
+                )
+                batch_labels = self._parse_batch_labels(result, batch_indices)
+                
+                # Eksik veya hatalı elemanlar tek başına (birleşik çağrı ile) tekrar denenir
+                missing = [i for i in batch_indices if i not in batch_labels]
+                self._record_batch(batch_indices, missing)
+                retried = await asyncio.gather(*(
+                    self.analyze_message_fused_async(conversation_data, i) for i in missing
+                ))
+                batch_labels.update(zip(missing, retried))
+            except Exception as e:
+                logger.error(f"❌ Toplu analiz hatası (mesaj {indices[0]+1}-{indices[-1]+1}): {e}")
+        
+        return await asyncio.gather(*(
+            self._analyze_message_async(conversation_data, i, batch_labels.get(i), state['degraded']) for i in indices
+        ))
+    
+    def _log_run_statistics(self, total_messages: int):
+        """Analiz istatistiklerini yazdır"""
+        logger.info(f"\n📊 ANALİZ İSTATİSTİKLERİ:")
+        logger.info(f"✅ Toplam mesaj: {total_messages}")
+        logger.info(f"🔄 API çağrısı: {self.api_calls}")
+        logger.info(f"🎯 Token kullanımı: {self.total_tokens}")
+        if self.dedup and self.dedup_stats['reused']:
+            logger.info(f"♻️ Tekilleştirme: {self.dedup_stats['reused']} mesajda sentiment/konu yeniden kullanıldı "
+                        f"(oran: %{self.dedup_stats['dedup_ratio'] * 100:.1f})")
+        if self.cache is not None:
+            cache_stats = self.cache.stats()
+            logger.info(f"💾 Önbellek: {cache_stats['hits']} isabet / {cache_stats['misses']} ıska")
+        if self.cascade_threshold is not None and self.cascade_stats['messages']:
+            logger.info(f"🪜 Kademeli mod: {self.cascade_stats['escalated_messages']}/{self.cascade_stats['messages']} "
+                        f"mesaj LLM'e yükseltildi (oran: %{self.cascade_stats['escalation_rate'] * 100:.1f})")
+        resolution = self.bot_response_resolution
+        if resolution['no_support_reply']:
+            logger.info(f"🧭 Bot yanıtı yapıdan belirlendi: {resolution['no_support_reply']} yanıtsız müşteri mesajı "
+                        f"({resolution['ambiguous']} belirsiz mesaj modele soruldu)")
+        if self.task_routing is not None:
+            logger.info(f"🔀 Rol bazlı yönlendirme: {sum(self.routing_stats.values())} görev hücresi N/A "
+                        f"(sentiment: {self.routing_stats['sentiment']}, konu: {self.routing_stats['topic']}, "
+                        f"bot yanıtı: {self.routing_stats['bot_response']})")
+        for task, stats in self.telemetry.summary().items():
+            if stats['latency']['p50'] is not None:
+                logger.info(f"⏱️ {task}: {stats['calls']} çağrı, p50 {stats['latency']['p50']:.3f}s / "
+                            f"p95 {stats['latency']['p95']:.3f}s, {stats['retries']} retry, "
+                            f"{stats['fallbacks']} fallback")
+        if self.key_pool is not None:
+            usage = ", ".join(f"{entry['key']}: {entry['successes']} ({entry['status']})"
+                              for entry in self.key_pool.get_stats()['usage'])
+            logger.info(f"🔑 API anahtarları: {usage}")
+        if self.concurrency_controller is not None:
+            controller_stats = self.concurrency_controller.get_stats()
+            logger.info(f"🎚️ Uyarlanabilir eşzamanlılık: limit {controller_stats['limit']} "
+                        f"(tepe: {controller_stats['peak_in_flight']}, {controller_stats['increases']} artış, "
+                        f"{controller_stats['decreases']} düşüş)")
+        if self.hedge_policy is not None:
+            hedge_stats = self.hedge_policy.get_stats()
+            hedge_wins = sum(stats['hedge_wins'] for stats in self.telemetry.summary().values())
+            logger.info(f"🛡️ Hedge: {hedge_stats['hedges']} gönderildi, {hedge_wins} kazandı, "
+                        f"{hedge_stats['capped']} oran sınırına takıldı (oran: %{hedge_stats['hedge_rate'] * 100:.1f})")
+        if self.degraded_message_ids:
+            logger.warning(f"🚨 {len(self.degraded_message_ids)} mesaj kural tabanlı analize düştü "
+                           f"(devre: {self.circuit_breaker.state})")
+        if self.checkpoint_stats['path']:
+            logger.info(f"📌 Checkpoint: {self.checkpoint_stats['restored']} mesaj geri yüklendi, "
+                        f"{self.checkpoint_stats['written']} satır yazıldı ({self.checkpoint_stats['path']})")
         logger.info(f"🤖 Provider: {self.provider}")
         logger.info(f"🧠 Model: {self.model}")
+
+    def _restore_checkpoint(self, journal: CheckpointJournal, conversation_id: str,
+                            conversation_data: List[Dict]) -> Dict[int, Dict]:
+        """Checkpoint'te tamamlanmış görünen satırları geri yükle (indeks -> satır)"""
+        saved = journal.load(conversation_id)
+        restored = {}
+        self._begin_row_state()
         
         for i, message in enumerate(conversation_data):
-            try:
-                logger.info(f"📝 Mesaj {i+1}/{len(conversation_data)} analiz ediliyor...")
+            row = saved.get(str(message.get('message_id', i+1)))
+            # Kural tabanlı analize düşmüş veya hatalı satırlar yeniden analiz edilir
+            if row is None or row.get('llm_degraded') or row.get('llm_sentiment') == 'Hata':
+                continue
+            restored[i] = row
+            if message.get('message', '').strip():
+                self._remember_text_labels(message['message'], row)
+        
+        logger.info(f"♻️ Checkpoint: {len(restored)} mesaj daha önce analiz edilmiş, atlanıyor")
+        return restored
+    
+    def _prepare_run(self, conversation_data: List[Dict], checkpoint_path: Optional[str], conversation_id: str,
+                     resume: bool) -> Tuple[Optional[CheckpointJournal], Dict[int, Dict], List[int]]:
+        """Analizi başlat: checkpoint günlüğünü aç, tamamlanmış satırları ve kalan indeksleri belirle"""
+        self._begin_run(conversation_data)
+        
+        journal = CheckpointJournal(checkpoint_path) if checkpoint_path else None
+        rows = self._restore_checkpoint(journal, conversation_id, conversation_data) if journal and resume else {}
+        pending = [i for i in range(len(conversation_data)) if i not in rows]
+        
+        self.checkpoint_stats = {'path': checkpoint_path, 'restored': len(rows), 'written': 0}
+        return journal, rows, pending
+    
+    def _checkpoint(self, journal: Optional[CheckpointJournal], conversation_id: str, rows: List[Dict]) -> List[Dict]:
+        """Tamamlanan satırları checkpoint günlüğüne yaz"""
+        if journal is not None:
+            journal.append(conversation_id, rows)
+        return rows
+    
+    def _finish_run(self, journal: Optional[CheckpointJournal], rows: Dict[int, Dict], total_messages: int) -> pd.DataFrame:
+        """Satırları mesaj sırasıyla DataFrame'e dönüştür ve istatistikleri yazdır"""
+        if journal is not None:
+            self.checkpoint_stats['written'] = journal.written
+        
+        df = pd.DataFrame([rows[i] for i in range(total_messages)])
+        
+        # İstatistikleri yazdır
+        self._log_run_statistics(total_messages)
+        
+        return df
+
+    def iter_analyze_conversation(self, conversation_data: List[Dict], checkpoint_path: Optional[str] = None,
+                                  conversation_id: str = "default", resume: bool = False) -> Iterator[Dict]:
+        """
+        Konuşmayı sıralı analiz et ve sonuç satırlarını tamamlandıkça üret (generator)
+        
+        Üretilen satırlar bu metotta biriktirilmez; result_sinks ile tamamlandıkça diske
+        yazılabilir (artımlı çıktı). Girdi ise bağlam penceresi ve bot yanıtı için listenin
+        tamamına erişildiğinden bellekte tutulur; tekilleştirme belleği de benzersiz metin
+        sayısıyla büyür. Bellek girdiyle orantılıdır, sabit değildir; çok büyük veri setleri
+        corpus_runner ile konuşma konuşma işlenmelidir.
+        
+        Args:
+            conversation_data: Mesaj listesi
+            checkpoint_path: Verilirse her mesaj/batch sonucu bu JSONL günlüğüne yazılır
+            conversation_id: Günlükte bu konuşmayı ayıran anahtar
+            resume: True ise günlükte tamamlanmış görünen mesajlar atlanır
+        
+        Yields:
+            analyze_conversation ile aynı şemada sonuç satırları (mesaj sırasıyla)
+        """
+        logger.info(f"🔍 {len(conversation_data)} mesaj analiz ediliyor...")
+        logger.info(f"🤖 Provider: {self.provider}")
+        logger.info(f"🧠 Model: {self.model}")
+        logger.info(f"⚙️ Analiz modu: {self.analysis_mode}")
+        
+        # Sıralı analizde her metnin ilk geçişi tekrarlarından önce işlenir
+        journal, restored, pending = self._prepare_run(conversation_data, checkpoint_path, conversation_id, resume)
+        next_index = 0
+        
+        try:
+            for start in range(0, len(pending), self.batch_size):
+                indices = pending[start:start + self.batch_size]
+                analyzed = dict(zip(indices, self._checkpoint(
+                    journal, conversation_id, self._analyze_group(conversation_data, indices)
+                )))
                 
-                # Temel bilgiler
-                result = {
-                    'message_id': message.get('message_id', i+1),
-                    'timestamp': message.get('timestamp', ''),
-                    'sender': message.get('sender', ''),
-                    'user_type': message.get('user_type', ''),
-                    'message': message.get('message', ''),
-                }
+                # Checkpoint'ten gelen satırlar kendi sıralarında araya katılır
+                while next_index <= indices[-1]:
+                    yield restored.pop(next_index, None) or analyzed[next_index]
+                    next_index += 1
+            
+            while next_index < len(conversation_data):
+                yield restored.pop(next_index)
+                next_index += 1
+        finally:
+            if journal is not None:
+                journal.close()
+                self.checkpoint_stats['written'] = journal.written
+        
+        # İstatistikleri yazdır
+        self._log_run_statistics(len(conversation_data))
+    
+    def analyze_conversation(self, conversation_data: List[Dict], checkpoint_path: Optional[str] = None,
+                             conversation_id: str = "default", resume: bool = False) -> pd.DataFrame:
+        """
+        Tüm konuşmayı analiz et
+        
+        Args:
+            conversation_data: Mesaj listesi
+            checkpoint_path: Verilirse her mesaj/batch sonucu bu JSONL günlüğüne yazılır
+            conversation_id: Günlükte bu konuşmayı ayıran anahtar
+            resume: True ise günlükte tamamlanmış görünen mesajlar atlanır
+        """
+        return pd.DataFrame(list(self.iter_analyze_conversation(conversation_data, checkpoint_path, conversation_id, resume)))
+    
+    def _analyze_group(self, conversation_data: List[Dict], indices: List[int]) -> List[Dict]:
+        """Bir mesaj grubunu (batch modunda tek prompt) analiz et ve sonuç satırlarını döndür"""
+        batch_labels = {}
+        # Toplu modda degrade işareti grup bazındadır
+        state = self._begin_row_state()
+        if self.provider == "local":
+            try:
+                batch_labels = self.analyze_batch_local(conversation_data, indices)
+            except Exception as e:
+                logger.error(f"❌ Yerel model hatası (mesaj {indices[0]+1}-{indices[-1]+1}): {e}")
+        elif self.batch_size > 1:
+            try:
+                batch_labels = self.analyze_batch(conversation_data, indices)
+            except Exception as e:
+                logger.error(f"❌ Toplu analiz hatası (mesaj {indices[0]+1}-{indices[-1]+1}): {e}")
+        
+        return [self._analyze_message(conversation_data, i, batch_labels.get(i), state['degraded']) for i in indices]
+    
+    def analyze_conversation_threaded(self, conversation_data: List[Dict], max_workers: Optional[int] = None,
+                                      checkpoint_path: Optional[str] = None, conversation_id: str = "default",
+                                      resume: bool = False) -> pd.DataFrame:
+        """
+        Tüm konuşmayı thread havuzunda paralel analiz et
+        
+        Asenkron SDK'sı olmayan provider'lar (ör. Hugging Face) için paralel yol.
+        
+        Args:
+            conversation_data: Mesaj listesi
+            max_workers: Worker sayısı (verilmezse provider limiti kullanılır)
+            checkpoint_path, conversation_id, resume: analyze_conversation ile aynı
+        
+        Returns:
+            analyze_conversation ile aynı şemada DataFrame (mesaj sırası korunur)
+        """
+        journal, rows, pending = self._prepare_run(conversation_data, checkpoint_path, conversation_id, resume)
+        
+        try:
+            with ThreadPoolLLMExecutor(self.provider, max_workers) as executor:
+                self._size_client_pool(executor.max_workers)
+                logger.info(f"🔍 {len(pending)} mesaj paralel analiz ediliyor...")
+                logger.info(f"⚙️ Analiz modu: {self.analysis_mode} | Worker: {executor.max_workers}")
                 
-                # LLM analizleri
-                text = message.get('message', '')
+                # Tekrar eden metinler ilk dalgadaki etiketleri kullanır
+                for wave in self._dedup_waves(conversation_data, pending):
+                    groups = [wave[start:start + self.batch_size] for start in range(0, len(wave), self.batch_size)]
+                    grouped_results = executor.map_ordered(
+                        lambda indices: self._checkpoint(
+                            journal, conversation_id, self._analyze_group(conversation_data, indices)
+                        ),
+                        groups
+                    )
+                    for indices, group_rows in zip(groups, grouped_results):
+                        rows.update(zip(indices, group_rows))
+        finally:
+            if journal is not None:
+                journal.close()
+        
+        return self._finish_run(journal, rows, len(conversation_data))
+    
+    async def analyze_conversation_async(self, conversation_data: List[Dict], max_concurrency: int = 8,
+                                         checkpoint_path: Optional[str] = None, conversation_id: str = "default",
+                                         resume: bool = False) -> pd.DataFrame:
+        """
+        Tüm konuşmayı asenkron olarak analiz et
+        
+        Args:
+            conversation_data: Mesaj listesi
+            max_concurrency: Aynı anda uçuşta olabilecek en fazla API isteği
+            checkpoint_path, conversation_id, resume: analyze_conversation ile aynı
+        
+        Returns:
+            analyze_conversation ile aynı şemada DataFrame (mesaj sırası korunur)
+        """
+        self.setup_async_client(max_connections=max_concurrency)
+        self._set_inflight_limit(max_concurrency)
+        
+        logger.info(f"🔍 {len(conversation_data)} mesaj asenkron analiz ediliyor...")
+        logger.info(f"🤖 Provider: {self.provider}")
+        logger.info(f"🧠 Model: {self.model}")
+        logger.info(f"⚙️ Analiz modu: {self.analysis_mode} | Eşzamanlılık: {max_concurrency}")
+        
+        journal, rows, pending = self._prepare_run(conversation_data, checkpoint_path, conversation_id, resume)
+        
+        async def analyze_batch(indices: List[int]) -> List[Dict]:
+            return self._checkpoint(journal, conversation_id, await self._analyze_batch_async(conversation_data, indices))
+        
+        async def analyze_message(i: int) -> Dict:
+            row = await self._analyze_message_async(conversation_data, i)
+            self._checkpoint(journal, conversation_id, [row])
+            return row
+        
+        try:
+            if self.batch_size > 1:
+                groups = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+                batches = await asyncio.gather(*(analyze_batch(indices) for indices in groups))
+                for indices, batch_rows in zip(groups, batches):
+                    rows.update(zip(indices, batch_rows))
+            else:
+                # Tekrar eden metinler ilk dalgadaki etiketleri kullanır
+                for wave in self._dedup_waves(conversation_data, pending):
+                    wave_rows = await asyncio.gather(*(analyze_message(i) for i in wave))
+                    rows.update(zip(wave, wave_rows))
+        finally:
+            if journal is not None:
+                journal.close()
+        
+        return self._finish_run(journal, rows, len(conversation_data))
+
+    def _bulk_tasks(self, conversation_data: List[Dict], i: int, text_owners: Dict[Tuple, int]) -> Dict[str, Tuple]:
+        """
+        Mesaj için bulk görevlerini (görev -> (sahip indeks, mesajlar, max_tokens, json_modu)) hazırla
+        
+        Tekrarlanan metinlerde sentiment/konu ilk geçişin isteğinden okunur, yalnızca
+        bot yanıtı mesajın kendi bağlamıyla istenir (sıralı analizdeki tekilleştirme ile aynı).
+        Mesaja uygulanmayan (yönlendirmede atlanan) görevler istenmez.
+        """
+        text = conversation_data[i].get('message', '')
+        routed = self._routed_tasks(conversation_data[i])
+        
+        def owner_of(task: str) -> int:
+            # Birleşik çağrı her iki görevi de yanıtladığı için sahiplik metin bazındadır
+            key = normalize_text(text) if self.fused else (normalize_text(text), task)
+            return text_owners.setdefault(key, i) if self.dedup else i
+        
+        tasks = {}
+        if self.fused and ('sentiment' in routed or 'topic' in routed):
+            owner = owner_of('fused')
+            tasks['fused'] = (owner, self._fused_messages(conversation_data, owner), self.fused_max_tokens, True)
+        elif not self.fused:
+            for task, messages in (('sentiment', self._sentiment_messages(text)), ('topic', self._topic_messages(text))):
+                if task in routed:
+                    tasks[task] = (owner_of(task), messages, self.label_max_tokens, False)
+        
+        if any(owner != i for owner, *_ in tasks.values()):
+            with self._stats_lock:
+                self.dedup_stats['reused'] += 1
+                self.dedup_stats['dedup_ratio'] = round(self.dedup_stats['reused'] / self.dedup_stats['messages'], 4)
+        elif 'fused' in tasks:
+            return tasks
+        # Yapı kesin sonuç veriyorsa bot yanıtı istenmez (_analyze_message'da belirlenir)
+        if 'bot_response' in routed and self._structural_bot_response(conversation_data, i)[0] is None:
+            tasks['bot_response'] = (i, self._bot_response_messages(conversation_data, i), self.label_max_tokens, False)
+        return tasks
+    
+    def analyze_conversation_bulk(self, conversation_data: List[Dict], batch_client=None,
+                                  batch_file: Optional[str] = None, poll_interval: float = 30.0,
+                                  timeout: Optional[float] = None) -> pd.DataFrame:
+        """
+        Tüm konuşmayı OpenAI uyumlu Batch API ile çevrimdışı (toplu) analiz et
+        
+        Tüm istekler tek bir JSONL dosyasına yazılır, batch olarak gönderilir ve
+        tamamlanınca sonuçlar custom_id üzerinden mesajlara eşlenir. Gecikme
+        önemli olmayan gece analizleri ve geriye dönük yeniden analizler içindir.
+        
+        Args:
+            conversation_data: Mesaj listesi
+            batch_client: files/batches arayüzü olan istemci (verilmezse self.client;
+                çevrimdışı test için batch_api.LocalBatchEmulator)
+            batch_file: İsteklerin yazılacağı JSONL dosyası
+            poll_interval: Durum sorguları arasındaki bekleme (saniye)
+            timeout: Bu süre içinde tamamlanmazsa TimeoutError (None = sınırsız)
+        
+        Returns:
+            analyze_conversation ile aynı şemada DataFrame (mesaj sırası korunur)
+        """
+        if batch_client is None and self.provider not in ("openai", "groq"):
+            raise ValueError(f"Batch API bu provider için desteklenmiyor: {self.provider}")
+        if self.batch_size > 1:
+            logger.warning("⚠️ Bulk modda batch_size kullanılmaz, her mesaj ayrı istek olarak gönderilir")
+        
+        logger.info(f"🔍 {len(conversation_data)} mesaj Batch API ile analiz ediliyor...")
+        self._begin_run(conversation_data)
+        
+        # custom_id -> yanıt (önbellekte bulunanlar gönderilmez)
+        results, cache_keys, requests, plan = {}, {}, [], {}
+        text_owners = {}
+        for i, message in enumerate(conversation_data):
+            if not message.get('message', '').strip():
+                continue
+            
+            plan[i] = {}
+            for task, (owner, messages, max_tokens, json_mode) in self._bulk_tasks(conversation_data, i, text_owners).items():
+                custom_id = f"msg-{owner}-{task}"
+                plan[i][task] = custom_id
+                if custom_id in results or custom_id in cache_keys:
+                    continue
                 
-                if text.strip():
-                    # Sentiment analizi
-                    sentiment = self.analyze_sentiment_enhanced(text)
-                    result['llm_sentiment'] = sentiment
-                    
-                    # Konu analizi
-                    topic = self.analyze_topic_enhanced(text)
-                    result['llm_topic'] = topic
-                    
-                    # Bot yanıt analizi
-                    bot_response = self.analyze_bot_response_enhanced(conversation_data, i)
-                    result['llm_bot_response'] = bot_response
-                    
-                    logger.info(f"✅ Analiz tamamlandı: {sentiment} | {topic} | {bot_response}")
+                params = self._completion_params(max_tokens, json_mode)
+                cache_key, cached = self._cache_lookup(messages, params)
+                if cached is not None:
+                    self.telemetry.record_cache_hit(task)
+                    results[custom_id] = cached
                 else:
-                    result['llm_sentiment'] = 'Nötr'
-                    result['llm_topic'] = 'Genel Bilgi'
-                    result['llm_bot_response'] = 'Hayır'
-                
-                # Metadata
-                result['analysis_timestamp'] = datetime.now().isoformat()
-                result['provider_used'] = self.provider
-                result['model_used'] = self.model
-                
-                results.append(result)
-                
-                # Rate limiting
-                time.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"❌ Mesaj {i+1} analiz hatası: {e}")
-                # Hata durumunda varsayılan değerler
-                result = {
-                    'message_id': message.get('message_id', i+1),
-                    'timestamp': message.get('timestamp', ''),
-                    'sender': message.get('sender', ''),
-                    'user_type': message.get('user_type', ''),
-                    'message': message.get('message', ''),
-                    'llm_sentiment': 'Hata',
-                    'llm_topic': 'Hata',
-                    'llm_bot_response': 'Hata',
-                    'analysis_timestamp': datetime.now().isoformat(),
-                    'provider_used': self.provider,
-                    'model_used': self.model
-                }
-                results.append(result)
+                    cache_keys[custom_id] = cache_key
+                    requests.append(batch_request(custom_id, messages, params))
+        
+        self.bulk_stats = {'batch_file': None, 'requests': len(requests), 'cached': len(results), 'failed': 0}
+        
+        if requests:
+            batch_file = batch_file or f"bulk_requests_{self.provider}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+            write_batch_file(requests, batch_file)
+            self.bulk_stats['batch_file'] = batch_file
+            
+            runner = BatchJobRunner(batch_client or self.client, poll_interval=poll_interval, timeout=timeout)
+            for custom_id, output in runner.run(batch_file, metadata={'source': 'enhanced_llm_analyzer'}).items():
+                if output['content'] is None:
+                    logger.warning(f"⚠️ Batch isteği başarısız ({custom_id}): {output['error']}")
+                    continue
+                self._record_usage(output['tokens'])
+                # Batch API tek tek gecikme döndürmez; yalnızca çağrı ve token sayılır
+                self.telemetry.record_call(custom_id.rsplit('-', 1)[1], None,
+                                           output['prompt_tokens'], output['completion_tokens'])
+                results[custom_id] = output['content']
+                self._cache_store(cache_keys.get(custom_id), output['content'], custom_id.rsplit('-', 1)[1])
+            
+            self.bulk_stats['failed'] = sum(1 for custom_id in cache_keys if custom_id not in results)
+        
+        # Yanıtı gelmeyen görevler kural tabanlı analize düşer ve satır degrade işaretlenir
+        rows = []
+        for i in range(len(conversation_data)):
+            labels, degraded = None, False
+            if i in plan:
+                ids = plan[i]
+                text = conversation_data[i].get('message', '')
+                degraded = any(custom_id not in results for custom_id in ids.values())
+                if self.fused:
+                    labels = self._resolve_fused(results.get(ids.get('fused'), "Hata"), conversation_data, i)
+                    if 'bot_response' in ids:
+                        labels['llm_bot_response'] = self._resolve_bot_response(
+                            results.get(ids['bot_response'], "Hata"), conversation_data, i
+                        )
+                else:
+                    labels = {
+                        'llm_sentiment': self._resolve_sentiment(results.get(ids.get('sentiment'), "Hata"), text),
+                        'llm_topic': self._resolve_topic(results.get(ids.get('topic'), "Hata"), text),
+                        'llm_bot_response': self._resolve_bot_response(
+                            results.get(ids.get('bot_response'), "Hata"), conversation_data, i
+                        )
+                    }
+            rows.append(self._analyze_message(conversation_data, i, labels, degraded))
         
-        df = pd.DataFrame(results)
+        df = pd.DataFrame(rows)
         
         # İstatistikleri yazdır
-        logger.info(f"\n📊 ANALİZ İSTATİSTİKLERİ:")
-        logger.info(f"✅ Toplam mesaj: {len(conversation_data)}")
-        logger.info(f"🔄 API çağrısı: {self.api_calls}")
-        logger.info(f"🎯 Token kullanımı: {self.total_tokens}")
-        logger.info(f"🤖 Provider: {self.provider}")
-        logger.info(f"🧠 Model: {self.model}")
+        self._log_run_statistics(len(conversation_data))
         
         return df
 
-    def save_analysis_results(self, df: pd.DataFrame, output_prefix: str = "enhanced_llm_analysis") -> Tuple[str, str]:
-        """Analiz sonuçlarını kaydet"""
+    def save_analysis_results(self, df: pd.DataFrame, output_prefix: str = "enhanced_llm_analysis",
+                              metrics_textfile: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Analiz sonuçlarını kaydet
+        
+        metrics_textfile (veya LLM_METRICS_TEXTFILE) verilirse telemetri ayrıca
+        Prometheus textfile formatında yazılır.
+        """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # CSV dosyası
@@ -495,9 +2342,32 @@ CEVAP (Evet/Hayır):"""
             'analysis_timestamp': datetime.now().isoformat(),
             'provider': self.provider,
             'model': self.model,
+            'base_url': self.base_url,
             'total_messages': len(df),
+            'analysis_mode': self.analysis_mode,
             'api_calls': self.api_calls,
             'total_tokens': self.total_tokens,
+            'api_calls_per_message': round(self.api_calls / len(df), 3) if len(df) else 0,
+            'batch_stats': self.batch_stats,
+            'cache': self.cache.stats() if self.cache is not None else None,
+            'dedup_stats': self.dedup_stats,
+            'rate_limiter': self.rate_limiter.get_stats(),
+            'circuit_breaker': self.circuit_breaker.get_stats(),
+            'degraded_messages': len(self.degraded_message_ids),
+            'degraded_message_ids': sorted(self.degraded_message_ids),
+            'checkpoint': self.checkpoint_stats,
+            'bulk': self.bulk_stats,
+            'bot_response_resolution': self.bot_response_resolution,
+            'compact_labels': self.compact_labels,
+            'parse_fallbacks': self.parse_fallbacks,
+            'telemetry': self.telemetry.summary(),
+            'task_routing': {'table': self.task_routing, 'skipped': self.routing_stats} if self.task_routing is not None else None,
+            'cascade': {'threshold': self.cascade_threshold, **self.cascade_stats} if self.cascade_threshold is not None else None,
+            'local_inference': self.client.get_stats() if isinstance(self.client, LocalInferenceClient) else None,
+            'adaptive_concurrency': self.concurrency_controller.get_stats() if self.concurrency_controller is not None else None,
+            'api_keys': self.key_pool.get_stats() if self.key_pool is not None else None,
+            'hedging': self.hedge_policy.get_stats() if self.hedge_policy is not None else None,
+            'client_pool': client_pool_stats(self.provider, self.api_key, self.base_url) if self._pooled_client else None,
             'sentiment_distribution': df['llm_sentiment'].value_counts().to_dict(),
             'topic_distribution': df['llm_topic'].value_counts().to_dict(),
             'bot_response_distribution': df['llm_bot_response'].value_counts().to_dict()
@@ -511,6 +2381,10 @@ CEVAP (Evet/Hayır):"""
         logger.info(f"📄 CSV: {csv_filename}")
         logger.info(f"📋 Metadata: {metadata_filename}")
         
+        metrics_textfile = metrics_textfile or os.getenv("LLM_METRICS_TEXTFILE")
+        if metrics_textfile:
+            self.telemetry.write_prometheus(metrics_textfile, labels={'provider': self.provider, 'model': self.model})
+        
         return csv_filename, metadata_filename
 
 def main():
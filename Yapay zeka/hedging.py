@@ -0,0 +1,93 @@
+import threading
+import logging
+from collections import deque
+from typing import Dict, Optional
+
+from telemetry import percentile
+
+logger = logging.getLogger(__name__)
+
+
+class HedgePolicy:
+    def __init__(self, latency_percentile: float = 95, window: int = 200, min_samples: int = 20,
+                 max_hedge_rate: float = 0.05, min_delay: float = 0.05, provider: Optional[str] = None,
+                 model: Optional[str] = None, base_url: Optional[str] = None):
+        """
+        Kuyruk gecikmesi için yedek (hedge) çağrı politikası
+
+        Bir çağrı görevin son `window` çağrısındaki gecikme yüzdeliğini aşarsa aynı
+        isteğin bir kopyası gönderilir; ilk geçerli yanıt kazanır, diğeri iptal edilir.
+        Gönderilen hedge sayısı çağrıların max_hedge_rate oranıyla sınırlıdır, böylece
+        provider yavaşladığında hedge'ler yükü ikiye katlamaz.
+
+        Args:
+            latency_percentile (float): Hedge eşiği olan gecikme yüzdeliği (0-100)
+            window (int): Görev başına eşiği belirleyen son başarılı çağrı sayısı
+            min_samples (int): Eşik hesaplanmadan önce gereken örnek (daha azında hedge yok)
+            max_hedge_rate (float): Hedge'lerin çağrılara oranı için üst sınır (0-1)
+            min_delay (float): En kısa hedge bekleme süresi (saniye)
+            provider (str): Hedge'in gideceği provider ("openai"/"groq"; None = ana provider)
+            model (str): Hedge modeli (None = ana model; farklı provider'da zorunlu)
+            base_url (str): Hedge provider'ının uyumlu sunucu adresi
+        """
+        if not 0 < latency_percentile < 100:
+            raise ValueError("latency_percentile 0 ile 100 arasında olmalı")
+        if not 0 <= max_hedge_rate <= 1:
+            raise ValueError("max_hedge_rate 0 ile 1 arasında olmalı")
+
+        self.latency_percentile = latency_percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.max_hedge_rate = max_hedge_rate
+        self.min_delay = min_delay
+        self.provider = provider
+        self.model = model
+        self.base_url = base_url
+
+        self._latencies: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {'requests': 0, 'hedges': 0, 'capped': 0}
+
+    def observe(self, task: str, latency: float):
+        """Ana çağrının gecikmesini görevin kayan penceresine ekle"""
+        with self._lock:
+            if task not in self._latencies:
+                self._latencies[task] = deque(maxlen=self.window)
+            self._latencies[task].append(latency)
+
+    def _threshold(self, task: str) -> Optional[float]:
+        """Görevin hedge eşiği (yeterli örnek yoksa None); kilit altında çağrılır"""
+        samples = self._latencies.get(task)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(sorted(samples), self.latency_percentile))
+
+    def hedge_delay(self, task: str) -> Optional[float]:
+        """Çağrıyı say ve hedge gönderilmeden önce beklenecek süreyi döndür (None = hedge yok)"""
+        with self._lock:
+            self.stats['requests'] += 1
+            return self._threshold(task)
+
+    def try_hedge(self) -> bool:
+        """Oran sınırı izin veriyorsa hedge hakkını kullan"""
+        with self._lock:
+            if self.stats['hedges'] + 1 > self.max_hedge_rate * self.stats['requests']:
+                self.stats['capped'] += 1
+                return False
+            self.stats['hedges'] += 1
+            return True
+
+    def get_stats(self) -> Dict:
+        """Hedge oranı, sınıra takılan hedge'ler ve görev bazında güncel eşikler"""
+        with self._lock:
+            requests = self.stats['requests']
+            thresholds = {task: self._threshold(task) for task in sorted(self._latencies)}
+            return {
+                **self.stats,
+                'hedge_rate': round(self.stats['hedges'] / requests, 4) if requests else 0,
+                'max_hedge_rate': self.max_hedge_rate,
+                'latency_percentile': self.latency_percentile,
+                'thresholds': {task: round(value, 4) for task, value in thresholds.items() if value is not None},
+                'target': {'provider': self.provider, 'model': self.model, 'base_url': self.base_url},
+            }
@@ -1,26 +1,33 @@
-import openai
-import anthropic
 import json
 import pandas as pd
 import os
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional
 import time
 from dotenv import load_dotenv
+from llm_executor import ThreadPoolLLMExecutor
+from client_registry import get_client
+from api_key_pool import parse_api_keys
+from rate_limiter import get_rate_limiter, estimate_prompt_tokens, retry_after_from_error, is_rate_limit_error
 
 # .env dosyasından API anahtarlarını yükle
 load_dotenv()
 
 class LLMChatAnalyzer:
-    def __init__(self, provider="openai"):
+    def __init__(self, provider="openai", base_url=None, client=None):
         """
         LLM tabanlı sohbet analiz sistemi
         
         Args:
             provider (str): "openai" veya "anthropic"
+            base_url (str): OpenAI uyumlu sunucu adresi (ör. mock_llm_server, verilmezse LLM_BASE_URL)
+            client: Hazır API istemcisi (ör. SimulatedLLMClient; verilirse yeni istemci oluşturulmaz)
         """
         self.provider = provider
-        self.setup_client()
+        self.base_url = base_url or os.getenv("LLM_BASE_URL") or None
+        self._pooled_client = None
+        self.setup_client(client)
+        self.rate_limiter = get_rate_limiter(self.provider, self.model)
         
         # Prompt şablonları
         self.sentiment_prompt = """
@@ -67,25 +74,33 @@ class LLMChatAnalyzer:
         Bu soruya bot veya destek ekibi yanıt vermiş mi? Sadece "Evet" veya "Hayır" ile cevapla:
         """
     
-    def setup_client(self):
-        """API istemcisini ayarla"""
+    def setup_client(self, client=None):
+        """API istemcisini ayarla (verilmezse süreç genelindeki paylaşılan havuzlu istemci kullanılır)"""
         if self.provider == "openai":
-            self.client = openai.OpenAI(
-                api_key=os.getenv("OPENAI_API_KEY")
-            )
+            # Uyumlu sunucular anahtarı doğrulamaz; base_url varken anahtar zorunlu değil
+            # Virgülle ayrılmış anahtar havuzunda bu analizör ilk anahtarı kullanır
+            keys = parse_api_keys(os.getenv("OPENAI_API_KEY"))
+            self.api_key = keys[0] if keys else ("mock-key" if self.base_url else None)
             self.model = "gpt-3.5-turbo"
         elif self.provider == "anthropic":
-            self.client = anthropic.Anthropic(
-                api_key=os.getenv("ANTHROPIC_API_KEY")
-            )
+            self.api_key = os.getenv("ANTHROPIC_API_KEY")
             self.model = "claude-3-haiku-20240307"
         else:
             raise ValueError("Desteklenen provider'lar: 'openai' veya 'anthropic'")
+        
+        if client is not None:
+            self.client = client
+        else:
+            self.client = self._pooled_client = get_client(self.provider, self.api_key, self.base_url)
     
     def call_llm(self, prompt: str, max_retries: int = 3) -> str:
         """LLM API çağrısı yap"""
+        reserved_tokens = estimate_prompt_tokens([{"content": prompt}]) + 50
+        
         for attempt in range(max_retries):
             try:
+                self.rate_limiter.acquire(reserved_tokens)
+                
                 if self.provider == "openai":
                     response = self.client.chat.completions.create(
                         model=self.model,
@@ -112,7 +127,11 @@ class LLMChatAnalyzer:
             except Exception as e:
                 print(f"API çağrısı hatası (deneme {attempt + 1}): {e}")
                 if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    if is_rate_limit_error(e):
+                        # Retry-After kadar beklenir (bir sonraki acquire içinde)
+                        self.rate_limiter.penalize(retry_after_from_error(e) or 2 ** attempt)
+                    else:
+                        time.sleep(2 ** attempt)  # Exponential backoff
                 else:
                     return "Hata"
         
@@ -181,8 +200,36 @@ class LLMChatAnalyzer:
         else:
             return "Hayır"  # Varsayılan değer
     
-    def analyze_conversation_llm(self, json_data) -> List[Dict]:
-        """Konuşmayı LLM ile analiz et"""
+    def _analyze_message_llm(self, messages: List[Dict], i: int) -> Dict:
+        """Tek bir mesajı LLM ile analiz et"""
+        message = messages[i]
+        message_text = message.get('message', '')
+        
+        print(f"Mesaj {i+1}/{len(messages)} analiz ediliyor...")
+        
+        # LLM analizleri
+        sentiment = self.analyze_sentiment_llm(message_text)
+        topic = self.analyze_topic_llm(message_text)
+        bot_response = self.analyze_bot_response_llm(messages, i)
+        
+        return {
+            'message_id': message.get('id', i),
+            'timestamp': message.get('timestamp', datetime.now().isoformat()),
+            'sender': message.get('sender', 'unknown'),
+            'message': message_text,
+            'llm_sentiment': sentiment,
+            'llm_topic': topic,
+            'llm_bot_response': bot_response
+        }
+    
+    def analyze_conversation_llm(self, json_data, max_workers: Optional[int] = None) -> List[Dict]:
+        """
+        Konuşmayı LLM ile analiz et
+        
+        Args:
+            json_data: JSON string, mesaj listesi veya {'messages': [...]} sözlüğü
+            max_workers: 1'den büyükse çağrılar thread havuzunda paralel yapılır
+        """
         results = []
         
         if isinstance(json_data, str):
@@ -200,33 +247,20 @@ class LLMChatAnalyzer:
         
         print(f"LLM ile {len(messages)} mesaj analiz ediliyor...")
         
-        for i, message in enumerate(messages):
-            message_text = message.get('message', '')
-            
-            if not message_text.strip():
-                continue
-            
-            print(f"Mesaj {i+1}/{len(messages)} analiz ediliyor...")
-            
-            # LLM analizleri
-            sentiment = self.analyze_sentiment_llm(message_text)
-            topic = self.analyze_topic_llm(message_text)
-            bot_response = self.analyze_bot_response_llm(messages, i)
-            
-            analysis = {
-                'message_id': message.get('id', i),
-                'timestamp': message.get('timestamp', datetime.now().isoformat()),
-                'sender': message.get('sender', 'unknown'),
-                'message': message_text,
-                'llm_sentiment': sentiment,
-                'llm_topic': topic,
-                'llm_bot_response': bot_response
-            }
-            
-            results.append(analysis)
-            
-            # API rate limiting için kısa bekleme
-            time.sleep(0.5)
+        # Boş mesajlar atlanır
+        indices = [i for i, message in enumerate(messages) if message.get('message', '').strip()]
+        
+        if max_workers and max_workers > 1:
+            with ThreadPoolLLMExecutor(self.provider, max_workers) as executor:
+                if self.client is self._pooled_client:
+                    # Havuz, worker sayısı kadar bağlantı açabilecek büyüklükte olmalı
+                    self.client = self._pooled_client = get_client(self.provider, self.api_key, self.base_url,
+                                                                   max_connections=executor.max_workers)
+                results = executor.map_ordered(lambda i: self._analyze_message_llm(messages, i), indices)
+        else:
+            # Hız sınırı call_llm içindeki rate limiter ile uygulanır
+            for i in indices:
+                results.append(self._analyze_message_llm(messages, i))
         
         print("LLM analizi tamamlandı!")
         return results
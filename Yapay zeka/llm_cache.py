@@ -0,0 +1,141 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LLMResponseCache:
+    def __init__(self, db_path: str = "llm_cache.db", ttl_seconds: Optional[float] = None,
+                 max_entries: Optional[int] = None, evict_every: int = 100):
+        """
+        İçerik adresli, SQLite tabanlı LLM yanıt önbelleği
+
+        Anahtar; provider, model, base_url, mesajlar ve örnekleme parametrelerinin
+        SHA-256 özetidir. WAL modu sayesinde birden çok süreç aynı dosyayı
+        paylaşabilir.
+
+        Args:
+            db_path (str): SQLite dosya yolu
+            ttl_seconds (float): Kayıtların geçerlilik süresi (None = süresiz)
+            max_entries (int): En fazla kayıt sayısı (aşılınca en eski erişilenler silinir)
+            evict_every (int): Kaç yazmada bir temizlik yapılacağı
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.evict_every = max(1, evict_every)
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+        self.conn.commit()
+
+        logger.info(f"💾 LLM önbelleği açıldı: {db_path}")
+
+    @staticmethod
+    def make_key(provider: str, model: str, messages: List[Dict], params: Dict,
+                 base_url: Optional[str] = None) -> str:
+        """
+        Çağrıyı benzersiz tanımlayan anahtarı üret
+
+        base_url (uyumlu/mock sunucu) verilirse anahtara girer; provider'ın kendi
+        adresine giden çağrıların anahtarı değişmez.
+        """
+        key = {
+            'provider': provider,
+            'model': model,
+            'messages': messages,
+            'params': params
+        }
+        if base_url:
+            key['base_url'] = base_url
+        payload = json.dumps(key, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Önbellekteki yanıtı döndür (yoksa veya süresi dolmuşsa None)"""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or (self.ttl_seconds is not None and now - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, response: str):
+        """Yanıtı önbelleğe yaz"""
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, response, now, now)
+            )
+            self.conn.commit()
+            self.writes += 1
+
+            if self.writes % self.evict_every == 0:
+                self._evict()
+
+    def _evict(self):
+        """Süresi dolan kayıtları ve boyut sınırını aşan en eski kayıtları sil"""
+        if self.ttl_seconds is not None:
+            self.conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+
+        if self.max_entries is not None:
+            self.conn.execute("""
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+        self.conn.commit()
+
+    def evict(self):
+        """Temizliği hemen çalıştır"""
+        with self._lock:
+            self._evict()
+
+    def stats(self) -> Dict:
+        """İsabet/ıska sayaçları ve kayıt sayısı"""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'path': self.db_path,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+            'entries': entries
+        }
+
+    def close(self):
+        """Veritabanı bağlantısını kapat"""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,66 @@
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Provider başına varsayılan eşzamanlı worker sayısı
+# (Hugging Face ücretsiz endpoint'i düşük eşzamanlılıkta daha kararlı)
+DEFAULT_PROVIDER_WORKERS = {
+    "openai": 8,
+    "groq": 8,
+    "anthropic": 4,
+    "huggingface": 4,
+}
+
+
+def resolve_worker_limit(provider: str, max_workers: Optional[int] = None,
+                         worker_limits: Optional[Dict[str, int]] = None) -> int:
+    """
+    Provider için worker sayısını belirle
+
+    Öncelik sırası: max_workers parametresi > LLM_MAX_WORKERS_<PROVIDER> env
+    değişkeni > worker_limits sözlüğü > DEFAULT_PROVIDER_WORKERS
+    """
+    if max_workers:
+        return max(1, int(max_workers))
+
+    env_value = os.getenv(f"LLM_MAX_WORKERS_{provider.upper()}")
+    if env_value and env_value.isdigit():
+        return max(1, int(env_value))
+
+    limits = worker_limits or DEFAULT_PROVIDER_WORKERS
+    return max(1, limits.get(provider, 4))
+
+
+class ThreadPoolLLMExecutor:
+    def __init__(self, provider: str, max_workers: Optional[int] = None,
+                 worker_limits: Optional[Dict[str, int]] = None):
+        """
+        Senkron (bloklayan) LLM çağrılarını thread havuzuna dağıtan yürütücü
+
+        Args:
+            provider (str): Worker limitinin belirleneceği provider adı
+            max_workers (int): Worker sayısı (verilmezse provider limiti kullanılır)
+            worker_limits (dict): Provider -> worker sayısı eşlemesi
+        """
+        self.provider = provider
+        self.max_workers = resolve_worker_limit(provider, max_workers, worker_limits)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"llm-{provider}")
+        logger.info(f"🧵 Thread havuzu başlatıldı: {provider} ({self.max_workers} worker)")
+
+    def map_ordered(self, fn: Callable, items: Iterable) -> List:
+        """fn'i her eleman için paralel çalıştır, sonuçları girdi sırasıyla döndür"""
+        futures = [self._pool.submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def shutdown(self):
+        """Havuzu kapat (bekleyen işler tamamlanır)"""
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
@@ -0,0 +1,202 @@
+import json
+import re
+import time
+import asyncio
+import random
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+from enhanced_llm_analyzer import keyword_sentiment, keyword_topic
+
+# Prompt'lardan mesaj metnini çıkarmak için kalıplar (EnhancedLLMAnalyzer ve LLMChatAnalyzer)
+MESSAGE_PATTERNS = [
+    r'ANALİZ EDİLECEK MESAJ: "(.*)"',
+    r'SON MÜŞTERİ MESAJI: "(.*)"',
+    r'Son müşteri mesajı: "(.*)"',
+    r'MESAJ: "(.*)"',
+    r'Mesaj: "(.*)"',
+]
+BATCH_LINE_PATTERN = re.compile(r'^(\[(\d+)\] )?(Müşteri|Destek): (.*)$')
+# Kısa kod modundaki "KODLAR:" bloğu ve "T01 = Düğün Mekanı" satırları
+CODE_BLOCK_PATTERN = re.compile(r'KODLAR:\n(.*?)(?:\n\n|$)', re.S)
+CODE_LINE_PATTERN = re.compile(r'^(\S+) = (.+)$')
+
+
+def _extract_message(prompt: str) -> str:
+    """Prompt içinden analiz edilen mesaj metnini bul"""
+    for pattern in MESSAGE_PATTERNS:
+        match = re.search(pattern, prompt)
+        if match:
+            return match.group(1)
+    return ""
+
+
+def _parse_conversation_lines(prompt: str) -> List[Dict]:
+    """Prompt'taki "Müşteri: ..." / "Destek: ..." satırlarını sırayla ayrıştır"""
+    lines = []
+    for line in prompt.splitlines():
+        match = BATCH_LINE_PATTERN.match(line.strip())
+        if match:
+            lines.append({
+                'index': int(match.group(2)) if match.group(2) else None,
+                'user_type': 'customer' if match.group(3) == 'Müşteri' else 'support',
+                'message': match.group(4)
+            })
+    return lines
+
+
+def _bot_response_from_lines(lines: List[Dict], position: int) -> str:
+    """Sonraki 2 satırda destek mesajı varsa "Evet" (fallback kuralıyla aynı)"""
+    for line in lines[position + 1:position + 3]:
+        if line['user_type'] == 'support':
+            return "Evet"
+    return "Hayır"
+
+
+def _bot_response_for_message(prompt: str, text: str) -> str:
+    """Bağlam satırları içinde mesajı bulup bot yanıt etiketini üret"""
+    lines = _parse_conversation_lines(prompt)
+    for position, line in enumerate(lines):
+        if line['message'] == text:
+            return _bot_response_from_lines(lines, position)
+    return "Hayır"
+
+
+def _label_codes(prompt: str) -> Dict[str, str]:
+    """Prompt kısa kod istiyorsa etiket -> kod tablosunu çıkar"""
+    codes = {}
+    match = CODE_BLOCK_PATTERN.search(prompt)
+    if match:
+        for line in match.group(1).splitlines():
+            code_match = CODE_LINE_PATTERN.match(line.strip())
+            if code_match:
+                codes[code_match.group(2)] = code_match.group(1)
+    return codes
+
+
+def _encode(value, codes: Dict[str, str]):
+    """Etiketi (veya JSON içindeki etiketleri) koduna çevir"""
+    if isinstance(value, dict):
+        return {key: item if key == 'index' else _encode(item, codes) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode(item, codes) for item in value]
+    return codes.get(value, value)
+
+
+def simulate_completion(prompt: str) -> str:
+    """Prompt türüne göre kural tabanlı bir LLM cevabı üret (kısa kod modunda kodlarla)"""
+    codes = _label_codes(prompt)
+    content = _simulate_labels(prompt)
+    if not codes:
+        return content
+    try:
+        return json.dumps(_encode(json.loads(content), codes), ensure_ascii=False)
+    except (json.JSONDecodeError, ValueError):
+        return _encode(content, codes)
+
+
+def _simulate_labels(prompt: str) -> str:
+    """Prompt türüne göre etiket adlarıyla cevap üret"""
+    if '[numara]' in prompt:
+        lines = _parse_conversation_lines(prompt)
+        results = []
+        for position, line in enumerate(lines):
+            if line['index'] is None:
+                continue
+            results.append({
+                'index': line['index'],
+                'sentiment': keyword_sentiment(line['message']),
+                'topic': keyword_topic(line['message']),
+                'bot_response': _bot_response_from_lines(lines, position)
+            })
+        return json.dumps({'results': results}, ensure_ascii=False)
+
+    text = _extract_message(prompt)
+
+    if 'ANALİZ EDİLECEK MESAJ' in prompt:
+        return json.dumps({
+            'sentiment': keyword_sentiment(text),
+            'topic': keyword_topic(text),
+            'bot_response': _bot_response_for_message(prompt, text)
+        }, ensure_ascii=False)
+    elif 'yanıtlanmış mı' in prompt:
+        return _bot_response_for_message(prompt, text)
+    elif 'duygusal tonunu' in prompt:
+        return keyword_sentiment(text)
+    elif 'konusunu' in prompt:
+        return keyword_topic(text)
+
+    return "Nötr"
+
+
+def estimate_tokens(text: str) -> int:
+    """Kaba token tahmini (~4 karakter/token)"""
+    return max(1, len(text) // 4)
+
+
+def simulate_chat(messages: List[Dict], max_tokens: int = 50) -> Tuple[str, int, int]:
+    """Chat mesajları için simüle edilmiş cevap ve (prompt, completion) token sayıları"""
+    prompt = "\n".join(m.get('content', '') for m in messages)
+    content = simulate_completion(messages[-1].get('content', ''))
+    return content, estimate_tokens(prompt), min(estimate_tokens(content), max_tokens)
+
+
+class SimulatedLLMClient:
+    def __init__(self, latency: float = 0.2, per_token_latency: float = 0.002,
+                 jitter: float = 0.0, seed: Optional[int] = None):
+        """
+        OpenAI/Groq chat.completions arayüzünü taklit eden çevrimdışı istemci
+
+        Args:
+            latency (float): Her çağrının sabit gecikmesi (saniye)
+            per_token_latency (float): Üretilen her token için ek gecikme (saniye)
+            jitter (float): Gecikmeye eklenecek rastgele oran (0.2 = ±%20)
+            seed (int): Rastgelelik için tohum değeri
+        """
+        self.latency = latency
+        self.per_token_latency = per_token_latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.calls = 0
+
+        # client.chat.completions.create(...) erişimi için
+        self.chat = SimpleNamespace(completions=self)
+
+    def _build_response(self, messages: List[Dict], max_tokens: int):
+        """Simüle edilmiş cevabı OpenAI yanıt nesnesi biçiminde hazırla"""
+        content, prompt_tokens, completion_tokens = simulate_chat(messages, max_tokens)
+
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens
+            )
+        )
+        return response, completion_tokens
+
+    def _delay(self, completion_tokens: int) -> float:
+        """Çağrı gecikmesini hesapla"""
+        delay = self.latency + completion_tokens * self.per_token_latency
+        if self.jitter:
+            delay *= 1 + self.random.uniform(-self.jitter, self.jitter)
+        return max(0.0, delay)
+
+    def create(self, model: str, messages: List[Dict], max_tokens: int = 50, **kwargs):
+        """chat.completions.create taklidi"""
+        response, completion_tokens = self._build_response(messages, max_tokens)
+        time.sleep(self._delay(completion_tokens))
+        self.calls += 1
+        return response
+
+
+class AsyncSimulatedLLMClient(SimulatedLLMClient):
+    """SimulatedLLMClient'ın AsyncOpenAI/AsyncGroq arayüzüne uyan asenkron sürümü"""
+
+    async def create(self, model: str, messages: List[Dict], max_tokens: int = 50, **kwargs):
+        """Asenkron chat.completions.create taklidi"""
+        response, completion_tokens = self._build_response(messages, max_tokens)
+        await asyncio.sleep(self._delay(completion_tokens))
+        self.calls += 1
+        return response
@@ -0,0 +1,98 @@
+import logging
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Türkçe destekli çok dilli NLI modeli (sıfır-atış sınıflandırma)
+DEFAULT_LOCAL_MODEL = "MoritzLaurer/mDeBERTa-v3-base-mnli-xnli"
+
+SENTIMENT_LABELS = ["Pozitif", "Negatif", "Nötr"]
+SENTIMENT_HYPOTHESIS = "Bu mesajın duygusal tonu {}."
+TOPIC_HYPOTHESIS = "Bu mesajın konusu {}."
+
+
+class LocalInferenceClient:
+    def __init__(self, model_name: str = DEFAULT_LOCAL_MODEL, quantize: bool = False,
+                 batch_size: int = 16, max_length: int = 128, pipeline=None):
+        """
+        transformers ile CPU üzerinde sıfır-atış (zero-shot) sentiment/konu sınıflandırıcı
+
+        Model ilk kullanımda bir kez yüklenir. Metinler uzunluğa göre sıralanıp
+        batch'lere bölünür; böylece her ileri geçişte dolgu (padding) azalır.
+
+        Args:
+            model_name (str): Hugging Face model adı (NLI/zero-shot modeli)
+            quantize (bool): True ise Linear katmanlar int8 dinamik kuantize edilir
+            batch_size (int): Tek ileri geçişteki en fazla metin sayısı
+            max_length (int): Yaklaşık token cinsinden en fazla metin uzunluğu (~4 karakter/token)
+            pipeline: Önceden yüklenmiş zero-shot pipeline (verilirse model yüklenmez)
+        """
+        self.model_name = model_name
+        self.quantize = quantize
+        self.batch_size = max(1, batch_size)
+        self.max_length = max_length
+        self._pipeline = pipeline
+        self.stats = {'texts': 0, 'forward_batches': 0}
+
+    @property
+    def pipeline(self):
+        """Zero-shot pipeline'ını (gerekirse yükleyerek) döndür"""
+        if self._pipeline is None:
+            self._pipeline = self._load_pipeline()
+        return self._pipeline
+
+    def _load_pipeline(self):
+        """Modeli CPU'ya yükle, istenirse int8 dinamik kuantizasyon uygula"""
+        try:
+            import torch
+            from transformers import pipeline
+        except ImportError:
+            raise ValueError("Yerel model için transformers ve torch gerekli! pip install transformers torch")
+
+        logger.info(f"🧠 Yerel model yükleniyor: {self.model_name}")
+        classifier = pipeline("zero-shot-classification", model=self.model_name, device=-1)
+
+        if self.quantize:
+            classifier.model = torch.quantization.quantize_dynamic(
+                classifier.model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            logger.info("⚡ int8 dinamik kuantizasyon uygulandı")
+
+        classifier.model.eval()
+        return classifier
+
+    def classify(self, texts: List[str], labels: List[str], hypothesis_template: str) -> List[str]:
+        """Her metin için en yüksek skorlu etiketi döndür (tekrarlanan metinler bir kez sınıflandırılır)"""
+        unique_texts = list(dict.fromkeys(texts))
+
+        # Benzer uzunluktaki metinler aynı batch'e düşsün
+        ordered = sorted(unique_texts, key=len)
+        predictions: Dict[str, str] = {}
+        for start in range(0, len(ordered), self.batch_size):
+            chunk = ordered[start:start + self.batch_size]
+            outputs = self.pipeline(
+                [text[:self.max_length * 4] for text in chunk],
+                candidate_labels=labels,
+                hypothesis_template=hypothesis_template,
+                batch_size=self.batch_size
+            )
+            if isinstance(outputs, dict):
+                outputs = [outputs]
+            for text, output in zip(chunk, outputs):
+                predictions[text] = output['labels'][0]
+            self.stats['forward_batches'] += 1
+
+        self.stats['texts'] += len(unique_texts)
+        return [predictions[text] for text in texts]
+
+    def sentiment(self, texts: List[str]) -> List[str]:
+        """Pozitif / Negatif / Nötr sınıflandırması"""
+        return self.classify(texts, SENTIMENT_LABELS, SENTIMENT_HYPOTHESIS)
+
+    def topic(self, texts: List[str], categories: List[str]) -> List[str]:
+        """Verilen kategorilerden biriyle konu sınıflandırması"""
+        return self.classify(texts, categories, TOPIC_HYPOTHESIS)
+
+    def get_stats(self) -> Dict:
+        """Model ve çıkarım istatistikleri"""
+        return {'model': self.model_name, 'quantized': self.quantize, 'batch_size': self.batch_size, **self.stats}
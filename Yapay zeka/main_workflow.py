@@ -1,7 +1,11 @@
 import os
 import sys
+import asyncio
 from pathlib import Path
-from enhanced_llm_analyzer import EnhancedLLMAnalyzer
+from typing import Optional
+from enhanced_llm_analyzer import EnhancedLLMAnalyzer, ROLE_AWARE_ROUTING
+from llm_cache import LLMResponseCache
+from corpus_runner import CorpusRunner, is_corpus_source, load_chat_messages
 from accuracy_analyzer import AccuracyAnalyzer
 import json
 import pandas as pd
@@ -13,23 +17,49 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 logger = logging.getLogger(__name__)
 
 class MainWorkflow:
-    def __init__(self):
-        """Ana iş akışı koordinatörü"""
+    def __init__(self, cache_path: str = "llm_cache.db", checkpoint_path: str = "llm_checkpoint.jsonl"):
+        """
+        Ana iş akışı koordinatörü
+        
+        Args:
+            cache_path (str): LLM yanıt önbelleği dosyası (None = önbellek kapalı)
+            checkpoint_path (str): Yarıda kalan analizlere devam etmek için sonuç günlüğü (None = kapalı)
+        """
         self.llm_analyzer = None
+        self.llm_analyzer_options = {}
         self.accuracy_analyzer = AccuracyAnalyzer()
+        self.llm_cache = LLMResponseCache(cache_path) if cache_path else None
+        self.checkpoint_path = checkpoint_path
         
-    def setup_llm_analyzer(self, provider="groq", model=None):
+    def setup_llm_analyzer(self, provider="groq", model=None, fused=False, batch_size=1, cascade_threshold=None,
+                           task_routing=None, compact_labels=False, adaptive_concurrency=False):
         """LLM analyzer'ı ayarla"""
         try:
-            self.llm_analyzer = EnhancedLLMAnalyzer(provider=provider, model=model)
-            logger.info(f"LLM Analyzer ayarlandı: {provider} - {self.llm_analyzer.model}")
+            # Klasör analizinde her worker süreci analizörü bu parametrelerle yeniden kurar
+            self.llm_analyzer_options = dict(
+                provider=provider, model=model, fused=fused, batch_size=batch_size,
+                cascade_threshold=cascade_threshold, task_routing=task_routing, compact_labels=compact_labels,
+                adaptive_concurrency=adaptive_concurrency
+            )
+            self.llm_analyzer = EnhancedLLMAnalyzer(**self.llm_analyzer_options, cache=self.llm_cache)
+            logger.info(f"LLM Analyzer ayarlandı: {provider} - {self.llm_analyzer.model} ({self.llm_analyzer.analysis_mode})")
             return True
         except Exception as e:
             logger.error(f"LLM Analyzer ayarlanamadı: {e}")
             return False
     
-    def step1_llm_analysis(self, chat_data_path: str) -> str:
-        """Adım 1: LLM ile sohbet analizi"""
+    def step1_llm_analysis(self, chat_data_path: str, concurrency: int = 1, resume: bool = False,
+                           workers: Optional[int] = None) -> str:
+        """
+        Adım 1: LLM ile sohbet analizi (concurrency > 1 ise asenkron veya thread havuzu ile)
+        
+        resume=True ise aynı dosya/provider/model için checkpoint'te tamamlanmış mesajlar atlanır.
+        chat_data_path bir klasör veya glob kalıbıysa konuşmalar süreç havuzunda analiz edilir
+        (bkz. step1_corpus_analysis).
+        """
+        if is_corpus_source(chat_data_path):
+            return self.step1_corpus_analysis(chat_data_path, workers, concurrency, resume)
+        
         logger.info("🚀 Adım 1: LLM Analizi Başlatılıyor...")
         
         if not self.llm_analyzer:
@@ -41,27 +71,27 @@ class MainWorkflow:
         if not os.path.exists(chat_data_path):
             raise FileNotFoundError(f"Chat verisi bulunamadı: {chat_data_path}")
         
-        with open(chat_data_path, 'r', encoding='utf-8') as f:
-            chat_data_raw = json.load(f)
-        
-        # JSON formatını kontrol et ve messages listesini çıkar
-        if isinstance(chat_data_raw, dict) and 'messages' in chat_data_raw:
-            chat_data = chat_data_raw['messages']
-            logger.info(f"📊 JSON formatı tespit edildi. {len(chat_data)} mesaj bulundu.")
-        elif isinstance(chat_data_raw, list):
-            chat_data = chat_data_raw
-            logger.info(f"📊 Liste formatı tespit edildi. {len(chat_data)} mesaj bulundu.")
-        else:
-            raise ValueError("Geçersiz JSON formatı! 'messages' anahtarı veya liste formatı bekleniyor.")
+        chat_data = load_chat_messages(chat_data_path)
+        logger.info(f"📊 {len(chat_data)} mesaj bulundu.")
         
-        # Mesaj formatını düzelt (id -> message_id)
-        for message in chat_data:
-            if 'id' in message and 'message_id' not in message:
-                message['message_id'] = message['id']
+        # Checkpoint günlüğünde konuşma dosya, provider ve modele göre ayrılır
+        checkpoint = {
+            'checkpoint_path': self.checkpoint_path,
+            'conversation_id': f"{Path(chat_data_path).resolve()}|{self.llm_analyzer.provider}|{self.llm_analyzer.model}",
+            'resume': resume
+        }
         
         # LLM analizi yap
         logger.info("🤖 LLM analizi başlatılıyor...")
-        results_df = self.llm_analyzer.analyze_conversation(chat_data)
+        if concurrency > 1 and self.llm_analyzer.supports_async:
+            results_df = asyncio.run(self.llm_analyzer.analyze_conversation_async(
+                chat_data, max_concurrency=concurrency, **checkpoint
+            ))
+        elif concurrency > 1:
+            # Asenkron SDK'sı olmayan provider'lar thread havuzu ile paralelleştirilir
+            results_df = self.llm_analyzer.analyze_conversation_threaded(chat_data, max_workers=concurrency, **checkpoint)
+        else:
+            results_df = self.llm_analyzer.analyze_conversation(chat_data, **checkpoint)
         
         # Sonuçları kaydet
         csv_file, metadata_file = self.llm_analyzer.save_analysis_results(results_df)
@@ -76,8 +106,12 @@ class MainWorkflow:
         print(f"📋 Metadata dosyası: {metadata_file}")
         print(f"🤖 Kullanılan Provider: {self.llm_analyzer.provider}")
         print(f"🧠 Kullanılan Model: {self.llm_analyzer.model}")
+        print(f"⚙️ Analiz modu: {self.llm_analyzer.analysis_mode}")
         print(f"🔄 API çağrısı sayısı: {self.llm_analyzer.api_calls}")
         print(f"🎯 Token kullanımı: {self.llm_analyzer.total_tokens}")
+        if self.llm_cache is not None:
+            cache_stats = self.llm_cache.stats()
+            print(f"💾 Önbellek: {cache_stats['hits']} isabet / {cache_stats['misses']} ıska")
         print("\n📋 SONRAKI ADIMLAR:")
         print("1. Manuel etiketleme için şu komutu çalıştırın:")
         print("   streamlit run enhanced_manual_labeling.py")
@@ -88,6 +122,47 @@ class MainWorkflow:
         
         return csv_file
     
+    def step1_corpus_analysis(self, source: str, workers: Optional[int] = None, concurrency: int = 1,
+                              resume: bool = False, output_dir: Optional[str] = None) -> str:
+        """
+        Adım 1 (klasör): Klasör veya glob'daki konuşma dosyalarını süreç havuzunda analiz et
+        
+        Sonuçlar output_dir altında CSV bölümlerine birleştirilir; konuşma bazında
+        durumlar manifest.json'a yazılır. resume=True ise başarılı konuşmalar atlanır.
+        """
+        logger.info("🚀 Adım 1: Klasör Analizi Başlatılıyor...")
+        
+        if not self.llm_analyzer_options:
+            raise ValueError("LLM Analyzer ayarlanmamış!")
+        
+        options = self.llm_analyzer_options
+        output_dir = output_dir or f"corpus_analysis_{options['provider']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        runner = CorpusRunner(
+            output_dir, options, workers=workers, concurrency=concurrency,
+            cache_path=self.llm_cache.db_path if self.llm_cache is not None else None
+        )
+        manifest = runner.run(source, resume=resume)
+        summary = manifest['summary']
+        
+        print("\n" + "="*60)
+        print("🎯 ADIM 1 TAMAMLANDI!")
+        print("="*60)
+        print(f"📁 Sonuç klasörü: {output_dir}")
+        print(f"📋 Manifest: {runner.manifest_path}")
+        print(f"🗂️ Bölümler: {', '.join(manifest['partitions']) or '-'}")
+        print(f"💬 Konuşma: {summary['succeeded']}/{summary['conversations']} başarılı")
+        print(f"📊 Mesaj satırı: {summary['rows']}")
+        print(f"⚙️ Worker: {runner.workers} x {runner.concurrency} eşzamanlı istek")
+        print(f"🔄 API çağrısı sayısı: {summary['api_calls']}")
+        print(f"🎯 Token kullanımı: {summary['total_tokens']}")
+        print(f"⏱️ Süre: {summary['seconds']} sn")
+        if summary['failed']:
+            print(f"❌ Başarısız konuşmalar manifest'te 'failed' durumuyla listelenir; "
+                  f"devam modunda yeniden denenir")
+        print("="*60)
+        
+        return output_dir
+    
     def step2_manual_labeling_instructions(self):
         """Adım 2: Manuel etiketleme talimatları"""
         print("\n" + "="*60)
@@ -225,8 +300,9 @@ def main():
                 print("5. OpenAI (gpt-3.5-turbo)")
                 print("6. OpenAI (gpt-4)")
                 print("7. OpenAI (gpt-4o) - EN YENİ MODEL 🚀")
+                print("8. Yerel model (CPU, ağ ve API anahtarı gerektirmez) 💻")
                 
-                provider_choice = input("Seçim (1-7): ").strip()
+                provider_choice = input("Seçim (1-8): ").strip()
                 
                 if provider_choice == "1":
                     provider = "groq"
@@ -249,25 +325,53 @@ def main():
                 elif provider_choice == "7":
                     provider = "openai"
                     model = "gpt-4o"
+                elif provider_choice == "8":
+                    provider = "local"
+                    model = None
                 else:
                     print("❌ Geçersiz seçim!")
                     continue
                 
+                fused = input("Birleşik analiz modu (mesaj başına tek çağrı)? (e/H): ").strip().lower() == "e"
+                batch_input = input("Batch boyutu (tek prompt'taki mesaj sayısı, 1 = kapalı): ").strip()
+                batch_size = int(batch_input) if batch_input.isdigit() else 1
+                concurrency_input = input("Eşzamanlı istek sayısı (1 = sıralı): ").strip()
+                concurrency = int(concurrency_input) if concurrency_input.isdigit() else 1
+                # Girilen eşzamanlılık üst sınır olur; limit 429/gecikmeye göre otomatik ayarlanır
+                adaptive_concurrency = concurrency > 1 and input(
+                    "Uyarlanabilir eşzamanlılık (429/gecikmeye göre otomatik)? (e/H): ").strip().lower() == "e"
+                cascade_input = input("Kademeli mod güven eşiği (ör. 0.5, boş = kapalı): ").strip().replace(",", ".")
+                try:
+                    cascade_threshold = float(cascade_input) if cascade_input else None
+                except ValueError:
+                    cascade_threshold = None
+                role_aware = input("Destek mesajlarında yalnızca konu analizi (rol bazlı yönlendirme)? (e/H): ").strip().lower() == "e"
+                task_routing = ROLE_AWARE_ROUTING if role_aware else None
+                compact_labels = input("Kısa etiket kodları (T01, S+, Y - daha az token)? (e/H): ").strip().lower() == "e"
+                
                 print(f"\n🤖 Seçilen Provider: {provider}")
-                print(f"🧠 Seçilen Model: {model}")
+                print(f"🧠 Seçilen Model: {model or 'varsayılan'}")
                 
-                if not workflow.setup_llm_analyzer(provider, model):
+                if not workflow.setup_llm_analyzer(provider, model, fused, batch_size, cascade_threshold, task_routing,
+                                                  compact_labels, adaptive_concurrency):
                     print("❌ LLM Analyzer ayarlanamadı! API anahtarını kontrol edin.")
                     continue
                 
-                chat_file = input("\nChat verisi JSON dosya yolu: ").strip()
+                chat_file = input("\nChat verisi JSON dosyası, klasör veya glob (ör. exports/*.json): ").strip()
                 
                 if not chat_file:
                     chat_file = "sample_chat_data.json"
                     print(f"Varsayılan dosya kullanılıyor: {chat_file}")
                 
-                if os.path.exists(chat_file):
-                    workflow.step1_llm_analysis(chat_file)
+                if is_corpus_source(chat_file):
+                    workers_input = input(f"Worker süreç sayısı (boş = {os.cpu_count()}): ").strip()
+                    workers = int(workers_input) if workers_input.isdigit() else None
+                    resume = input("Yarıda kalan klasör analizine devam edilsin mi? (e/H): ").strip().lower() == "e"
+                    output_dir = input("Sonuç klasörü (devam için önceki klasör, boş = yeni): ").strip() or None
+                    workflow.step1_corpus_analysis(chat_file, workers, concurrency, resume, output_dir)
+                elif os.path.exists(chat_file):
+                    resume = input("Yarıda kalan analize devam edilsin mi? (e/H): ").strip().lower() == "e"
+                    workflow.step1_llm_analysis(chat_file, concurrency, resume)
                 else:
                     print("❌ Dosya bulunamadı!")
                     print("Test verisi oluşturmak için seçenek 5'i kullanın.")
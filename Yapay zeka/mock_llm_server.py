@@ -0,0 +1,298 @@
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+from llm_simulator import simulate_chat
+
+logger = logging.getLogger(__name__)
+
+# Desteklenen gecikme dağılımları (mean: ortalama, spread: dağılım genişliği)
+LATENCY_DISTRIBUTIONS = ("constant", "uniform", "normal", "lognormal", "exponential")
+
+
+class LatencyModel:
+    def __init__(self, distribution: str = "constant", mean: float = 0.2, spread: float = 0.0,
+                 per_token: float = 0.0, seed: Optional[int] = None):
+        """
+        Simüle edilen çağrı gecikmesi
+
+        Args:
+            distribution (str): constant, uniform, normal, lognormal veya exponential
+            mean (float): Ortalama sabit gecikme (saniye)
+            spread (float): uniform için ±oran, normal için standart sapma oranı,
+                lognormal için log-ölçekte sigma (exponential ve constant'ta kullanılmaz)
+            per_token (float): Üretilen her completion token'ı için ek gecikme (saniye)
+            seed (int): Rastgelelik için tohum değeri
+        """
+        if distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Desteklenen dağılımlar: {', '.join(LATENCY_DISTRIBUTIONS)}")
+        self.distribution = distribution
+        self.mean = mean
+        self.spread = spread
+        self.per_token = per_token
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self, completion_tokens: int = 0) -> float:
+        """Tek bir çağrı için gecikme örnekle"""
+        with self._lock:
+            if self.distribution == "uniform":
+                base = self.mean * (1 + self.random.uniform(-self.spread, self.spread))
+            elif self.distribution == "normal":
+                base = self.random.gauss(self.mean, self.mean * self.spread)
+            elif self.distribution == "lognormal":
+                # Ortalama mean kalacak şekilde mu ayarlanır; uzun kuyruk spread ile büyür
+                base = self.mean * self.random.lognormvariate(-self.spread ** 2 / 2, self.spread)
+            elif self.distribution == "exponential":
+                base = self.random.expovariate(1 / self.mean) if self.mean > 0 else 0.0
+            else:
+                base = self.mean
+        return max(0.0, base + completion_tokens * self.per_token)
+
+
+class FaultInjector:
+    def __init__(self, rate_limit_rate: float = 0.0, server_error_rate: float = 0.0,
+                 retry_after: float = 1.0, max_concurrency: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """
+        429 / 5xx hata enjeksiyonu
+
+        Args:
+            rate_limit_rate (float): İsteklerin 429 dönen oranı (0-1)
+            server_error_rate (float): İsteklerin 500/503 dönen oranı (0-1)
+            retry_after (float): 429 yanıtlarındaki Retry-After süresi (saniye)
+            max_concurrency (int): Aynı anda işlenen istek bunu aşarsa 429 döner
+                (sağlayıcı tarafındaki eşzamanlılık sınırının taklidi)
+            seed (int): Rastgelelik için tohum değeri
+        """
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.retry_after = retry_after
+        self.max_concurrency = max_concurrency
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def choose(self, in_flight: int) -> Optional[Tuple[int, str]]:
+        """İstek için hata (durum kodu, mesaj) döndür; hata yoksa None"""
+        if self.max_concurrency is not None and in_flight > self.max_concurrency:
+            return 429, "Too many concurrent requests"
+        with self._lock:
+            roll = self.random.random()
+            if roll < self.rate_limit_rate:
+                return 429, "Rate limit reached"
+            if roll < self.rate_limit_rate + self.server_error_rate:
+                status = self.random.choice((500, 503))
+                return status, "The server had an error while processing your request"
+        return None
+
+
+class _ChatCompletionsHandler(BaseHTTPRequestHandler):
+    """OpenAI chat completions protokolünün ihtiyaç duyulan alt kümesi"""
+
+    server_version = "MockLLM/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        try:
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # İstemci yanıtı beklemeden bağlantıyı kapattı (ör. iptal edilen hedge çağrısı)
+            self.close_connection = True
+
+    def do_GET(self):
+        mock = self.server.mock
+        if self.path.rstrip('/').endswith('/models'):
+            self._send_json(200, {'object': 'list', 'data': [{'id': mock.model, 'object': 'model'}]})
+        elif self.path.rstrip('/') in ('/health', '/stats'):
+            self._send_json(200, mock.get_stats())
+        else:
+            self._send_json(404, {'error': {'message': f"Bilinmeyen yol: {self.path}", 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        mock = self.server.mock
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        # OpenAI istemcisi /v1/chat/completions, Groq istemcisi /openai/v1/chat/completions çağırır
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': f"Bilinmeyen yol: {self.path}", 'type': 'invalid_request_error'}})
+            return
+        try:
+            request = json.loads(raw or b'{}')
+            messages = request['messages']
+        except (ValueError, KeyError):
+            self._send_json(400, {'error': {'message': "Geçersiz istek gövdesi", 'type': 'invalid_request_error'}})
+            return
+
+        status, payload, headers = mock.handle_completion(request.get('model'), messages,
+                                                          request.get('max_tokens') or 50)
+        self._send_json(status, payload, headers)
+
+
+class MockLLMServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, model: str = "mock-llm",
+                 latency: Optional[LatencyModel] = None, faults: Optional[FaultInjector] = None):
+        """
+        OpenAI uyumlu (chat completions) yerel sahte LLM sunucusu
+
+        Yanıtlar llm_simulator'daki kural tabanlı etiketlerden üretilir; usage alanı
+        ~4 karakter/token tahminiyle doldurulur. Analizörler base_url ile bu sunucuya
+        yönlendirilerek ağ ve API anahtarı olmadan yük testi yapılabilir.
+
+        Args:
+            host (str): Dinlenecek adres
+            port (int): Dinlenecek port (0 = boş bir port seçilir)
+            model (str): /v1/models'ta listelenen model adı
+            latency (LatencyModel): Gecikme modeli (verilmezse gecikme yok)
+            faults (FaultInjector): Hata enjeksiyonu (verilmezse hata yok)
+        """
+        self.model = model
+        self.latency = latency or LatencyModel(mean=0.0)
+        self.faults = faults or FaultInjector()
+        self.stats = {'requests': 0, 'completions': 0, 'rate_limited': 0, 'server_errors': 0,
+                      'prompt_tokens': 0, 'completion_tokens': 0, 'max_in_flight': 0}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        self.httpd = ThreadingHTTPServer((host, port), _ChatCompletionsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI istemcisine verilecek base URL (…/v1)"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def handle_completion(self, model: Optional[str], messages, max_tokens: int) -> Tuple[int, Dict, Dict]:
+        """Tek bir chat completion isteğini işle (durum kodu, gövde, başlıklar)"""
+        with self._lock:
+            self.stats['requests'] += 1
+            self._in_flight += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self._in_flight)
+            in_flight = self._in_flight
+        try:
+            fault = self.faults.choose(in_flight)
+            if fault is not None:
+                return self._error_response(*fault)
+
+            content, prompt_tokens, completion_tokens = simulate_chat(messages, max_tokens)
+            time.sleep(self.latency.sample(completion_tokens))
+            with self._lock:
+                self.stats['completions'] += 1
+                self.stats['prompt_tokens'] += prompt_tokens
+                self.stats['completion_tokens'] += completion_tokens
+
+            return 200, {
+                'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                'object': 'chat.completion',
+                'created': int(time.time()),
+                'model': model or self.model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': content},
+                    'finish_reason': 'stop'
+                }],
+                'usage': {
+                    'prompt_tokens': prompt_tokens,
+                    'completion_tokens': completion_tokens,
+                    'total_tokens': prompt_tokens + completion_tokens
+                }
+            }, {}
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _error_response(self, status: int, message: str) -> Tuple[int, Dict, Dict]:
+        """OpenAI hata gövdesi biçiminde 429/5xx yanıtı"""
+        with self._lock:
+            self.stats['rate_limited' if status == 429 else 'server_errors'] += 1
+        headers = {}
+        if status == 429:
+            headers = {'retry-after': str(self.faults.retry_after),
+                       'retry-after-ms': str(int(self.faults.retry_after * 1000))}
+        error_type = 'rate_limit_exceeded' if status == 429 else 'server_error'
+        return status, {'error': {'message': message, 'type': error_type, 'code': error_type}}, headers
+
+    def get_stats(self) -> Dict:
+        """Sunucu istatistikleri"""
+        with self._lock:
+            return {'model': self.model, 'base_url': self.base_url, **self.stats}
+
+    def start(self) -> "MockLLMServer":
+        """Sunucuyu arka plan thread'inde başlat"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"🧪 Mock LLM sunucusu başlatıldı: {self.base_url}")
+        return self
+
+    def stop(self):
+        """Sunucuyu durdur"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    """Mock sunucuyu komut satırından başlat"""
+    parser = argparse.ArgumentParser(description="OpenAI uyumlu yerel mock LLM sunucusu")
+    parser.add_argument('--host', default='127.0.0.1', help='Dinlenecek adres')
+    parser.add_argument('--port', type=int, default=8089, help='Dinlenecek port')
+    parser.add_argument('--model', default='mock-llm', help='Raporlanan model adı')
+    parser.add_argument('--latency-dist', default='lognormal', choices=LATENCY_DISTRIBUTIONS,
+                        help='Gecikme dağılımı')
+    parser.add_argument('--latency', type=float, default=0.3, help='Ortalama çağrı gecikmesi (sn)')
+    parser.add_argument('--latency-spread', type=float, default=0.5, help='Gecikme dağılım genişliği')
+    parser.add_argument('--per-token-latency', type=float, default=0.005, help='Token başına ek gecikme (sn)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='429 dönen istek oranı (0-1)')
+    parser.add_argument('--server-error-rate', type=float, default=0.0, help='5xx dönen istek oranı (0-1)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='429 yanıtlarındaki Retry-After (sn)')
+    parser.add_argument('--max-concurrency', type=int, default=None, help='Aşılınca 429 dönen eşzamanlılık sınırı')
+    parser.add_argument('--seed', type=int, default=None, help='Rastgelelik tohumu')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    server = MockLLMServer(
+        args.host, args.port, model=args.model,
+        latency=LatencyModel(args.latency_dist, args.latency, args.latency_spread, args.per_token_latency, args.seed),
+        faults=FaultInjector(args.rate_limit_rate, args.server_error_rate, args.retry_after,
+                             args.max_concurrency, args.seed)
+    )
+    print(f"🧪 Mock LLM sunucusu: {server.base_url}")
+    print(f"   LLM_BASE_URL={server.base_url} ile analizörler bu sunucuya yönlendirilebilir")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n📊 " + json.dumps(server.get_stats(), ensure_ascii=False))
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+import os
+import time
+import asyncio
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Provider/model bazında (RPM, TPM) varsayılanları. None = sınırsız.
+# OpenAI değerleri Tier 1, Groq değerleri ücretsiz katman limitleridir;
+# hesabınıza göre <PROVIDER>_RPM / <PROVIDER>_TPM env değişkenleriyle değiştirin.
+DEFAULT_RATE_LIMITS = {
+    "openai": {
+        "default": (500, 30000),
+        "gpt-4": (500, 10000),
+        "gpt-3.5-turbo": (3500, 200000),
+    },
+    "groq": {
+        "default": (30, 30000),
+        "llama3-70b-8192": (30, 6000),
+        "mixtral-8x7b-32768": (30, 5000),
+    },
+    "huggingface": {
+        "default": (60, None),
+    },
+    "anthropic": {
+        "default": (50, 50000),
+    },
+}
+
+
+def estimate_prompt_tokens(messages: List[Dict]) -> int:
+    """Mesaj listesinin token sayısını kabaca tahmin et (~4 karakter/token)"""
+    return sum(len(m.get('content', '')) // 4 + 4 for m in messages)
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """'1s', '6m0s', '120ms', '2.5' gibi süreleri saniyeye çevir"""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    total = 0.0
+    number = ""
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char.isdigit() or char == '.':
+            number += char
+        elif value[i:i + 2] == 'ms':
+            total += float(number or 0) / 1000
+            number = ""
+            i += 1
+        elif char in 'hms':
+            total += float(number or 0) * {'h': 3600, 'm': 60, 's': 1}[char]
+            number = ""
+        else:
+            return None
+        i += 1
+    return total
+
+
+def retry_after_from_error(error: Exception) -> Optional[float]:
+    """API hatasındaki Retry-After / rate-limit başlıklarından bekleme süresini çıkar"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    if headers.get('retry-after-ms'):
+        try:
+            return float(headers['retry-after-ms']) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if retry_after:
+        seconds = _parse_duration(retry_after)
+        if seconds is not None:
+            return seconds
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    resets = [
+        _parse_duration(headers[name])
+        for name in ('x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens')
+        if headers.get(name)
+    ]
+    resets = [reset for reset in resets if reset is not None]
+    return max(resets) if resets else None
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Hata 429 (rate limit) mi"""
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    return status == 429 or type(error).__name__ == 'RateLimitError'
+
+
+class TokenBucketRateLimiter:
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        """
+        Dakikalık istek (RPM) ve token (TPM) bütçelerini uygulayan token bucket
+
+        Her çağrı bütçeden önce rezervasyon yapar; bütçe eksiye düşerse çağıran
+        eksik dolana kadar bekler. Retry-After ile gelen bekleme süreleri tüm
+        çağıranlara uygulanır.
+
+        Args:
+            rpm (float): Dakikadaki en fazla istek (None = sınırsız)
+            tpm (float): Dakikadaki en fazla token (None = sınırsız)
+        """
+        self.rpm = rpm
+        self.tpm = tpm
+        self._request_budget = float(rpm) if rpm else 0.0
+        self._token_budget = float(tpm) if tpm else 0.0
+        self._blocked_until = 0.0
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.stats = {'requests': 0, 'waits': 0, 'wait_seconds': 0.0, 'rate_limited': 0}
+
+    def _refill(self, now: float):
+        """Geçen süreye göre bütçeleri doldur"""
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        if self.rpm:
+            self._request_budget = min(float(self.rpm), self._request_budget + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._token_budget = min(float(self.tpm), self._token_budget + elapsed * self.tpm / 60)
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Bütçeden rezervasyon yap ve beklenmesi gereken süreyi döndür"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            wait = max(0.0, self._blocked_until - now)
+            if self.rpm:
+                self._request_budget -= 1
+                if self._request_budget < 0:
+                    wait = max(wait, -self._request_budget * 60 / self.rpm)
+            if self.tpm and tokens:
+                self._token_budget -= tokens
+                if self._token_budget < 0:
+                    wait = max(wait, -self._token_budget * 60 / self.tpm)
+
+            self.stats['requests'] += 1
+            if wait > 0:
+                self.stats['waits'] += 1
+                self.stats['wait_seconds'] += wait
+            return wait
+
+    def estimate_wait(self, tokens: int = 0) -> float:
+        """Rezervasyon yapmadan, şimdi çağrılsa beklenecek süreyi tahmin et"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            wait = max(0.0, self._blocked_until - now)
+            if self.rpm and self._request_budget < 1:
+                wait = max(wait, (1 - self._request_budget) * 60 / self.rpm)
+            if self.tpm and tokens and self._token_budget < tokens:
+                wait = max(wait, (tokens - self._token_budget) * 60 / self.tpm)
+            return wait
+
+    def acquire(self, tokens: int = 0):
+        """Rezervasyon yap ve gerekirse bekle"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int = 0):
+        """acquire'ın asenkron karşılığı"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def reconcile(self, reserved_tokens: int, actual_tokens: int):
+        """Tahmini token rezervasyonunu gerçek kullanımla düzelt"""
+        if self.tpm and actual_tokens:
+            with self._lock:
+                self._token_budget = min(float(self.tpm), self._token_budget + reserved_tokens - actual_tokens)
+
+    def penalize(self, seconds: float):
+        """429 sonrası tüm çağıranları verilen süre boyunca beklet"""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.stats['rate_limited'] += 1
+        logger.warning(f"⏳ Rate limit: {seconds:.2f} sn bekleniyor")
+
+    def get_stats(self) -> Dict:
+        """Limitler ve bekleme istatistikleri"""
+        with self._lock:
+            return {
+                'rpm': self.rpm,
+                'tpm': self.tpm,
+                **self.stats,
+                'wait_seconds': round(self.stats['wait_seconds'], 3)
+            }
+
+
+def resolve_rate_limits(provider: str, model: str) -> Tuple[Optional[float], Optional[float]]:
+    """Provider/model için (RPM, TPM) değerlerini env veya varsayılan tablodan belirle"""
+    limits = DEFAULT_RATE_LIMITS.get(provider, {})
+    rpm, tpm = limits.get(model, limits.get("default", (None, None)))
+
+    env_rpm = os.getenv(f"{provider.upper()}_RPM")
+    env_tpm = os.getenv(f"{provider.upper()}_TPM")
+    if env_rpm:
+        rpm = float(env_rpm) or None
+    if env_tpm:
+        tpm = float(env_tpm) or None
+
+    return rpm, tpm
+
+
+_limiters: Dict[Tuple[str, str], TokenBucketRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, model: str) -> TokenBucketRateLimiter:
+    """Süreç genelinde provider/model başına paylaşılan limiter'ı döndür"""
+    with _limiters_lock:
+        key = (provider, model)
+        if key not in _limiters:
+            rpm, tpm = resolve_rate_limits(provider, model)
+            _limiters[key] = TokenBucketRateLimiter(rpm, tpm)
+            logger.info(f"🚦 Rate limiter: {provider}/{model} (RPM: {rpm}, TPM: {tpm})")
+        return _limiters[key]
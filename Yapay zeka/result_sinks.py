@@ -0,0 +1,160 @@
+import csv
+import json
+import sqlite3
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ResultSink:
+    def __init__(self, path: str, buffer_size: int = 500):
+        """
+        Analiz sonuçlarını artımlı olarak yazan hedeflerin temel sınıfı
+
+        Satırlar en fazla buffer_size kadar bellekte tutulur, dolunca diske
+        yazılır; böylece bellek kullanımı girdi boyutundan bağımsız kalır.
+
+        Args:
+            path (str): Çıktı dosyasının yolu
+            buffer_size (int): Diske yazmadan önce bellekte tutulacak en fazla satır
+        """
+        self.path = path
+        self.buffer_size = max(1, buffer_size)
+        self.rows_written = 0
+        self._buffer: List[Dict] = []
+
+    def write(self, row: Dict):
+        """Satırı tampona ekle, tampon dolduysa diske yaz"""
+        self._buffer.append(row)
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def write_all(self, rows: Iterable[Dict]) -> int:
+        """Tüm satırları (ör. bir generator'dan) yaz ve yazılan satır sayısını döndür"""
+        for row in rows:
+            self.write(row)
+        self.flush()
+        return self.rows_written
+
+    def flush(self):
+        """Tampondaki satırları diske yaz"""
+        if self._buffer:
+            self._write_rows(self._buffer)
+            self.rows_written += len(self._buffer)
+            self._buffer = []
+
+    def _write_rows(self, rows: List[Dict]):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+    def close(self):
+        """Kalan satırları yaz ve dosyayı kapat"""
+        self.flush()
+        self._close()
+        logger.info(f"💾 {self.rows_written} satır yazıldı: {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CSVSink(ResultSink):
+    def __init__(self, path: str, buffer_size: int = 500, fieldnames: Optional[List[str]] = None):
+        """
+        CSV hedefi (Excel uyumu için utf-8-sig)
+
+        Args:
+            fieldnames (list): Sütunlar (verilmezse ilk satırın anahtarları kullanılır)
+        """
+        super().__init__(path, buffer_size)
+        self.fieldnames = fieldnames
+        self._file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self._writer = None
+
+    def _write_rows(self, rows: List[Dict]):
+        if self._writer is None:
+            self.fieldnames = self.fieldnames or list(rows[0].keys())
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, restval='', extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class JSONLSink(ResultSink):
+    """Her satırı ayrı bir JSON nesnesi olarak yazan JSONL hedefi"""
+
+    def __init__(self, path: str, buffer_size: int = 500):
+        super().__init__(path, buffer_size)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def _write_rows(self, rows: List[Dict]):
+        self._file.write("".join(json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows))
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+
+class SQLiteSink(ResultSink):
+    def __init__(self, path: str, table: str = "chat_analysis", buffer_size: int = 500, replace: bool = True):
+        """
+        SQLite hedefi (her tampon tek bir transaction ile yazılır)
+
+        Args:
+            table (str): Tablo adı
+            replace (bool): True ise tablo varsa silinip yeniden oluşturulur
+        """
+        super().__init__(path, buffer_size)
+        self.table = table
+        self.replace = replace
+        self.columns: Optional[List[str]] = None
+        self.conn = sqlite3.connect(path)
+
+    def _value(self, value):
+        """SQLite'ın doğrudan saklayamadığı değerleri metne çevir"""
+        if value is None or isinstance(value, (int, float, str, bytes)):
+            return value
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False, default=str)
+        return str(value)
+
+    def _write_rows(self, rows: List[Dict]):
+        if self.columns is None:
+            self.columns = list(rows[0].keys())
+            column_sql = ", ".join(f'"{column}"' for column in self.columns)
+            if self.replace:
+                self.conn.execute(f'DROP TABLE IF EXISTS "{self.table}"')
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS "{self.table}" ({column_sql})')
+
+        placeholders = ", ".join("?" for _ in self.columns)
+        column_sql = ", ".join(f'"{column}"' for column in self.columns)
+        with self.conn:
+            self.conn.executemany(
+                f'INSERT INTO "{self.table}" ({column_sql}) VALUES ({placeholders})',
+                [tuple(self._value(row.get(column)) for column in self.columns) for row in rows]
+            )
+
+    def _close(self):
+        self.conn.close()
+
+
+def write_to_sinks(rows: Iterable[Dict], sinks: List[ResultSink]) -> int:
+    """Satırları aynı anda birden çok hedefe yaz, hedefleri kapat ve satır sayısını döndür"""
+    count = 0
+    try:
+        for row in rows:
+            for sink in sinks:
+                sink.write(row)
+            count += 1
+    finally:
+        for sink in sinks:
+            sink.close()
+    return count
@@ -0,0 +1,165 @@
+import os
+import math
+import threading
+import logging
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Gecikme histogramı kovaları (saniye, Prometheus "le" sınırları)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Metadata'da raporlanan gecikme yüzdelikleri
+LATENCY_PERCENTILES = (50, 90, 95, 99)
+
+# Sayaç alanları -> (açıklama, Prometheus metrik adı)
+COUNTERS = {
+    'calls': ("API çağrısı (başarılı)", "calls_total"),
+    'retries': ("Tekrar denenen çağrı", "retries_total"),
+    'errors': ("Başarısız deneme", "errors_total"),
+    'cache_hits': ("Önbellekten dönen çağrı", "cache_hits_total"),
+    'fallbacks': ("Kural tabanlı analize düşen görev", "fallbacks_total"),
+    'hedges': ("Gecikme eşiği aşıldığı için gönderilen yedek (hedge) çağrı", "hedges_total"),
+    'hedge_wins': ("Ana çağrıdan önce yanıt veren hedge", "hedge_wins_total"),
+    'prompt_tokens': ("Prompt token", "prompt_tokens_total"),
+    'completion_tokens': ("Completion token", "completion_tokens_total"),
+}
+
+
+def percentile(samples: List[float], p: float) -> Optional[float]:
+    """Sıralı örneklerden yüzdelik değeri (en yakın sıra yöntemi)"""
+    if not samples:
+        return None
+    rank = max(0, min(len(samples) - 1, math.ceil(p / 100 * len(samples)) - 1))
+    return samples[rank]
+
+
+class LLMTelemetry:
+    def __init__(self, max_samples: int = 10000):
+        """
+        Görev bazında (sentiment, topic, bot_response, fused, batch) çağrı metrikleri
+
+        Gecikme yüzdelikleri son max_samples çağrıdan hesaplanır; Prometheus
+        dışa aktarımı için ayrıca tüm çağrıları kapsayan histogram tutulur.
+
+        Args:
+            max_samples (int): Görev başına saklanan en fazla gecikme örneği
+        """
+        self.max_samples = max_samples
+        self._tasks: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _task(self, task: str) -> Dict:
+        """Görevin sayaçlarını döndür (yoksa oluştur); kilit altında çağrılır"""
+        if task not in self._tasks:
+            self._tasks[task] = {
+                **{name: 0 for name in COUNTERS},
+                'error_kinds': {},
+                'latency_count': 0,
+                'latency_sum': 0.0,
+                'latency_buckets': [0] * len(LATENCY_BUCKETS),
+                'latency_samples': deque(maxlen=self.max_samples),
+                'wait_seconds': 0.0,
+            }
+        return self._tasks[task]
+
+    def record_call(self, task: str, latency: Optional[float], prompt_tokens: int = 0,
+                    completion_tokens: int = 0, wait: float = 0.0):
+        """Başarılı çağrıyı kaydet (latency None ise yalnızca token sayılır, ör. Batch API)"""
+        with self._lock:
+            stats = self._task(task)
+            stats['calls'] += 1
+            stats['prompt_tokens'] += prompt_tokens
+            stats['completion_tokens'] += completion_tokens
+            stats['wait_seconds'] += wait
+            if latency is None:
+                return
+            stats['latency_count'] += 1
+            stats['latency_sum'] += latency
+            stats['latency_samples'].append(latency)
+            for position, bound in enumerate(LATENCY_BUCKETS):
+                if latency <= bound:
+                    stats['latency_buckets'][position] += 1
+
+    def record_error(self, task: str, kind: str, retried: bool):
+        """Başarısız denemeyi ve tekrar denenip denenmeyeceğini kaydet"""
+        with self._lock:
+            stats = self._task(task)
+            stats['errors'] += 1
+            stats['error_kinds'][kind] = stats['error_kinds'].get(kind, 0) + 1
+            if retried:
+                stats['retries'] += 1
+
+    def record_cache_hit(self, task: str):
+        """Önbellekten dönen çağrıyı kaydet"""
+        with self._lock:
+            self._task(task)['cache_hits'] += 1
+
+    def record_fallback(self, task: str):
+        """Kural tabanlı analize düşen görevi kaydet"""
+        with self._lock:
+            self._task(task)['fallbacks'] += 1
+
+    def record_hedge(self, task: str, won: bool = False):
+        """Gönderilen hedge'i (won=True ise kazanan hedge'i) kaydet"""
+        with self._lock:
+            self._task(task)['hedge_wins' if won else 'hedges'] += 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """Metadata için görev bazında özet (gecikmeler saniye)"""
+        with self._lock:
+            summary = {}
+            for task, stats in sorted(self._tasks.items()):
+                samples = sorted(stats['latency_samples'])
+                count = len(samples)
+                summary[task] = {
+                    **{name: stats[name] for name in COUNTERS},
+                    'error_kinds': dict(stats['error_kinds']),
+                    'rate_limit_wait_seconds': round(stats['wait_seconds'], 3),
+                    'latency': {
+                        'mean': round(sum(samples) / count, 4) if count else None,
+                        'max': round(samples[-1], 4) if count else None,
+                        **{f'p{p}': round(percentile(samples, p), 4) if count else None
+                           for p in LATENCY_PERCENTILES}
+                    }
+                }
+            return summary
+
+    def to_prometheus(self, prefix: str = "llm_analyzer", labels: Optional[Dict[str, str]] = None) -> str:
+        """Metrikleri Prometheus metin formatında döndür"""
+        base_labels = "".join(f',{key}="{value}"' for key, value in (labels or {}).items())
+        lines = []
+        with self._lock:
+            tasks = sorted(self._tasks.items())
+
+            for name, (description, metric) in COUNTERS.items():
+                lines.append(f"# HELP {prefix}_{metric} {description}")
+                lines.append(f"# TYPE {prefix}_{metric} counter")
+                for task, stats in tasks:
+                    lines.append(f'{prefix}_{metric}{{task="{task}"{base_labels}}} {stats[name]}')
+
+            metric = f"{prefix}_request_duration_seconds"
+            lines.append(f"# HELP {metric} API çağrısı gecikmesi")
+            lines.append(f"# TYPE {metric} histogram")
+            for task, stats in tasks:
+                for bound, count in zip(LATENCY_BUCKETS, stats['latency_buckets']):
+                    lines.append(f'{metric}_bucket{{task="{task}"{base_labels},le="{bound}"}} {count}')
+                lines.append(f'{metric}_bucket{{task="{task}"{base_labels},le="+Inf"}} {stats["latency_count"]}')
+                lines.append(f'{metric}_sum{{task="{task}"{base_labels}}} {round(stats["latency_sum"], 6)}')
+                lines.append(f'{metric}_count{{task="{task}"{base_labels}}} {stats["latency_count"]}')
+
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "llm_analyzer", labels: Optional[Dict[str, str]] = None) -> str:
+        """
+        Metrikleri node_exporter textfile collector için dosyaya yaz
+
+        Dosya önce geçici adla yazılıp yeniden adlandırılır; collector yarım dosya okumaz.
+        """
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(prefix, labels))
+        os.replace(temp_path, path)
+        logger.info(f"📈 Prometheus metrikleri yazıldı: {path}")
+        return path
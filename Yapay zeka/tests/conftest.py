@@ -0,0 +1,55 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+# Modüller paket olarak değil, "Yapay zeka" klasöründen doğrudan import edilir
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+
+class FakeClock:
+    """time modülünün yerine geçen, elle ilerletilen saat"""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class StubChatClient:
+    """Sırayla verilen yanıtları döndüren, çağrıları sayan sahte chat completions istemcisi"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, messages, **params):
+        self.calls += 1
+        content = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def stub_client():
+    return StubChatClient
+
+
+@pytest.fixture
+def no_api_keys(monkeypatch):
+    """.env'deki gerçek anahtarlar testlerde kullanılmaz (mock sunucu anahtarsız çalışır)"""
+    for name in ("OPENAI_API_KEY", "GROQ_API_KEY"):
+        monkeypatch.setenv(name, "")
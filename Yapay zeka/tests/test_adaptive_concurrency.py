@@ -0,0 +1,138 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import adaptive_concurrency
+from adaptive_concurrency import AIMDConcurrencyController, overload_reason
+
+RATE_LIMITED = SimpleNamespace(status_code=429)
+BAD_REQUEST = SimpleNamespace(status_code=400)
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(adaptive_concurrency, "time", clock)
+
+
+def run_full_round(controller, latency=0.1):
+    """Limit kadar isteği aynı anda uçur ve başarılı bitir"""
+    tickets = [controller.acquire() for _ in range(controller.limit)]
+    for ticket in tickets:
+        controller.release(ticket, latency=latency)
+
+
+def test_rate_limit_halves_the_limit(clock):
+    controller = AIMDConcurrencyController(initial_limit=8)
+    ticket = controller.acquire()
+    clock.advance(1)
+    controller.release(ticket, error=RATE_LIMITED)
+
+    assert controller.limit == 4
+    stats = controller.get_stats()
+    assert stats['decreases'] == 1
+    assert stats['overloads'] == {'rate_limit': 1}
+    assert stats['history'][-1]['reason'] == "rate_limit"
+
+
+def test_one_overload_burst_decreases_once(clock):
+    controller = AIMDConcurrencyController(initial_limit=8)
+    tickets = [controller.acquire() for _ in range(4)]
+    clock.advance(1)
+    for ticket in tickets:
+        controller.release(ticket, error=RATE_LIMITED)
+
+    # Düşüşten önce başlamış isteklerin 429'ları tekrar düşürmez
+    assert controller.limit == 4
+    assert controller.get_stats()['overloads'] == {'rate_limit': 4}
+
+    clock.advance(1)
+    ticket = controller.acquire()
+    clock.advance(1)
+    controller.release(ticket, error=RATE_LIMITED)
+    assert controller.limit == 2
+
+
+def test_limit_never_drops_below_min(clock):
+    controller = AIMDConcurrencyController(initial_limit=4, min_limit=2)
+    for _ in range(5):
+        ticket = controller.acquire()
+        clock.advance(1)
+        controller.release(ticket, error=RATE_LIMITED)
+    assert controller.limit == 2
+
+
+def test_non_overload_errors_keep_the_limit(clock):
+    controller = AIMDConcurrencyController(initial_limit=8)
+    ticket = controller.acquire()
+    clock.advance(1)
+    controller.release(ticket, error=BAD_REQUEST)
+    assert controller.limit == 8
+
+
+def test_success_increases_the_limit_when_full():
+    controller = AIMDConcurrencyController(initial_limit=2, max_limit=5)
+    for _ in range(20):
+        run_full_round(controller)
+
+    assert controller.limit == 5
+    assert controller.get_stats()['increases'] == 3
+
+
+@pytest.mark.parametrize("in_flight, expected", [(1, 4), (2, 5), (4, 5)])
+def test_limit_grows_once_half_of_it_is_in_use(in_flight, expected):
+    # increase=limit ile tek başarılı yanıt limiti bir artırır
+    controller = AIMDConcurrencyController(initial_limit=4, increase=4)
+    tickets = [controller.acquire() for _ in range(in_flight)]
+    controller.release(tickets[0], latency=0.1)
+    assert controller.limit == expected
+
+
+def test_underused_limit_does_not_grow():
+    controller = AIMDConcurrencyController(initial_limit=8)
+    for _ in range(50):
+        controller.release(controller.acquire(), latency=0.1)
+    assert controller.limit == 8
+
+
+def test_latency_spike_stops_increases():
+    controller = AIMDConcurrencyController(initial_limit=2, max_limit=64)
+    for _ in range(5):
+        run_full_round(controller, latency=0.1)
+    before = controller.limit
+
+    for _ in range(5):
+        run_full_round(controller, latency=2.0)
+    stats = controller.get_stats()
+    assert stats['slow_responses'] > 0
+    assert controller.limit == before
+
+
+def test_async_waiter_gets_the_released_slot():
+    controller = AIMDConcurrencyController(initial_limit=1)
+
+    async def scenario():
+        ticket = await controller.acquire_async()
+        waiter = asyncio.ensure_future(controller.acquire_async())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        controller.release(ticket)
+        second = await asyncio.wait_for(waiter, timeout=1)
+        assert controller.get_stats()['in_flight'] == 1
+        controller.release(second)
+
+    asyncio.run(scenario())
+    assert controller.get_stats()['in_flight'] == 0
+
+
+@pytest.mark.parametrize("error, expected", [
+    (RATE_LIMITED, "rate_limit"),
+    (SimpleNamespace(status_code=503), "overloaded"),
+    (SimpleNamespace(status_code=529), "overloaded"),
+    (TimeoutError(), "timeout"),
+    (BAD_REQUEST, None),
+    (SimpleNamespace(status_code=500), None),
+])
+def test_overload_reason(error, expected):
+    assert overload_reason(error) == expected
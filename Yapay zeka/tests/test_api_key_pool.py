@@ -0,0 +1,156 @@
+from types import SimpleNamespace
+
+import pytest
+
+import enhanced_llm_analyzer
+import rate_limiter
+from api_key_pool import APIKeyPool, NoUsableAPIKeyError, mask_api_key, parse_api_keys
+from enhanced_llm_analyzer import EnhancedLLMAnalyzer
+from mock_llm_server import MockLLMServer
+
+KEYS = ["sk-test-key-one-0001", "sk-test-key-two-0002", "sk-test-key-three-0003"]
+
+
+def rate_limited(retry_after=10, code=None):
+    return SimpleNamespace(status_code=429, code=code, response=SimpleNamespace(headers={'retry-after': str(retry_after)}))
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+
+
+def make_pool(monkeypatch, rpm="0", tpm="0", keys=KEYS):
+    monkeypatch.setenv("OPENAI_RPM", rpm)
+    monkeypatch.setenv("OPENAI_TPM", tpm)
+    return APIKeyPool("openai", "gpt-4o", keys)
+
+
+def call(pool, tokens=0):
+    """Analizördeki sıra: anahtarı seç, ardından limiter'ından rezervasyon yap"""
+    key = pool.select(tokens)
+    key.rate_limiter.reserve(tokens)
+    return key
+
+
+def test_parse_api_keys():
+    assert parse_api_keys(" a1, b2 ,,a1, your_openai_api_key_here ") == ["a1", "b2"]
+    assert parse_api_keys(None) == []
+
+
+def test_mask_api_key():
+    assert mask_api_key("sk-test-key-one-0001") == "sk-...0001"
+    assert mask_api_key("short") == "***"
+
+
+def test_requests_spread_under_per_key_rpm(monkeypatch):
+    pool = make_pool(monkeypatch, rpm="2")
+
+    # Her anahtar dakikada 2 istek: ilk 6 çağrı beklemeden üç anahtara eşit dağılır
+    keys = [call(pool) for _ in range(6)]
+    assert all(key.rate_limiter.get_stats()['waits'] == 0 for key in pool.keys)
+    assert all(keys.count(key) == 2 for key in pool.keys)
+    assert all(key.rate_limiter.estimate_wait() > 0 for key in pool.keys)
+
+
+def test_selection_prefers_the_key_that_can_fit_the_tokens(monkeypatch):
+    pool = make_pool(monkeypatch, tpm="1000", keys=KEYS[:2])
+    first = call(pool, 900)
+
+    # İlk anahtarda 100 token kaldı; 500 token'lık istek diğer anahtara gider
+    second = call(pool, 500)
+    assert second is not first
+    assert call(pool, 400) is second
+
+    # İki anahtarda da 100 token kaldı: bekleme eşit, az kullanılan anahtar seçilir
+    assert pool.select(600) is first
+
+
+def test_rate_limited_key_cools_down(monkeypatch, clock):
+    pool = make_pool(monkeypatch, keys=KEYS[:2])
+    limited = pool.keys[0]
+    pool.record_failure(limited, rate_limited(retry_after=10))
+
+    assert limited.stats['rate_limited'] == 1
+    assert all(call(pool) is pool.keys[1] for _ in range(5))
+
+    clock.advance(10)
+    assert pool.select() is limited
+
+
+def test_invalid_and_exhausted_keys_are_disabled(monkeypatch):
+    pool = make_pool(monkeypatch, keys=KEYS[:2])
+    pool.record_failure(pool.keys[0], SimpleNamespace(status_code=401))
+    pool.record_failure(pool.keys[1], rate_limited(code="insufficient_quota"))
+
+    assert [key.disabled_reason for key in pool.keys] == ["auth", "quota"]
+    assert pool.get_stats()['active_keys'] == 0
+    with pytest.raises(NoUsableAPIKeyError):
+        pool.select()
+
+
+def test_stats_mask_keys(monkeypatch):
+    pool = make_pool(monkeypatch)
+    call(pool)
+    stats = pool.get_stats()
+    assert stats['keys'] == 3
+    assert all(KEYS[0] not in str(usage) for usage in stats['usage'])
+    assert sum(usage['requests'] for usage in stats['usage']) == 1
+
+
+@pytest.mark.usefixtures("no_api_keys")
+def test_analyzer_spreads_calls_across_keys(monkeypatch):
+    monkeypatch.setenv("OPENAI_RPM", "0")
+    monkeypatch.setenv("OPENAI_TPM", "0")
+    messages = [{'message_id': i, 'user_type': 'customer', 'message': f"Gelinlik fiyatı {i} nedir?"}
+                for i in range(1, 7)]
+    with MockLLMServer() as server:
+        analyzer = EnhancedLLMAnalyzer(provider="openai", model="mock-llm", fused=True, base_url=server.base_url,
+                                       api_keys=KEYS)
+        analyzer.analyze_conversation(messages)
+
+    usage = analyzer.key_pool.get_stats()['usage']
+    assert [key['successes'] for key in usage] == [2, 2, 2]
+
+
+class InvalidKeyError(Exception):
+    status_code = 401
+
+
+class RejectingClient:
+    """Her çağrıda 401 dönen (geçersiz anahtarlı) istemci"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, messages, **params):
+        self.calls += 1
+        raise InvalidKeyError("Incorrect API key provided")
+
+
+def test_disabled_key_is_retried_without_backoff(monkeypatch, stub_client):
+    monkeypatch.setenv("OPENAI_RPM", "0")
+    monkeypatch.setenv("OPENAI_TPM", "0")
+    sleeps = []
+    monkeypatch.setattr(enhanced_llm_analyzer.time, "sleep", sleeps.append)
+
+    analyzer = EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", api_keys=KEYS[:2])
+    invalid, healthy = analyzer.key_pool.keys
+    invalid.client = RejectingClient()
+    healthy.client = stub_client(["Pozitif"])
+
+    assert analyzer.analyze_sentiment_enhanced("harika") == "Pozitif"
+    assert invalid.client.calls == 1
+    assert healthy.client.calls == 1
+    assert invalid.disabled_reason == "auth"
+    assert sleeps == []
+    assert analyzer.circuit_breaker.get_stats()['trips'] == 0
+
+
+def test_exponential_backoff_without_a_pool(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(enhanced_llm_analyzer.time, "sleep", sleeps.append)
+    analyzer = EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", client=RejectingClient())
+    analyzer._backoff(SimpleNamespace(status_code=503), 2)
+    assert sleeps == [4]
@@ -0,0 +1,37 @@
+import pytest
+
+from enhanced_llm_analyzer import EnhancedLLMAnalyzer, keyword_topic, keyword_topic_scored
+from rate_limiter import TokenBucketRateLimiter
+
+# "mekan" Düğün Mekanı'na, "fiyat" ve "ücret" Fiyat Sorgusu'na eşleşir
+MIXED = "Mekan için fiyat ve ücret bilgisi alabilir miyim?"
+
+
+def test_fallback_topic_keeps_first_matching_category():
+    assert keyword_topic(MIXED) == "Düğün Mekanı"
+    assert keyword_topic("Merhaba") == "Genel Bilgi"
+
+
+def test_scored_topic_picks_the_most_matches():
+    topic, confidence = keyword_topic_scored(MIXED)
+    assert topic == "Fiyat Sorgusu"
+    assert 0 < confidence < 1
+    assert keyword_topic_scored("Merhaba") == ("Genel Bilgi", 0.0)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Gelinlik fiyatı ne kadar?", "Gelinlik"),
+    ("Rezervasyon için sorun yaşıyorum", "Rezervasyon"),
+    ("Salon fotoğraf çekimine uygun mu?", "Düğün Mekanı"),
+])
+def test_fallback_topic_ordering(text, expected):
+    assert keyword_topic(text) == expected
+
+
+def test_cascade_resolves_confident_tasks_without_the_model(stub_client):
+    client = stub_client(["Nötr"])
+    analyzer = EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", client=client, cascade_threshold=0.5,
+                                   rate_limiter=TokenBucketRateLimiter())
+    labels = analyzer._cascade_labels("Harika, mükemmel bir gelinlik")
+    assert labels == {'llm_sentiment': "Pozitif", 'llm_topic': "Gelinlik"}
+    assert analyzer._cascade_labels("Merhaba") == {}
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from checkpoint import CheckpointJournal
+from enhanced_llm_analyzer import EnhancedLLMAnalyzer
+from rate_limiter import TokenBucketRateLimiter
+
+FUSED_REPLY = json.dumps({'sentiment': "Pozitif", 'topic': "Genel Bilgi", 'bot_response': "Hayır"})
+
+MESSAGES = [
+    {'message_id': 1, 'user_type': 'customer', 'message': "Merhaba, gelinlik fiyatlarını öğrenebilir miyim?"},
+    {'message_id': 2, 'user_type': 'customer', 'message': "Düğün mekanı için de bilgi istiyorum"},
+    {'message_id': 3, 'user_type': 'customer', 'message': "Fotoğrafçı önerebilir misiniz?"},
+    {'message_id': 4, 'user_type': 'customer', 'message': "Teşekkürler, iyi günler"},
+]
+
+
+@pytest.fixture
+def make_analyzer(stub_client):
+    def make():
+        client = stub_client([FUSED_REPLY])
+        analyzer = EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", fused=True, client=client,
+                                       rate_limiter=TokenBucketRateLimiter())
+        return analyzer, client
+    return make
+
+
+def test_resume_skips_completed_messages(tmp_path, make_analyzer):
+    path = str(tmp_path / "journal.jsonl")
+    analyzer, client = make_analyzer()
+    first = analyzer.analyze_conversation(MESSAGES[:2], checkpoint_path=path)
+    assert client.calls == 2
+
+    # İlk iki mesaj günlükten gelir, yalnızca kalanlar analiz edilir
+    analyzer, client = make_analyzer()
+    df = analyzer.analyze_conversation(MESSAGES, checkpoint_path=path, resume=True)
+    assert client.calls == 2
+    assert analyzer.checkpoint_stats['restored'] == 2
+    assert analyzer.checkpoint_stats['written'] == 2
+    assert list(df['message_id']) == [1, 2, 3, 4]
+    assert list(df['analysis_timestamp'][:2]) == list(first['analysis_timestamp'])
+
+
+def test_completed_run_makes_no_calls_on_resume(tmp_path, make_analyzer):
+    path = str(tmp_path / "journal.jsonl")
+    analyzer, _ = make_analyzer()
+    analyzer.analyze_conversation(MESSAGES, checkpoint_path=path)
+
+    analyzer, client = make_analyzer()
+    df = analyzer.analyze_conversation(MESSAGES, checkpoint_path=path, resume=True)
+    assert client.calls == 0
+    assert len(df) == len(MESSAGES)
+
+
+def test_without_resume_everything_is_reanalyzed(tmp_path, make_analyzer):
+    path = str(tmp_path / "journal.jsonl")
+    make_analyzer()[0].analyze_conversation(MESSAGES, checkpoint_path=path)
+
+    analyzer, client = make_analyzer()
+    analyzer.analyze_conversation(MESSAGES, checkpoint_path=path)
+    assert client.calls == len(MESSAGES)
+
+
+def test_degraded_rows_are_reanalyzed(tmp_path, make_analyzer):
+    path = str(tmp_path / "journal.jsonl")
+    analyzer, _ = make_analyzer()
+    rows = analyzer.analyze_conversation(MESSAGES, checkpoint_path=path).to_dict('records')
+
+    journal = CheckpointJournal(path)
+    journal.append("default", [{**rows[1], 'llm_degraded': True}])
+    journal.close()
+
+    analyzer, client = make_analyzer()
+    analyzer.analyze_conversation(MESSAGES, checkpoint_path=path, resume=True)
+    assert client.calls == 1
+    assert analyzer.checkpoint_stats['restored'] == 3
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CheckpointJournal(path)
+    journal.append("default", [{'message_id': 1, 'llm_sentiment': "Pozitif"}])
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"conversation_id": "default", "message_id": 2, "ro')
+
+    journal = CheckpointJournal(path)
+    assert list(journal.load("default")) == ["1"]
+    journal.append("default", [{'message_id': 3, 'llm_sentiment': "Nötr"}])
+    journal.close()
+
+    journal = CheckpointJournal(path)
+    assert sorted(journal.load("default")) == ["1", "3"]
+    journal.close()
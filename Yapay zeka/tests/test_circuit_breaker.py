@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, classify_error
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(circuit_breaker, "time", clock)
+
+
+def trip(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure("transient")
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+    breaker.record_failure("transient")
+    breaker.record_failure("transient")
+    assert breaker.state == CLOSED
+
+    breaker.record_failure("transient")
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+    assert breaker.get_stats()['rejected'] == 1
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=3)
+    breaker.record_failure("transient")
+    breaker.record_failure("transient")
+    breaker.record_success()
+    breaker.record_failure("transient")
+    breaker.record_failure("transient")
+    assert breaker.state == CLOSED
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    trip(breaker)
+
+    clock.advance(59)
+    assert breaker.state == OPEN
+    clock.advance(1)
+    assert breaker.state == HALF_OPEN
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert breaker.get_stats()['probes'] == 1
+
+
+def test_successful_probe_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    trip(breaker)
+    clock.advance(60)
+
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    trip(breaker)
+    clock.advance(60)
+
+    assert breaker.allow_request()
+    breaker.record_failure("transient")
+    assert breaker.state == OPEN
+    assert breaker.get_stats()['trips'] == 2
+
+    # Yeni bekleme süresi probe hatasından itibaren sayılır
+    clock.advance(30)
+    assert not breaker.allow_request()
+    clock.advance(30)
+    assert breaker.allow_request()
+
+
+def test_auth_error_trips_immediately():
+    breaker = CircuitBreaker(failure_threshold=5)
+    breaker.record_failure("auth")
+    assert breaker.state == OPEN
+
+
+@pytest.mark.parametrize("kind", ["client", "rate_limit"])
+def test_client_and_rate_limit_errors_do_not_trip(kind):
+    breaker = CircuitBreaker(failure_threshold=2)
+    for _ in range(10):
+        breaker.record_failure(kind)
+    assert breaker.state == CLOSED
+    assert breaker.get_stats()['failures'][kind] == 10
+
+
+def test_rate_limited_probe_releases_the_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+    trip(breaker)
+    clock.advance(60)
+
+    assert breaker.allow_request()
+    breaker.record_failure("rate_limit")
+    assert breaker.allow_request()
+
+
+@pytest.mark.parametrize("status, expected", [
+    (401, "auth"), (403, "auth"), (429, "rate_limit"), (400, "client"), (404, "client"),
+    (500, "transient"), (503, "transient"), (None, "transient"),
+])
+def test_classify_error(status, expected):
+    assert classify_error(SimpleNamespace(status_code=status)) == expected
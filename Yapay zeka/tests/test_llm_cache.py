@@ -0,0 +1,103 @@
+from enhanced_llm_analyzer import EnhancedLLMAnalyzer
+from hedging import HedgePolicy
+from llm_cache import LLMResponseCache
+from rate_limiter import TokenBucketRateLimiter
+
+
+def make_analyzer(client, cache):
+    return EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", client=client, cache=cache,
+                               rate_limiter=TokenBucketRateLimiter())
+
+
+def test_set_get_roundtrip(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"))
+    key = cache.make_key("openai", "gpt-4o", [{"role": "user", "content": "merhaba"}], {'max_tokens': 10})
+
+    assert cache.get(key) is None
+    cache.set(key, "Pozitif")
+    assert cache.get(key) == "Pozitif"
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_key_depends_on_params():
+    messages = [{"role": "user", "content": "merhaba"}]
+    assert (LLMResponseCache.make_key("openai", "gpt-4o", messages, {'max_tokens': 10})
+            != LLMResponseCache.make_key("openai", "gpt-4o", messages, {'max_tokens': 20}))
+
+
+def test_cache_hit_skips_api_call(tmp_path, stub_client):
+    path = str(tmp_path / "cache.db")
+    first = stub_client(["Pozitif"])
+    assert make_analyzer(first, LLMResponseCache(path)).analyze_sentiment_enhanced("harika bir gün") == "Pozitif"
+    assert first.calls == 1
+
+    # Aynı dosyayı kullanan yeni analizör API'ye gitmez
+    second = stub_client(["Negatif"])
+    analyzer = make_analyzer(second, LLMResponseCache(path))
+    assert analyzer.analyze_sentiment_enhanced("harika bir gün") == "Pozitif"
+    assert second.calls == 0
+    assert analyzer.telemetry.summary()['sentiment']['cache_hits'] == 1
+
+
+def test_invalid_response_is_not_cached(tmp_path, stub_client):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"))
+    client = stub_client(["bilmiyorum", "Pozitif"])
+    analyzer = make_analyzer(client, cache)
+
+    analyzer.analyze_sentiment_enhanced("harika bir gün")
+    assert analyzer.parse_fallbacks['sentiment'] == 1
+    assert cache.stats()['entries'] == 0
+
+    # Çözümlenemeyen yanıt önbellekten dönmez, model yeniden çağrılır
+    assert analyzer.analyze_sentiment_enhanced("harika bir gün") == "Pozitif"
+    assert client.calls == 2
+    assert cache.stats()['entries'] == 1
+
+
+def test_key_depends_on_base_url():
+    messages = [{"role": "user", "content": "merhaba"}]
+    params = {'max_tokens': 10}
+    official = LLMResponseCache.make_key("openai", "gpt-4o", messages, params)
+
+    assert LLMResponseCache.make_key("openai", "gpt-4o", messages, params, None) == official
+    assert LLMResponseCache.make_key("openai", "gpt-4o", messages, params, "http://127.0.0.1:8089/v1") != official
+    assert (LLMResponseCache.make_key("openai", "gpt-4o", messages, params, "http://127.0.0.1:8089/v1")
+            != LLMResponseCache.make_key("openai", "gpt-4o", messages, params, "http://127.0.0.1:9000/v1"))
+
+
+def test_base_urls_do_not_share_entries(tmp_path, stub_client):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"))
+
+    def analyzer(client, base_url):
+        return EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", client=client, cache=cache,
+                                   rate_limiter=TokenBucketRateLimiter(), base_url=base_url)
+
+    mock = stub_client(["Pozitif"])
+    assert analyzer(mock, "http://127.0.0.1:8089/v1").analyze_sentiment_enhanced("harika") == "Pozitif"
+
+    # Mock sunucunun yanıtı gerçek provider çağrısında tekrar kullanılmaz
+    live = stub_client(["Negatif"])
+    assert analyzer(live, None).analyze_sentiment_enhanced("harika") == "Negatif"
+    assert live.calls == 1
+
+    same_server = stub_client(["Nötr"])
+    assert analyzer(same_server, "http://127.0.0.1:8089/v1").analyze_sentiment_enhanced("harika") == "Pozitif"
+    assert same_server.calls == 0
+    assert cache.stats()['entries'] == 2
+
+
+def test_hedge_answer_is_stored_under_the_hedge_target(tmp_path, monkeypatch, stub_client):
+    monkeypatch.setenv("GROQ_API_KEY", "gsk_test_key_0001")
+    cache = LLMResponseCache(str(tmp_path / "cache.db"))
+    analyzer = EnhancedLLMAnalyzer(provider="openai", model="gpt-4o", client=stub_client(["Nötr"]), cache=cache,
+                                   rate_limiter=TokenBucketRateLimiter(),
+                                   hedge=HedgePolicy(provider="groq", model="llama-3.1-8b-instant"))
+    monkeypatch.setattr(analyzer, "_complete_hedged", lambda *args: ("Pozitif", True))
+
+    messages = analyzer._sentiment_messages("harika")
+    params = analyzer._completion_params(analyzer.label_max_tokens, False)
+    assert analyzer.call_llm_with_retry(messages, max_tokens=analyzer.label_max_tokens, task="sentiment") == "Pozitif"
+
+    assert cache.get(analyzer._cache_key(messages, params)) is None
+    assert cache.get(analyzer._cache_key(messages, params, hedge=True)) == "Pozitif"
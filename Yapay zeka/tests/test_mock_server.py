@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from enhanced_llm_analyzer import ROLE_AWARE_ROUTING, EnhancedLLMAnalyzer
+from mock_llm_server import FaultInjector, MockLLMServer
+from rate_limiter import TokenBucketRateLimiter
+
+MESSAGES = [
+    {'message_id': 1, 'user_type': 'customer', 'message': "Siparişim hâlâ gelmedi, çok kötü bir hizmet"},
+    {'message_id': 2, 'user_type': 'support', 'message': "Özür dileriz, kargonuzu kontrol ediyoruz"},
+    {'message_id': 3, 'user_type': 'customer', 'message': "Teşekkürler, harika yardımcı oldunuz"},
+    {'message_id': 4, 'user_type': 'customer', 'message': "Ürün fiyatı ne kadar?"},
+]
+
+# Mock sunucunun kural tabanlı simülatörünün bu mesajlar için ürettiği etiketler
+EXPECTED = {
+    'llm_sentiment': ["Negatif", "Nötr", "Pozitif", "Nötr"],
+    'llm_topic': ["Genel Bilgi", "Genel Bilgi", "Genel Bilgi", "Fiyat Sorgusu"],
+    'llm_bot_response': ["Evet", "Hayır", "Hayır", "Hayır"],
+}
+
+
+@pytest.fixture
+def server():
+    with MockLLMServer() as server:
+        yield server
+
+
+def make_analyzer(server, **options):
+    return EnhancedLLMAnalyzer(provider="openai", model="mock-llm", base_url=server.base_url,
+                               rate_limiter=TokenBucketRateLimiter(), **options)
+
+
+def assert_expected_labels(analyzer, df):
+    for column, labels in EXPECTED.items():
+        assert list(df[column]) == labels
+    assert not df['llm_degraded'].any()
+    assert not any(analyzer.parse_fallbacks.values())
+
+
+@pytest.mark.usefixtures("no_api_keys")
+def test_fused_output(server):
+    analyzer = make_analyzer(server, fused=True)
+    df = analyzer.analyze_conversation(MESSAGES)
+
+    assert_expected_labels(analyzer, df)
+    assert list(df['message_id']) == [1, 2, 3, 4]
+    # Mesaj başına tek birleşik çağrı
+    assert server.get_stats()['completions'] == len(MESSAGES)
+    assert analyzer.telemetry.summary()['fused']['calls'] == len(MESSAGES)
+
+
+@pytest.mark.usefixtures("no_api_keys")
+def test_batch_output(server):
+    analyzer = make_analyzer(server, batch_size=4)
+    df = analyzer.analyze_conversation(MESSAGES)
+
+    assert_expected_labels(analyzer, df)
+    assert analyzer.batch_stats == {'batches': 1, 'batched_messages': 4, 'retried_messages': 0}
+    assert analyzer.api_calls == 1
+
+
+@pytest.mark.usefixtures("no_api_keys")
+def test_async_batch_output(server):
+    analyzer = make_analyzer(server, batch_size=2)
+    df = asyncio.run(analyzer.analyze_conversation_async(MESSAGES, max_concurrency=2))
+
+    assert_expected_labels(analyzer, df)
+    assert analyzer.batch_stats['batches'] == 2
+
+
+@pytest.mark.usefixtures("no_api_keys")
+def test_fused_output_survives_rate_limits():
+    faults = FaultInjector(rate_limit_rate=0.3, retry_after=0.01, seed=7)
+    with MockLLMServer(faults=faults) as server:
+        analyzer = make_analyzer(server, fused=True)
+        df = analyzer.analyze_conversation(MESSAGES)
+        assert server.get_stats()['rate_limited'] > 0
+
+    assert_expected_labels(analyzer, df)
+    assert analyzer.circuit_breaker.get_stats()['trips'] == 0
+
+
+@pytest.mark.usefixtures("no_api_keys")
+def test_structure_only_decides_unanswered_customer_messages(server):
+    analyzer = make_analyzer(server, fused=True)
+    df = analyzer.analyze_conversation(MESSAGES)
+
+    # Destek mesajı yapıdan "Evet" sayılmaz, modele sorulur
+    assert df['llm_bot_response'][1] == "Hayır"
+    assert analyzer.bot_response_resolution == {'no_support_reply': 2, 'ambiguous': 2}
+
+
+@pytest.mark.usefixtures("no_api_keys")
+def test_routing_marks_support_bot_response_not_applicable(server):
+    analyzer = make_analyzer(server, fused=True, task_routing=ROLE_AWARE_ROUTING)
+    df = analyzer.analyze_conversation(MESSAGES)
+
+    assert list(df['llm_bot_response']) == ["Evet", "N/A", "Hayır", "Hayır"]
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import pytest
+
+import rate_limiter
+from rate_limiter import TokenBucketRateLimiter, retry_after_from_error
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+
+
+def test_unlimited_never_waits():
+    limiter = TokenBucketRateLimiter()
+    assert all(limiter.reserve(10_000) == 0 for _ in range(100))
+
+
+def test_request_budget_refills_over_time(clock):
+    limiter = TokenBucketRateLimiter(rpm=60)
+    assert all(limiter.reserve() == 0 for _ in range(60))
+
+    # Bütçe bitti: 61. istek bir isteğin dolma süresi kadar (60 sn / 60) bekler
+    assert limiter.reserve() == pytest.approx(1.0)
+
+    clock.advance(2)
+    assert limiter.reserve() == 0
+    assert limiter.get_stats()['waits'] == 1
+
+
+def test_refill_is_capped_at_the_limit(clock):
+    limiter = TokenBucketRateLimiter(rpm=60)
+    clock.advance(3600)
+    assert all(limiter.reserve() == 0 for _ in range(60))
+    assert limiter.reserve() > 0
+
+
+def test_token_budget(clock):
+    limiter = TokenBucketRateLimiter(tpm=600)
+    assert limiter.reserve(600) == 0
+    assert limiter.reserve(60) == pytest.approx(6.0)
+    assert limiter.estimate_wait(60) == pytest.approx(12.0)
+
+
+def test_reconcile_returns_unused_tokens(clock):
+    limiter = TokenBucketRateLimiter(tpm=600)
+    limiter.reserve(600)
+    limiter.reconcile(reserved_tokens=600, actual_tokens=100)
+    assert limiter.reserve(500) == 0
+
+
+def test_penalize_blocks_all_callers_until_retry_after(clock):
+    limiter = TokenBucketRateLimiter()
+    limiter.penalize(5)
+
+    assert limiter.estimate_wait() == pytest.approx(5.0)
+    assert limiter.reserve() == pytest.approx(5.0)
+    clock.advance(3)
+    assert limiter.reserve() == pytest.approx(2.0)
+    clock.advance(2)
+    assert limiter.reserve() == 0
+    assert limiter.get_stats()['rate_limited'] == 1
+
+
+def test_penalize_keeps_the_longer_block(clock):
+    limiter = TokenBucketRateLimiter()
+    limiter.penalize(10)
+    limiter.penalize(1)
+    assert limiter.estimate_wait() == pytest.approx(10.0)
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({'retry-after-ms': '1500'}, 1.5),
+    ({'retry-after': '3'}, 3.0),
+    ({'x-ratelimit-reset-requests': '1s', 'x-ratelimit-reset-tokens': '6m0s'}, 360.0),
+    ({}, None),
+])
+def test_retry_after_from_error(headers, expected):
+    error = SimpleNamespace(response=SimpleNamespace(headers=headers))
+    assert retry_after_from_error(error) == expected
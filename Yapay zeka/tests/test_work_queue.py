@@ -0,0 +1,99 @@
+import pytest
+
+import work_queue
+from work_queue import DONE, FAILED, LEASED, QUEUED, WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(work_queue, "time", clock)
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=60, max_attempts=2)
+    queue.enqueue({'a': "a.json", 'b': "b.json"})
+    yield queue
+    queue.close()
+
+
+def status(queue, conversation_id):
+    return next(item['status'] for item in queue.items() if item['conversation_id'] == conversation_id)
+
+
+def test_enqueue_skips_existing(queue):
+    assert queue.enqueue({'a': "a.json", 'c': "c.json"}) == 1
+    assert queue.stats()[QUEUED] == 3
+
+
+def test_lease_and_complete(queue):
+    item = queue.lease("worker-1")
+    assert item['conversation_id'] == 'a'
+    assert item['attempt'] == 1
+    assert status(queue, 'a') == LEASED
+
+    assert queue.complete('a', item['lease_id'], {'rows': 3})
+    assert status(queue, 'a') == DONE
+    assert next(i['result'] for i in queue.items() if i['conversation_id'] == 'a') == {'rows': 3}
+
+
+def test_expired_lease_is_requeued(queue, clock):
+    item = queue.lease("worker-1")
+    clock.advance(61)
+
+    assert queue.requeue_expired() == 1
+    assert status(queue, 'a') == QUEUED
+
+    retry = queue.lease("worker-2")
+    assert retry['conversation_id'] == 'a'
+    assert retry['attempt'] == 2
+    assert retry['lease_id'] != item['lease_id']
+
+
+def test_heartbeat_extends_the_lease(queue, clock):
+    item = queue.lease("worker-1")
+    clock.advance(50)
+    assert queue.heartbeat('a', item['lease_id'])
+    clock.advance(50)
+
+    assert queue.requeue_expired() == 0
+    assert queue.complete('a', item['lease_id'], {})
+
+
+def test_stale_lease_id_is_rejected(queue, clock):
+    stale = queue.lease("worker-1")
+    clock.advance(61)
+    current = queue.lease("worker-2")
+    assert current['conversation_id'] == 'a'
+
+    # Kiralaması elinden alınmış worker'ın sonucu ve heartbeat'i kabul edilmez
+    assert not queue.complete('a', stale['lease_id'], {'worker': 1})
+    assert not queue.heartbeat('a', stale['lease_id'])
+    assert not queue.fail('a', stale['lease_id'], "geç kaldı")
+    assert status(queue, 'a') == LEASED
+
+    assert queue.complete('a', current['lease_id'], {'worker': 2})
+    assert next(i['result'] for i in queue.items() if i['conversation_id'] == 'a') == {'worker': 2}
+
+
+def test_completed_item_cannot_be_completed_again(queue):
+    item = queue.lease("worker-1")
+    assert queue.complete('a', item['lease_id'], {})
+    assert not queue.complete('a', item['lease_id'], {})
+
+
+def test_attempts_are_capped(queue, clock):
+    queue.lease("worker-1")
+    clock.advance(61)
+    item = queue.lease("worker-2")
+    assert item['conversation_id'] == 'a'
+
+    assert queue.fail('a', item['lease_id'], "hata")
+    assert status(queue, 'a') == FAILED
+    assert queue.lease("worker-3")['conversation_id'] == 'b'
+
+
+def test_expired_lease_without_attempts_left_fails(queue, clock):
+    queue.lease("worker-1")
+    clock.advance(61)
+    queue.lease("worker-2")
+    clock.advance(61)
+
+    assert queue.requeue_expired() == 1
+    assert status(queue, 'a') == FAILED
@@ -0,0 +1,441 @@
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import argparse
+import contextlib
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from corpus_runner import (DEFAULT_PARTITION_ROWS, STATUS_OK, analyze_conversation_to_part,
+                           build_worker_analyzer, discover_conversations, merge_parts)
+
+logger = logging.getLogger(__name__)
+
+# Kuyruk öğesi durumları
+QUEUED = "queued"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class WorkQueue:
+    def __init__(self, db_path: str = "work_queue.db", lease_seconds: float = 300.0, max_attempts: int = 3):
+        """
+        Konuşma bazında kiralamalı (lease) SQLite iş kuyruğu
+
+        Worker bir konuşmayı kiraladığında lease_seconds boyunca sahibi olur ve
+        heartbeat ile süreyi uzatır. Süresi dolan kiralamalar (çöken veya bağlantısı
+        kopan worker) yeniden kuyruğa alınır; max_attempts denemeden sonra öğe
+        başarısız sayılır. Her kiralamanın benzersiz lease_id'si vardır; kiralaması
+        elinden alınmış bir worker sonucu kaydedemez.
+
+        Birden çok makine aynı dosyayı paylaşılan diskten kullanabilir (WAL modu);
+        ağ dosya sistemlerinde SQLite kilitlerinin güvenilir olduğundan emin olun.
+
+        Args:
+            db_path (str): SQLite dosya yolu
+            lease_seconds (float): Kiralama süresi (heartbeat gelmezse öğe yeniden kuyruğa alınır)
+            max_attempts (int): Bir konuşma için en fazla kiralama sayısı
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max(1, max_attempts)
+        self._lock = threading.Lock()
+
+        # Kiralama işlemleri BEGIN IMMEDIATE ile açıkça yönetilir
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA busy_timeout=30000")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS work_items (
+                conversation_id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_id TEXT,
+                lease_id TEXT,
+                lease_expires REAL,
+                enqueued_at REAL NOT NULL,
+                finished_at REAL,
+                result TEXT,
+                error TEXT
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_work_items_status ON work_items(status, enqueued_at)")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Yazma kilidini hemen alan transaction (kiralamalar süreçler arası atomik olur)"""
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def enqueue(self, conversations: Dict[str, str]) -> int:
+        """Konuşmaları kuyruğa ekle (kuyrukta olanlar atlanır) ve eklenen sayıyı döndür"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO work_items (conversation_id, source, status, enqueued_at) VALUES (?, ?, ?, ?)",
+                [(conversation_id, path, QUEUED, now) for conversation_id, path in conversations.items()]
+            )
+            added = conn.total_changes - before
+        logger.info(f"📥 {added} konuşma kuyruğa eklendi ({len(conversations) - added} zaten kuyrukta)")
+        return added
+
+    def _expire_leases(self, conn, now: float) -> int:
+        """Süresi dolan kiralamaları yeniden kuyruğa al (deneme hakkı bittiyse başarısız say)"""
+        expired = conn.execute(
+            "SELECT conversation_id, attempts, worker_id FROM work_items WHERE status = ? AND lease_expires < ?",
+            (LEASED, now)
+        ).fetchall()
+        for item in expired:
+            exhausted = item['attempts'] >= self.max_attempts
+            conn.execute(
+                "UPDATE work_items SET status = ?, lease_id = NULL, lease_expires = NULL, error = ?, "
+                "finished_at = ? WHERE conversation_id = ?",
+                (FAILED if exhausted else QUEUED, f"Kiralama süresi doldu ({item['worker_id']})",
+                 now if exhausted else None, item['conversation_id'])
+            )
+            logger.warning(f"⌛ Kiralama süresi doldu: {item['conversation_id']} ({item['worker_id']})"
+                           f"{' - deneme hakkı bitti' if exhausted else ' - yeniden kuyrukta'}")
+        return len(expired)
+
+    def requeue_expired(self) -> int:
+        """Süresi dolan kiralamaları yeniden kuyruğa al ve sayısını döndür"""
+        with self._transaction() as conn:
+            return self._expire_leases(conn, time.time())
+
+    def lease(self, worker_id: str) -> Optional[Dict]:
+        """Sıradaki konuşmayı kirala (kuyruk boşsa None)"""
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+            item = conn.execute(
+                "SELECT conversation_id, source, attempts FROM work_items WHERE status = ? "
+                "ORDER BY enqueued_at, conversation_id LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if item is None:
+                return None
+
+            lease_id = uuid.uuid4().hex
+            conn.execute(
+                "UPDATE work_items SET status = ?, worker_id = ?, lease_id = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE conversation_id = ?",
+                (LEASED, worker_id, lease_id, now + self.lease_seconds, item['conversation_id'])
+            )
+        return {'conversation_id': item['conversation_id'], 'source': item['source'],
+                'lease_id': lease_id, 'attempt': item['attempts'] + 1}
+
+    def heartbeat(self, conversation_id: str, lease_id: str) -> bool:
+        """Kiralamayı uzat; kiralama artık bu worker'da değilse False"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET lease_expires = ? WHERE conversation_id = ? AND lease_id = ? AND status = ?",
+                (time.time() + self.lease_seconds, conversation_id, lease_id, LEASED)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, conversation_id: str, lease_id: str, result: Dict) -> bool:
+        """Sonucu kaydet; kiralama elinden alınmışsa False (sonuç atılmalıdır)"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE work_items SET status = ?, result = ?, error = NULL, lease_id = NULL, lease_expires = NULL, "
+                "finished_at = ? WHERE conversation_id = ? AND lease_id = ? AND status = ?",
+                (DONE, json.dumps(result, ensure_ascii=False, default=str), time.time(),
+                 conversation_id, lease_id, LEASED)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, conversation_id: str, lease_id: str, error: str) -> bool:
+        """Başarısız denemeyi kaydet; deneme hakkı varsa öğe yeniden kuyruğa alınır"""
+        with self._transaction() as conn:
+            item = conn.execute(
+                "SELECT attempts FROM work_items WHERE conversation_id = ? AND lease_id = ? AND status = ?",
+                (conversation_id, lease_id, LEASED)
+            ).fetchone()
+            if item is None:
+                return False
+            exhausted = item['attempts'] >= self.max_attempts
+            conn.execute(
+                "UPDATE work_items SET status = ?, error = ?, lease_id = NULL, lease_expires = NULL, "
+                "finished_at = ? WHERE conversation_id = ?",
+                (FAILED if exhausted else QUEUED, error, time.time() if exhausted else None, conversation_id)
+            )
+            return True
+
+    def items(self) -> List[Dict]:
+        """Tüm kuyruk öğeleri (result JSON olarak çözülmüş)"""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM work_items ORDER BY conversation_id").fetchall()
+        items = []
+        for row in rows:
+            item = dict(row)
+            item['result'] = json.loads(item['result']) if item['result'] else None
+            items.append(item)
+        return items
+
+    def stats(self) -> Dict[str, int]:
+        """Durum bazında öğe sayıları"""
+        with self._lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM work_items GROUP BY status").fetchall()
+        counts = {status: 0 for status in (QUEUED, LEASED, DONE, FAILED)}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def close(self):
+        self.conn.close()
+
+
+class _Heartbeat:
+    """İşlenen konuşmanın kiralamasını arka planda düzenli olarak uzatır"""
+
+    def __init__(self, queue: WorkQueue, conversation_id: str, lease_id: str, interval: float):
+        self.queue = queue
+        self.conversation_id = conversation_id
+        self.lease_id = lease_id
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.queue.heartbeat(self.conversation_id, self.lease_id):
+                logger.warning(f"⚠️ Kiralama kaybedildi: {self.conversation_id}")
+                return
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+
+class QueueWorker:
+    def __init__(self, queue: WorkQueue, output_dir: str, analyzer_options: Optional[Dict] = None,
+                 worker_id: Optional[str] = None, concurrency: int = 1, cache_path: Optional[str] = None,
+                 rate_share: int = 1, analyzer=None):
+        """
+        Kuyruktan konuşma kiralayıp analiz eden worker (her makinede bir veya daha fazla çalıştırılır)
+
+        Sonuçlar worker'a ait shard klasörüne (shards/<worker_id>/) yazılır; böylece
+        farklı makinelerdeki worker'lar aynı dosyaya yazmaz.
+
+        Args:
+            queue (WorkQueue): Paylaşılan iş kuyruğu
+            output_dir (str): Çıktı klasörü (shard'lar ve birleştirilmiş sonuçlar)
+            analyzer_options (dict): EnhancedLLMAnalyzer parametreleri
+            worker_id (str): Worker adı (verilmezse <hostname>-<pid>)
+            concurrency (int): Konuşma içinde eşzamanlı API isteği (1 = sıralı)
+            cache_path (str): SQLite yanıt önbelleği (None = kapalı)
+            rate_share (int): Provider RPM/TPM bütçesini paylaşan toplam worker sayısı
+            analyzer: Hazır analizör (verilirse analyzer_options kullanılmaz)
+        """
+        self.queue = queue
+        self.output_dir = output_dir
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = max(1, concurrency)
+        self.analyzer = analyzer or build_worker_analyzer(analyzer_options or {}, cache_path, rate_share)
+        # Heartbeat kiralama süresinin üçte birinde bir gönderilir
+        self.heartbeat_interval = max(0.1, queue.lease_seconds / 3)
+        self.shard_dir = os.path.join(output_dir, "shards", self.worker_id)
+        self.stats = {'completed': 0, 'failed': 0, 'lost_leases': 0}
+        self._loop = asyncio.new_event_loop()
+        os.makedirs(self.shard_dir, exist_ok=True)
+
+    def _part_path(self, conversation_id: str) -> str:
+        return os.path.join(self.shard_dir, conversation_id.replace("/", "__") + ".jsonl")
+
+    def process(self, item: Dict) -> bool:
+        """Kiralanan konuşmayı analiz et ve sonucu kuyruğa bildir"""
+        conversation_id, lease_id = item['conversation_id'], item['lease_id']
+        part_path = self._part_path(conversation_id)
+
+        with _Heartbeat(self.queue, conversation_id, lease_id, self.heartbeat_interval):
+            status = analyze_conversation_to_part(self.analyzer, self._loop, conversation_id, item['source'],
+                                                  part_path, self.concurrency)
+
+        status.update(worker_id=self.worker_id, attempt=item['attempt'],
+                      part=os.path.relpath(part_path, self.output_dir) if status['status'] == STATUS_OK else None)
+
+        # Kiralama süresi dolup başka worker'a geçtiyse lease_id eşleşmez ve kayıt reddedilir
+        if status['status'] == STATUS_OK:
+            accepted = self.queue.complete(conversation_id, lease_id, status)
+        else:
+            accepted = self.queue.fail(conversation_id, lease_id, status.get('error', ''))
+
+        if not accepted:
+            # Kiralama başka bir worker'a geçti; sonucu onun çıktısı geçerli olur
+            self.stats['lost_leases'] += 1
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            logger.warning(f"⚠️ Sonuç atıldı, kiralama başka worker'da: {conversation_id}")
+            return False
+
+        self.stats['completed' if status['status'] == STATUS_OK else 'failed'] += 1
+        return status['status'] == STATUS_OK
+
+    def run(self, max_items: Optional[int] = None, wait_for_leases: bool = True, poll_interval: float = 5.0) -> Dict:
+        """
+        Kuyruk boşalana kadar konuşma kirala ve analiz et
+
+        Args:
+            max_items (int): En fazla işlenecek konuşma (None = sınırsız)
+            wait_for_leases (bool): Kuyrukta bekleyen yoksa ama başka worker'larda kiralı öğe
+                varsa, olası yeniden kuyruğa alınmaları için beklemeye devam et
+            poll_interval (float): Bekleme aralığı (saniye)
+        """
+        processed = 0
+        logger.info(f"👷 Worker başladı: {self.worker_id}")
+        while max_items is None or processed < max_items:
+            item = self.queue.lease(self.worker_id)
+            if item is None:
+                if wait_for_leases and self.queue.stats()[LEASED]:
+                    time.sleep(poll_interval)
+                    continue
+                break
+
+            logger.info(f"🔒 {item['conversation_id']} kiralandı (deneme {item['attempt']})")
+            self.process(item)
+            processed += 1
+
+        logger.info(f"🏁 Worker bitti: {self.worker_id} ({self.stats['completed']} tamamlandı, "
+                    f"{self.stats['failed']} başarısız, {self.stats['lost_leases']} kiralama kaybı)")
+        return {'worker_id': self.worker_id, **self.stats,
+                'api_calls': self.analyzer.api_calls, 'total_tokens': self.analyzer.total_tokens}
+
+
+def merge_queue_results(queue: WorkQueue, output_dir: str, partition_rows: int = DEFAULT_PARTITION_ROWS) -> Dict:
+    """
+    Tamamlanan konuşmaların shard çıktılarını CSV bölümlerine birleştir ve manifest.json'u yaz
+
+    Manifest; konuşma bazında durum, deneme sayısı, worker ve bölüm bilgisini,
+    ayrıca worker bazında çağrı/token toplamlarını içerir.
+    """
+    items = queue.items()
+    done = [item for item in items if item['status'] == DONE]
+
+    for old_partition in [name for name in os.listdir(output_dir) if name.startswith("part-") and name.endswith(".csv")]:
+        os.remove(os.path.join(output_dir, old_partition))
+    assignments = merge_parts([os.path.join(output_dir, item['result']['part']) for item in done],
+                              output_dir, partition_rows)
+
+    conversations, workers = {}, {}
+    for item in items:
+        result = item['result'] or {}
+        conversations[item['conversation_id']] = {
+            'source': item['source'],
+            'status': item['status'],
+            'attempts': item['attempts'],
+            'worker_id': item['worker_id'],
+            'rows': result.get('rows'),
+            'api_calls': result.get('api_calls'),
+            'tokens': result.get('tokens'),
+            'degraded': result.get('degraded'),
+            'seconds': result.get('seconds'),
+            'error': item['error'],
+            'partition': assignments.get(item['conversation_id'])
+        }
+        if item['status'] == DONE:
+            totals = workers.setdefault(item['worker_id'], {'conversations': 0, 'rows': 0, 'api_calls': 0, 'tokens': 0})
+            totals['conversations'] += 1
+            for key in ('rows', 'api_calls', 'tokens'):
+                totals[key] += result.get(key, 0)
+
+    manifest = {
+        'created_at': datetime.now().isoformat(),
+        'queue': os.path.abspath(queue.db_path),
+        'queue_stats': queue.stats(),
+        'partition_rows': partition_rows,
+        'partitions': sorted(set(assignments.values())),
+        'summary': {
+            'conversations': len(items),
+            'succeeded': len(done),
+            'failed': sum(1 for item in items if item['status'] == FAILED),
+            'pending': sum(1 for item in items if item['status'] in (QUEUED, LEASED)),
+            'rows': sum(totals['rows'] for totals in workers.values()),
+            'api_calls': sum(totals['api_calls'] for totals in workers.values()),
+            'total_tokens': sum(totals['tokens'] for totals in workers.values()),
+        },
+        'workers': workers,
+        'conversations': conversations
+    }
+
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    with open(f"{manifest_path}.tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False, default=str)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    summary = manifest['summary']
+    logger.info(f"📋 Manifest: {manifest_path} ({summary['succeeded']}/{summary['conversations']} tamamlandı, "
+                f"{summary['pending']} bekliyor, {len(manifest['partitions'])} bölüm)")
+    return manifest
+
+
+def main():
+    """İş kuyruğu komut satırı: enqueue, work, merge, status"""
+    parser = argparse.ArgumentParser(description="Çok makineli analiz için kiralamalı iş kuyruğu")
+    parser.add_argument('--queue', default='work_queue.db', help='Paylaşılan kuyruk (SQLite) dosyası')
+    parser.add_argument('--lease-seconds', type=float, default=300.0, help='Kiralama süresi (sn)')
+    parser.add_argument('--max-attempts', type=int, default=3, help='Konuşma başına en fazla deneme')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = commands.add_parser('enqueue', help='Klasör veya glob\'daki konuşmaları kuyruğa ekle')
+    enqueue_parser.add_argument('source', help='Klasör veya glob kalıbı')
+
+    work_parser = commands.add_parser('work', help='Kuyruk boşalana kadar konuşma analiz et')
+    work_parser.add_argument('--output', required=True, help='Paylaşılan çıktı klasörü')
+    work_parser.add_argument('--provider', default='groq', help='LLM provider')
+    work_parser.add_argument('--model', default=None, help='Model adı')
+    work_parser.add_argument('--fused', action='store_true', help='Birleşik analiz modu')
+    work_parser.add_argument('--batch-size', type=int, default=1, help='Batch boyutu')
+    work_parser.add_argument('--concurrency', type=int, default=1, help='Eşzamanlı API isteği')
+    work_parser.add_argument('--cache-path', default=None, help='SQLite yanıt önbelleği')
+    work_parser.add_argument('--rate-share', type=int, default=1, help='RPM/TPM bütçesini paylaşan worker sayısı')
+    work_parser.add_argument('--worker-id', default=None, help='Worker adı (varsayılan: hostname-pid)')
+    work_parser.add_argument('--max-items', type=int, default=None, help='En fazla işlenecek konuşma')
+
+    merge_parser = commands.add_parser('merge', help='Shard çıktılarını birleştir ve manifest yaz')
+    merge_parser.add_argument('--output', required=True, help='Paylaşılan çıktı klasörü')
+    merge_parser.add_argument('--partition-rows', type=int, default=DEFAULT_PARTITION_ROWS,
+                              help='CSV bölümü başına en fazla satır')
+
+    commands.add_parser('status', help='Kuyruk durumunu göster')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    queue = WorkQueue(args.queue, args.lease_seconds, args.max_attempts)
+
+    if args.command == 'enqueue':
+        conversations = discover_conversations(args.source)
+        if not conversations:
+            parser.error(f"Konuşma dosyası bulunamadı: {args.source}")
+        queue.enqueue(conversations)
+    elif args.command == 'work':
+        options = {'provider': args.provider, 'model': args.model, 'fused': args.fused, 'batch_size': args.batch_size}
+        worker = QueueWorker(queue, args.output, options, args.worker_id, args.concurrency,
+                             args.cache_path, args.rate_share)
+        print(json.dumps(worker.run(args.max_items), ensure_ascii=False))
+    elif args.command == 'merge':
+        merge_queue_results(queue, args.output, args.partition_rows)
+
+    print(json.dumps(queue.stats(), ensure_ascii=False))
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()